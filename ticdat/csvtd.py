@@ -7,7 +7,8 @@ import os
 from ticdat.utils import DataFrame, create_generic_free, numericish, case_space_to_pretty
 from ticdat.utils import freezable_factory, TicDatError, verify, containerish, dictish
 from collections import defaultdict
-from itertools import product
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 
 try:
     import csv
@@ -16,6 +17,22 @@ except:
 
 _can_unit_test = csv
 
+def _picklable_read_schema(tdf):
+    # the full schema of tdf, less what doesn't matter for reading (i.e. the foreign keys), as plain containers
+    full_schema = tdf.schema(include_ancillary_info=True)
+    return {"tables_fields": full_schema["tables_fields"], "foreign_keys": [],
+            "default_values": {t: dict(dvs) for t, dvs in full_schema["default_values"].items()},
+            "data_types": {t: {f: tuple(dt) for f, dt in dts.items()}
+                           for t, dts in full_schema["data_types"].items()},
+            "parameters": {p: (None if dt is None else tuple(dt), dv)
+                           for p, (dt, dv) in full_schema["parameters"].items()},
+            "infinity_io_flag": full_schema["infinity_io_flag"]}
+
+def _create_table_in_worker(full_schema, dir_path, table, dialect, headers_present, encoding):
+    from ticdat.ticdatfactory import TicDatFactory
+    tdf = TicDatFactory.create_from_full_schema(full_schema)
+    return tdf.csv._create_table(dir_path, table, dialect, headers_present, encoding)
+
 class CsvTicFactory(freezable_factory(object, "_isFrozen")) :
     """
     Primary class for reading/writing csv files with TicDat objects.
@@ -36,7 +53,7 @@ class CsvTicFactory(freezable_factory(object, "_isFrozen")) :
         self.tic_dat_factory = tic_dat_factory
         self._isFrozen = True
     def create_tic_dat(self, dir_path, dialect='excel', headers_present = True,
-                       freeze_it = False, encoding=None):
+                       freeze_it = False, encoding=None, max_workers=None):
         """
         Create a TicDat object from the csv files in a directory
 
@@ -51,6 +68,9 @@ class CsvTicFactory(freezable_factory(object, "_isFrozen")) :
 
         :param freeze_it: boolean. should the returned object be frozen?
 
+        :param max_workers: None or a positive integer. If an integer, the files are parsed concurrently on a pool
+                            of (up to) this many processes. Generator tables are always read lazily in this process.
+
         :return: a TicDat object populated by the matching files.
 
         caveats: Missing files resolve to an empty table, but missing fields on
@@ -74,38 +94,70 @@ class CsvTicFactory(freezable_factory(object, "_isFrozen")) :
                "headers need to be present to read generic tables")
         verify(DataFrame or not tdf.generic_tables,
                "Strange absence of pandas despite presence of generic tables")
-        rtn = self.tic_dat_factory.TicDat(**self._create_tic_dat(dir_path, dialect,
-                                                                  headers_present, encoding))
+        # _create_tic_dat builds each row from the full set of fields, so the rows can be trusted
+        rtn = self.tic_dat_factory.TicDat.from_rows(trusted=True, **self._create_tic_dat(
+            dir_path, dialect, headers_present, encoding, max_workers))
         rtn = self.tic_dat_factory._parameter_table_post_read_adjustment(rtn)
         if freeze_it:
             return self.tic_dat_factory.freeze_me(rtn)
         return rtn
     def _read_cell(self, table, field, x):
+        return self._cell_reader(table, field)(x)
+    def _cell_reader(self, table, field):
+        # returns a function that reads the cells of a field. everything that doesn't depend on the cell value
+        # is resolved here, once per field, rather than for every cell
+        tdf = self.tic_dat_factory
+        if table == "parameters":
+            # the cell is left as is (tdf._general_read_cell does nothing for the parameters table either)
+            if tdf.parameters:
+                return lambda x: x
+            needs_general_read = False
+        else:
+            dt_ = tdf.data_types.get(table, {}).get(field)
+            needs_general_read = (dt_ and dt_.datetime) or numericish(tdf.infinity_io_flag) or \
+                (tdf.infinity_io_flag is None and numericish(tdf._none_as_infinity_bias(table, field)))
+        # reminder - data fields have a default default of zero, primary keys don't get a default default
+        dv = tdf.default_values.get(table, {}).get(field, ["LIST", "NOT", "POSSIBLE"])
+        dt = tdf.data_types.get(table, {}).get(field)
+        empty_is_none = bool((dt and dt.nullable) or (not dt and dv is None) or
+                             numericish(tdf._general_read_cell(table, field, None)))
+        should_try_float = (dt and dt.number_allowed) or (not dt and numericish(dv)) or \
+                           (table in tdf.generic_tables)
+        must_be_int = bool(dt and dt.must_be_int)
         def _inner_rtn(x):
-            if table == "parameters" and self.tic_dat_factory.parameters:
-                return x
-            # reminder - data fields have a default default of zero, primary keys don't get a default default
-            dv = self.tic_dat_factory.default_values.get(table, {}).get(field, ["LIST", "NOT", "POSSIBLE"])
-            dt = self.tic_dat_factory.data_types.get(table, {}).get(field)
-            if x == "" and ((dt and dt.nullable) or (not dt and dv is None) or
-                            numericish(self.tic_dat_factory._general_read_cell(table, field, None))):
+            if x == "" and empty_is_none:
                 return None
-            should_try_float = (dt and dt.number_allowed) or (not dt and numericish(dv)) or \
-                               (table in self.tic_dat_factory.generic_tables)
             if should_try_float:
                 try:
                     x = float(x)
-                    if int(x) == x and dt and dt.must_be_int:
+                    if must_be_int and int(x) == x:
                         x = int(x)
                 except:
                     return x
             return x
-        return self.tic_dat_factory._general_read_cell(table, field, _inner_rtn(x))
-    def _create_tic_dat(self, dir_path, dialect, headers_present, encoding):
+        if not needs_general_read:
+            return _inner_rtn
+        return lambda x: tdf._general_read_cell(table, field, _inner_rtn(x))
+    def _create_tic_dat(self, dir_path, dialect, headers_present, encoding, max_workers=None):
         verify(dialect in csv.list_dialects(), "Invalid dialect %s"%dialect)
         verify(os.path.isdir(dir_path), "Invalid directory path %s"%dir_path)
-        rtn =  {t : self._create_table(dir_path, t, dialect, headers_present, encoding)
-                for t in self.tic_dat_factory.all_tables}
+        verify(max_workers is None or (isinstance(max_workers, int) and max_workers > 0),
+               "max_workers should be None or a positive integer")
+        tdf = self.tic_dat_factory
+        pooled = [t for t in tdf.all_tables if t not in tdf.generator_tables and self._get_file_path(dir_path, t)] \
+                 if max_workers else []
+        rtn = {}
+        if len(pooled) > 1:
+            # the row parsing is pure Python, so the tables are read on processes rather than threads.
+            # a TicDatFactory can't be pickled, so each worker rebuilds the parts of it that reading depends upon
+            full_schema = _picklable_read_schema(tdf)
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(pooled))) as executor:
+                futures = {t: executor.submit(_create_table_in_worker, full_schema, dir_path, t, dialect,
+                                              headers_present, encoding) for t in pooled}
+                rtn = {t: f.result() for t, f in futures.items()}
+        for t in tdf.all_tables:
+            if t not in rtn:
+                rtn[t] = self._create_table(dir_path, t, dialect, headers_present, encoding)
         missing_tables = {t for t in self.tic_dat_factory.all_tables if not rtn[t]}
         if missing_tables:
             print ("The following table names could not be found in the %s directory.\n%s\n"%
@@ -141,12 +193,10 @@ class CsvTicFactory(freezable_factory(object, "_isFrozen")) :
         rtn = {t:defaultdict(int) for t,_ in tdf.primary_key_fields.items()
                if _ and self._get_file_path(dir_path, t)}
         for t in rtn:
+            pklen = len(tdf.primary_key_fields[t])
             with open(self._get_file_path(dir_path, t), encoding=encoding) as csvfile:
-                for r in self._get_data(csvfile, t, dialect, headers_present):
-                    p_key = r[tdf.primary_key_fields[t][0]] \
-                            if len(tdf.primary_key_fields[t])==1 else \
-                            tuple(r[_] for _ in tdf.primary_key_fields[t])
-                    rtn[t][p_key] += 1
+                for r in self._row_reader(csvfile, t, dialect, headers_present)[1]:
+                    rtn[t][r[0] if pklen == 1 else tuple(r[:pklen])] += 1
         for t in list(rtn.keys()):
             rtn[t] = {k:v for k,v in rtn[t].items() if v > 1}
             if not rtn[t]:
@@ -159,27 +209,46 @@ class CsvTicFactory(freezable_factory(object, "_isFrozen")) :
         verify(len(rtn) <= 1, "duplicate .csv files found for %s"%table)
         if rtn:
             return rtn[0]
-    def _get_data(self, csvfile, table, dialect, headers_present):
+    def _row_reader(self, csvfile, table, dialect, headers_present):
+        """
+        reads the rows of a table's csv file
+        :return: a (fieldnames, rows) pair. rows iterates over the rows of the file as lists of cell values
+                 (read with _cell_reader) in fieldnames order. fieldnames is the primary key fields followed by the
+                 data fields (or the header, for a generic table)
+        """
         tdf = self.tic_dat_factory
         fieldnames=tdf.primary_key_fields.get(table, ()) + tdf.data_fields.get(table, ())
         assert fieldnames or table in self.tic_dat_factory.generic_tables
-        for row in csv.DictReader(csvfile, dialect = dialect,
-                            **({"fieldnames":fieldnames} if not headers_present else {})):
-            if not headers_present:
-                verify(len(row) == len(fieldnames),
-                   "Need %s columns for table %s"%(len(fieldnames), table))
-                yield {f: self._read_cell(table, f, row[f]) for f in fieldnames}
-            else:
-                key_matching = defaultdict(list)
-                for k,f in product(row.keys(), fieldnames or row.keys()):
-                    if k.lower() ==f.lower():
-                        key_matching[f].append(k)
-                fieldnames = fieldnames or row.keys()
-                for f in fieldnames:
-                    verify(f in key_matching, "Unable to find field name %s for table %s"%(f, table))
-                    verify(len(key_matching[f]) <= 1,
-                           "Duplicate field names found for field %s table %s"%(f, table))
-                yield {f: self._read_cell(table, f, row[key_matching[f][0]]) for f in fieldnames}
+        reader = csv.reader(csvfile, dialect = dialect)
+        if headers_present:
+            # the header is matched to the fields once, case insensitively. as with csv.DictReader, if a column
+            # name is repeated exactly then the last such column is used
+            header = next(reader, None)
+            if header is None:
+                return fieldnames, iter(())
+            header_posns = {h: i for i, h in enumerate(header)}
+            fieldnames = fieldnames or tuple(header_posns)
+            posns = []
+            for f in fieldnames:
+                matches = [i for h, i in header_posns.items() if h.lower() == f.lower()]
+                verify(matches, "Unable to find field name %s for table %s"%(f, table))
+                verify(len(matches) <= 1, "Duplicate field names found for field %s table %s"%(f, table))
+                posns.append(matches[0])
+            row_len = len(header)
+        else:
+            posns, row_len = list(range(len(fieldnames))), len(fieldnames)
+        readers = [self._cell_reader(table, f) for f in fieldnames]
+        def rows():
+            for row in reader:
+                if not row: # csv.DictReader skips the blank rows
+                    continue
+                if len(row) != row_len:
+                    verify(headers_present or len(row) < row_len,
+                           "Need %s columns for table %s"%(len(fieldnames), table))
+                    # the missing cells are read as None, as with csv.DictReader
+                    row = row + [None] * (row_len - len(row))
+                yield [r(row[i]) for r, i in zip(readers, posns)]
+        return fieldnames, rows()
 
     def _create_table(self, dir_path, table, dialect, headers_present, encoding):
         file_path = self._get_file_path(dir_path, table)
@@ -189,21 +258,24 @@ class CsvTicFactory(freezable_factory(object, "_isFrozen")) :
         if table in tdf.generator_tables:
             def rtn() :
                 with open(file_path, encoding=encoding) as csvfile:
-                    for r in self._get_data(csvfile, table, dialect, headers_present):
-                        yield tuple(r[_] for _ in tdf.data_fields[table])
+                    for r in self._row_reader(csvfile, table, dialect, headers_present)[1]:
+                        yield tuple(r)
+            def batches(batch_size):
+                with open(file_path, encoding=encoding) as csvfile:
+                    rows = self._row_reader(csvfile, table, dialect, headers_present)[1]
+                    for batch in iter(lambda : list(islice(rows, batch_size)), []):
+                        yield batch
+            rtn.batches = batches
         else:
-            rtn = {} if tdf.primary_key_fields.get(table) else []
+            pklen = len(tdf.primary_key_fields.get(table, ()))
             with open(file_path, encoding=encoding) as csvfile:
-                for r in self._get_data(csvfile, table, dialect, headers_present) :
-                    if tdf.primary_key_fields.get(table) :
-                        p_key = r[tdf.primary_key_fields[table][0]] \
-                                if len(tdf.primary_key_fields[table]) == 1 else \
-                                tuple(r[_] for _ in tdf.primary_key_fields[table])
-                        rtn[p_key] = tuple(r[_] for _ in tdf.data_fields.get(table,()))
-                    elif table in tdf.generic_tables:
-                        rtn.append(r)
-                    else:
-                        rtn.append(tuple(r[_] for _ in tdf.data_fields[table]))
+                fieldnames, rows = self._row_reader(csvfile, table, dialect, headers_present)
+                if pklen:
+                    rtn = {(r[0] if pklen == 1 else tuple(r[:pklen])): tuple(r[pklen:]) for r in rows}
+                elif table in tdf.generic_tables:
+                    rtn = [dict(zip(fieldnames, r)) for r in rows]
+                else:
+                    rtn = [tuple(r) for r in rows]
         return rtn
 
     def write_directory(self, tic_dat, dir_path, allow_overwrite = False, dialect='excel',
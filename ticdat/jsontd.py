@@ -91,7 +91,7 @@ class JsonTicFactory(freezable_factory(object, "_isFrozen")) :
         if missing_tables:
             print ("The following table names could not be found in the %s file.\n%s\n"%
                    (json_file_path,"\n".join(missing_tables)))
-        rtn = self.tic_dat_factory.TicDat(**tic_dat_dict)
+        rtn = self.tic_dat_factory.TicDat.from_rows(trusted=self._well_formed(tic_dat_dict), **tic_dat_dict)
         rtn = self.tic_dat_factory._parameter_table_post_read_adjustment(rtn)
         if freeze_it:
             return self.tic_dat_factory.freeze_me(rtn)
@@ -147,6 +147,15 @@ class JsonTicFactory(freezable_factory(object, "_isFrozen")) :
         verify(all(map(containerish, jdict.values())),
                "The dictionary loaded from %s doesn't have containers as values" % reasonble_string)
         return jdict
+    def _well_formed(self, tic_dat_dict):
+        # are all the rows lists with an entry for every field? if so, the rows can be trusted
+        tdf = self.tic_dat_factory
+        for t, rows in tic_dat_dict.items():
+            if t not in tdf.generic_tables:
+                num_fields = len(tdf.primary_key_fields.get(t, ()) + tdf.data_fields.get(t, ()))
+                if not all(containerish(row) and not dictish(row) and len(row) == num_fields for row in rows):
+                    return False
+        return True
     def _create_tic_dat_dict(self, jdict):
         tdf = self.tic_dat_factory
         rtn = {}
@@ -13,11 +13,18 @@ try:
 except:
     isnull = None
 import collections as clt
+import datetime
+import numbers
+import time
 from ticdat.pgtd import PostgresPanFactory
 try:
     import amplpy
 except:
     amplpy = None
+try:
+    import numpy as np
+except:
+    np = None
 
 pd, DataFrame = utils.pd, utils.DataFrame # if pandas not installed will be falsey
 
@@ -30,6 +37,127 @@ def _faster_df_apply(df, func):
         index.append(row[0])
     return pd.Series(data, index=index)
 
+def _vectorized_predicate_failures(df, predicate):
+    """
+    :param df: a DataFrame
+    :param predicate: a function that accepts df and returns a boolean Series (or array) aligned with df
+    :return: a boolean Series, aligned with df, flagging the rows that fail the predicate, or None if the
+             predicate throws an exception
+    """
+    try:
+        good = predicate(df)
+        good = good.to_numpy() if hasattr(good, "to_numpy") else np.asarray(good)
+        if good.ndim == 0:
+            good = np.full(len(df), good)
+        verify(len(good) == len(df), "vectorized predicate returned a result of the wrong length")
+        return pd.Series(~good.astype(bool), index=df.index)
+    except utils.TicDatError:
+        raise
+    except:
+        return None
+
+def _bad_numbers_mask(values, data_type, integral):
+    # mirrors the numericish branch of TypeDictionary.valid_data for an array of (non-null, non-bool) numbers
+    if not data_type.number_allowed:
+        return np.ones(len(values), dtype=bool)
+    rtn = np.asarray((values < data_type.min) | (values > data_type.max), dtype=bool)
+    if not data_type.inclusive_min:
+        rtn |= np.asarray(values == data_type.min, dtype=bool)
+    if not data_type.inclusive_max:
+        rtn |= np.asarray(values == data_type.max, dtype=bool)
+    if data_type.must_be_int and not integral:
+        values = values.astype(float)
+        not_int = ~np.isfinite(values) | (values != np.trunc(values))
+        if data_type.inclusive_max and data_type.max == float("inf"):
+            not_int &= values != data_type.max
+        rtn |= not_int
+    return rtn
+
+def _bad_values_mask(values, data_type):
+    # the slow path - defers to valid_data, but evaluates each distinct value only once
+    rtn, cache = np.zeros(len(values), dtype=bool), {}
+    for i, v in enumerate(values):
+        try:
+            if v not in cache:
+                cache[v] = not data_type.valid_data(v)
+            rtn[i] = cache[v]
+        except TypeError:
+            rtn[i] = not data_type.valid_data(v)
+    return rtn
+
+def _data_type_failure_mask(series, data_type):
+    """
+    A columnar equivalent of applying data_type.valid_data to each cell of series.
+    :param series: a pandas Series
+    :param data_type: a TypeDictionary
+    :return: a boolean Series, aligned with series, that flags the cells that fail data_type
+    """
+    null = series.isnull().to_numpy()
+    rtn = null.copy() if not data_type.nullable else np.zeros(len(series), dtype=bool)
+    live = ~null
+    kind = series.dtype.kind
+    if not live.any():
+        pass
+    elif kind == "M":
+        rtn[live] = not data_type.datetime
+    elif kind in "iuf" and not data_type.datetime:
+        values = series.to_numpy()[live]
+        if values.dtype == object: # i.e. a masked extension dtype, nulls already removed
+            values = values.astype(series.dtype.numpy_dtype)
+        rtn[live] = _bad_numbers_mask(values, data_type, kind != "f")
+    elif kind != "O":
+        rtn[live] = _bad_values_mask(series[live].tolist(), data_type)
+    else:
+        values = series.to_numpy()[live]
+        positions_by_type = clt.defaultdict(list)
+        for i, v in enumerate(values):
+            positions_by_type[type(v)].append(i)
+        bad = np.zeros(len(values), dtype=bool)
+        for t, where in positions_by_type.items():
+            if data_type.datetime and issubclass(t, datetime.datetime):
+                continue
+            if (not data_type.datetime) and issubclass(t, (numbers.Integral, float, np.floating)) and \
+                    not issubclass(t, (bool, np.bool_)):
+                bad[where] = _bad_numbers_mask(values[where], data_type, issubclass(t, numbers.Integral))
+            elif (not data_type.datetime) and issubclass(t, str):
+                if data_type.strings_allowed != "*":
+                    bad[where] = ~pd.Series(values[where]).isin(list(data_type.strings_allowed)).to_numpy()
+            else:
+                bad[where] = _bad_values_mask(values[where], data_type)
+        rtn[live] = bad
+    return pd.Series(rtn, index=series.index)
+
+def _numbers_mask(series):
+    # flags the cells of series that are numbers (as per utils.numericish), a column at a time when the dtype allows
+    if series.dtype.kind in "iuf":
+        return pd.Series(True, index=series.index)
+    if series.dtype.kind != "O":
+        return pd.Series(False, index=series.index)
+    return series.map(utils.numericish).astype(bool)
+
+def _infinity_flag_masks(series, flag):
+    """
+    :param series: a pandas Series
+    :param flag: a number, the infinity_io_flag
+    :return: a pair of boolean arrays flagging the numericish cells of series that are >= flag and <= -flag
+             respectively, or None if series can't have any numericish cells
+    """
+    kind = series.dtype.kind
+    if kind in "iuf":
+        return tuple((series >= flag if i == 1 else series <= -flag).fillna(False).to_numpy(dtype=bool)
+                     for i in [1, -1])
+    if kind != "O":
+        return None
+    values = series.to_numpy()
+    is_number = np.fromiter(map(utils.numericish, values), dtype=bool, count=len(values))
+    if not is_number.any():
+        return None
+    rtn = np.zeros(len(values), dtype=bool), np.zeros(len(values), dtype=bool)
+    numbers_ = values[is_number]
+    rtn[0][is_number] = numbers_ >= flag
+    rtn[1][is_number] = numbers_ <= -flag
+    return rtn
+
 class PanDatFactory(object):
     """
      Defines a schema for a collection of pandas.DataFrame objects.
@@ -152,7 +280,8 @@ class PanDatFactory(object):
         for tbl, row_predicates in self._data_row_predicates.items():
             if table_restrictions is None or tbl in table_restrictions:
                 for pn, p in row_predicates.items():
-                    rtn.add_data_row_predicate(tbl, predicate=p, predicate_name=pn)
+                    rtn.add_data_row_predicate(tbl, predicate=p, predicate_name=pn,
+                                               vectorized=pn in self._vectorized_data_row_predicates[tbl])
         return rtn
     @property
     def default_values(self):
@@ -215,16 +344,18 @@ class PanDatFactory(object):
         :param table: table in the schema
         :return valid argument for dtype argument for pandas.read_ routine
         '''
-        rtn = {}
         assert table in self.all_tables
-        for f, dt in self.data_types.get(table, {}).items():
-            if not dt.datetime and not dt.number_allowed and dt.strings_allowed:
-                rtn[f] = str
-        if self.parameters and table == "parameters":
-            for fld_singleton in self.schema()["parameters"]:
-                if fld_singleton[0] not in rtn:
-                    rtn[fld_singleton[0]] = str
-        return rtn
+        def make_dtypes():
+            rtn = {}
+            for f, dt in self.data_types.get(table, {}).items():
+                if not dt.datetime and not dt.number_allowed and dt.strings_allowed:
+                    rtn[f] = str
+            if self.parameters and table == "parameters":
+                for fld_singleton in self.schema()["parameters"]:
+                    if fld_singleton[0] not in rtn:
+                        rtn[fld_singleton[0]] = str
+            return rtn
+        return dict(self._cached_once_used(("dtypes_for_pandas_read", table), make_dtypes))
     def _general_post_read_adjustment(self, dat, push_parameters_to_be_valid=False, json_read=False):
         '''
         we expect other routines inside ticdat to access this routine, even though it starts with _
@@ -239,13 +370,17 @@ class PanDatFactory(object):
             df = getattr(dat, t)
             for f in self.primary_key_fields.get(t, ()) + self.data_fields.get(t, ()):
                 if utils.numericish(self.infinity_io_flag):
-                    fixme = apply(df, lambda row: utils.numericish(row[f]) and row[f] >= self.infinity_io_flag)
-                    df.loc[fixme, f] = float("inf")
-                    fixme = apply(df, lambda row: utils.numericish(row[f]) and row[f] <= -self.infinity_io_flag)
-                    df.loc[fixme, f] = -float("inf")
-                elif utils.numericish(self._none_as_infinity_bias(t, f)):
-                    assert self.infinity_io_flag is None
-                    df[f].fillna(value=self._none_as_infinity_bias(t, f) * float("inf"), inplace=True)
+                    # fields read as strings can't have numbers to adjust
+                    masks = None if self._dtypes_for_pandas_read(t).get(f) == str else \
+                            _infinity_flag_masks(df[f], self.infinity_io_flag)
+                    for fixme, v in zip(masks or (), [float("inf"), -float("inf")]):
+                        if fixme.any():
+                            df.loc[fixme, f] = v
+                else:
+                    bias = self._none_as_infinity_bias(t, f)
+                    if utils.numericish(bias):
+                        assert self.infinity_io_flag is None
+                        df[f].fillna(value=bias * float("inf"), inplace=True)
                 dt = self.data_types.get(t, {}).get(f, None)
                 if dt and dt.datetime:
                     def fixed_row(row):
@@ -310,19 +445,21 @@ class PanDatFactory(object):
                                                    lambda row: None if isnull(row[fld]) else str(row[fld]))
         if self.infinity_io_flag == "N/A":
             return rtn
-        apply = _faster_df_apply
         for t in set(self.all_tables).difference(["parameters"]): # parameters table is handled differently
             df = getattr(rtn, t)
             for f in self.primary_key_fields.get(t, ()) + self.data_fields.get(t, ()):
                 if utils.numericish(self.infinity_io_flag):
-                    fixme = apply(df, lambda row: utils.numericish(row[f]) and row[f] >= self.infinity_io_flag)
-                    df.loc[fixme, f] = self.infinity_io_flag
-                    fixme = apply(df, lambda row: utils.numericish(row[f]) and row[f] <= -self.infinity_io_flag)
-                    df.loc[fixme, f] = -self.infinity_io_flag
-                elif utils.numericish(self._none_as_infinity_bias(t, f)):
-                    assert self.infinity_io_flag is None
-                    fixme = apply(df, lambda row: row[f] == float("inf") * self._none_as_infinity_bias(t, f))
-                    df.loc[fixme, f] = None
+                    masks = _infinity_flag_masks(df[f], self.infinity_io_flag)
+                    for fixme, v in zip(masks or (), [self.infinity_io_flag, -self.infinity_io_flag]):
+                        if fixme.any():
+                            df.loc[fixme, f] = v
+                else:
+                    bias = self._none_as_infinity_bias(t, f)
+                    if utils.numericish(bias):
+                        assert self.infinity_io_flag is None
+                        fixme = (df[f] == float("inf") * bias).to_numpy(dtype=bool)
+                        if fixme.any():
+                            df.loc[fixme, f] = None
         return rtn
     def set_data_type(self, table, field, number_allowed = True,
                       inclusive_min = True, inclusive_max = False, min = 0, max = float("inf"),
@@ -391,7 +528,7 @@ class PanDatFactory(object):
                "The data types can't be changed after a PanDatFactory has been used.")
         del(self._data_types[table][field])
 
-    def add_data_row_predicate(self, table, predicate, predicate_name = None):
+    def add_data_row_predicate(self, table, predicate, predicate_name = None, vectorized = False):
         """
         Adds a data row predicate for a table. Row predicates can be used to check for
         sophisticated data integrity problems of the sort that can't be easily handled with
@@ -422,7 +559,13 @@ class PanDatFactory(object):
         :param predicate_name: The name of the predicate. If omitted, the smallest non-colliding
                                number will be used.
 
-
+        :param vectorized: boolean. If truthy, then predicate will be passed the entire DataFrame for table
+                           (instead of one row at a time) and should return a boolean Series (aligned with
+                           the DataFrame) that is Truthy for the valid rows and Falsey otherwise.
+                           ex: ```lambda df: df["Min Supply"] <= df["Max Supply"]```
+                           Note - if a vectorized predicate throws an exception, ticdat will re-evaluate it one
+                           row at a time (passing each row dict as the argument), so that only the rows that
+                           throw an exception (or return Falsey) are reported as failures.
 
         :return:
         """
@@ -433,12 +576,17 @@ class PanDatFactory(object):
         if predicate is None:
             if table in self._data_row_predicates:
                 self._data_row_predicates[table].pop(predicate_name, None)
+                self._vectorized_data_row_predicates[table].discard(predicate_name)
             return
 
         verify(callable(predicate), "predicate should be a one argument function")
         if predicate_name is None:
             predicate_name = next(i for i in count() if i not in self._data_row_predicates[table])
         self._data_row_predicates[table][predicate_name] = predicate
+        if vectorized:
+            self._vectorized_data_row_predicates[table].add(predicate_name)
+        else:
+            self._vectorized_data_row_predicates[table].discard(predicate_name)
 
     def add_parameter(self, name, default_value, number_allowed = True,
                       inclusive_min = True, inclusive_max = False, min = 0, max = float("inf"),
@@ -567,25 +715,28 @@ class PanDatFactory(object):
             del(self._foreign_keys[nt,ft])
     @property
     def foreign_keys(self):
-        rtn = []
-        for (native,foreign), nativeforeignmappings in self._foreign_keys.items():
-            for n_f_mapping in nativeforeignmappings :
-                mappings = tuple(ForeignKeyMapping(nf,ff) for nf,ff in n_f_mapping)
-                mappings = mappings[0] if len(mappings)==1 else mappings
-                def half_card(tbl, fields):
-                    assert fields.issubset(self._all_fields(tbl))
-                    pkfs = self.primary_key_fields.get(tbl, ())
-                    if pkfs and fields.issuperset(pkfs):
-                        return "one"
-                    return "many"
-                cardinality = "%s-to-%s"%(half_card(native, {_[0] for _ in n_f_mapping}),
-                                          half_card(foreign, {_[1] for _ in n_f_mapping}))
-                rtn.append(ForeignKey(native, foreign, mappings, cardinality))
-        assert len(rtn) == len(set(rtn))
-        return tuple(rtn)
+        def make_foreign_keys():
+            rtn = []
+            for (native,foreign), nativeforeignmappings in self._foreign_keys.items():
+                for n_f_mapping in nativeforeignmappings :
+                    mappings = tuple(ForeignKeyMapping(nf,ff) for nf,ff in n_f_mapping)
+                    mappings = mappings[0] if len(mappings)==1 else mappings
+                    def half_card(tbl, fields):
+                        assert fields.issubset(self._all_fields(tbl))
+                        pkfs = self.primary_key_fields.get(tbl, ())
+                        if pkfs and fields.issuperset(pkfs):
+                            return "one"
+                        return "many"
+                    cardinality = "%s-to-%s"%(half_card(native, {_[0] for _ in n_f_mapping}),
+                                              half_card(foreign, {_[1] for _ in n_f_mapping}))
+                    rtn.append(ForeignKey(native, foreign, mappings, cardinality))
+            assert len(rtn) == len(set(rtn))
+            return tuple(rtn)
+        return self._cached_once_used("foreign_keys", make_foreign_keys)
     def _all_fields(self, table):
         assert table in self.all_tables
-        return tuple(_ for _ in self.primary_key_fields.get(table, ()) + self.data_fields.get(table, ()))
+        return self._cached_once_used(("all_fields", table), lambda :
+            tuple(_ for _ in self.primary_key_fields.get(table, ()) + self.data_fields.get(table, ())))
     def add_foreign_key(self, native_table, foreign_table, mappings):
         """
         Adds a foreign key relationship to the schema.  Adding a foreign key doesn't block
@@ -626,6 +777,14 @@ class PanDatFactory(object):
         self._foreign_keys[native_table, foreign_table].add(tuple(_mappings.items()))
     def _trigger_has_been_used(self):
         self._has_been_used = True
+    def _cached_once_used(self, key, creator):
+        # once a factory has been used, its schema can't change, so schema derived objects can be reused
+        # (all the schema editing routines refuse to run on a used factory, so the cache never goes stale)
+        if not self._has_been_used:
+            return creator()
+        if key not in self._used_schema_cache:
+            self._used_schema_cache[key] = creator()
+        return self._used_schema_cache[key]
     def __init__(self, **init_fields):
         """
         create a PanDatFactory
@@ -644,6 +803,7 @@ class PanDatFactory(object):
         """
         verify(DataFrame and pd, "Need to install pandas in order to create a PanDatFactory")
         self._has_been_used = False
+        self._used_schema_cache = {} # schema derived objects that can be reused once the schema is locked
         verify(not any(x.startswith("_") for x in init_fields),
                "table names shouldn't start with underscore")
         verify(not any(" " in x for x in init_fields), "table names shouldn't have white space")
@@ -673,6 +833,7 @@ class PanDatFactory(object):
                 self._default_values[tbl][fld] = 0
         self._data_types = clt.defaultdict(dict)
         self._data_row_predicates = clt.defaultdict(dict)
+        self._vectorized_data_row_predicates = clt.defaultdict(set)
         self._foreign_keys = clt.defaultdict(set)
         self._parameters = {}
         self._infinity_io_flag = ["N/A"]
@@ -794,12 +955,16 @@ class PanDatFactory(object):
         tdf = TicDatFactory(**sch)
         def df(t):
             rtn = getattr(pan_dat, t)
-            if self.primary_key_fields.get(t, ()):
-                return rtn.set_index(list(self.primary_key_fields[t]), drop=False)
-            if t in self.generic_tables and not keep_generics_as_df:
-                return list(map(list, rtn.itertuples(index=False)))
-            return rtn
-        return tdf.TicDat(**{t: df(t) for t in self.all_tables})
+            if t in self.generic_tables:
+                return rtn if keep_generics_as_df else list(map(list, rtn.itertuples(index=False)))
+            # the rows are assembled from whole columns, which is much faster than iterating over the DataFrame
+            pks, dfs = self.primary_key_fields.get(t, ()), self.data_fields.get(t, ())
+            data = list(zip(*[rtn[f].tolist() for f in dfs])) if dfs else [()] * len(rtn)
+            if not pks:
+                return data
+            keys = rtn[pks[0]].tolist() if len(pks) == 1 else list(zip(*[rtn[f].tolist() for f in pks]))
+            return dict(zip(keys, data))
+        return tdf.TicDat.from_rows(trusted=True, **{t: df(t) for t in self.all_tables})
     def _same_data(self, obj1, obj2, epsilon = 0, nans_are_same_for_data_rows = False):
         from ticdat import TicDatFactory
         sch = self.schema()
@@ -819,14 +984,16 @@ class PanDatFactory(object):
         for more info
         :return:
         '''
-        tmp_pdf = PanDatFactory.create_from_full_schema(self.schema(include_ancillary_info=True))
-        for t, pks in self.primary_key_fields.items():
-            for pk in pks:
-                if pk not in self._data_types.get(t, ()):
-                    tmp_pdf.set_data_type(t, pk, number_allowed=True,
-                      inclusive_min=True, inclusive_max=True, min=-float("inf"), max=float("inf"),
-                      must_be_int=False, strings_allowed='*', nullable=False, datetime=False)
-        return tmp_pdf.data_types
+        def make_true_data_types():
+            tmp_pdf = PanDatFactory.create_from_full_schema(self.schema(include_ancillary_info=True))
+            for t, pks in self.primary_key_fields.items():
+                for pk in pks:
+                    if pk not in self._data_types.get(t, ()):
+                        tmp_pdf.set_data_type(t, pk, number_allowed=True,
+                          inclusive_min=True, inclusive_max=True, min=-float("inf"), max=float("inf"),
+                          must_be_int=False, strings_allowed='*', nullable=False, datetime=False)
+            return tmp_pdf.data_types
+        return self._cached_once_used("true_data_types", make_true_data_types)
     def find_data_type_failures(self, pan_dat, as_table=True):
         """
         Finds the data type failures for a pandat object
@@ -854,17 +1021,20 @@ class PanDatFactory(object):
                "pan_dat not a good object for this factory : %s"%"\n".join(msg))
 
 
-        rtn = {}
         TableField = clt.namedtuple("TableField", ["table", "field"])
-        for table, type_row in self._true_data_types().items():
+        rtn = {}
+        for (table, field), where_bad_rows in self._data_type_failure_masks(pan_dat, self._true_data_types()).items():
+            _table = getattr(pan_dat, table)
+            rtn[TableField(table, field)] = _table[where_bad_rows].copy() if as_table else where_bad_rows
+        return rtn
+    def _data_type_failure_masks(self, pan_dat, data_types):
+        rtn = {}
+        for table, type_row in data_types.items():
             _table = getattr(pan_dat, table)
             for field, data_type in type_row.items():
-                def bad_row(row):
-                    data = row[field]
-                    return not data_type.valid_data(None if isnull(data) else data)
-                where_bad_rows = _faster_df_apply(_table, bad_row)
+                where_bad_rows = _data_type_failure_mask(_table[field], data_type)
                 if where_bad_rows.any():
-                    rtn[TableField(table, field)] = _table[where_bad_rows].copy() if as_table else where_bad_rows
+                    rtn[table, field] = where_bad_rows
         return rtn
     def replace_data_type_failures(self, pan_dat, replacement_values=None):
         """
@@ -898,24 +1068,26 @@ class PanDatFactory(object):
             verify(table in self.all_tables, "%s is not a table for this schema"%table)
             verify(field in self._all_fields(table), "%s is not a field for %s"%(field, table))
 
-        replacements_needed = self.find_data_type_failures(pan_dat, as_table=False)
+        true_data_types = self._true_data_types()
+        replacements_needed = self._data_type_failure_masks(pan_dat, true_data_types)
         if not replacements_needed:
             return pan_dat
 
         real_replacements = {}
-        for table, type_row in self._true_data_types().items():
+        for table, type_row in true_data_types.items():
             for field in type_row:
                 if ((table, field) in replacement_values) or (field in self.default_values.get(table, {})):
                     real_replacements[table, field] = replacement_values.get((table, field),
                         self.default_values[table][field])
         for (table, field), value in real_replacements.items():
-            verify(self._true_data_types()[table][field].valid_data(value),
+            verify(true_data_types[table][field].valid_data(value),
                    "The replacement value %s is not itself valid for %s : %s"%(value, table, field))
 
         for (table, field), rows in replacements_needed.items() :
             if (table, field) in real_replacements:
                 getattr(pan_dat, table).loc[rows, field] = real_replacements[table, field]
-        assert not set(self.find_data_type_failures(pan_dat)).intersection(real_replacements)
+        assert not any(_data_type_failure_mask(getattr(pan_dat, t)[f], true_data_types[t][f]).any()
+                       for t, f in set(replacements_needed).intersection(real_replacements))
         return pan_dat
     def find_data_row_failures(self, pan_dat, as_table=True):
         """
@@ -935,11 +1107,19 @@ class PanDatFactory(object):
         for this specific table, predicate pair (or the Series that identifies these rows).
 
          Note - if a row predicate throws an exception, find_data_row_failures will ignore the exception
-         and it will be reported as if the predicate returned False.
+         and it will be reported as if the predicate returned False. (For predicates added with vectorized=True,
+         an exception results in the predicate being re-evaluated one row at a time).
         """
         msg = []
         verify(self.good_pan_dat_object(pan_dat, msg.append),
                "pan_dat not a good object for this factory : %s"%"\n".join(msg))
+        rtn = {}
+        TPN = clt.namedtuple("TablePredicateName", ["table", "predicate_name"])
+        for (tbl, pn), where_bad_rows in self._data_row_failure_masks(pan_dat).items():
+            _table = getattr(pan_dat, tbl)
+            rtn[TPN(tbl, pn)] = _table[where_bad_rows].copy() if as_table else where_bad_rows
+        return rtn
+    def _data_row_failure_masks(self, pan_dat):
         data_row_predicates = {k: dict(v) for k,v in self._data_row_predicates.items()}
         if self._parameters:
             def good_parameter(row):
@@ -956,19 +1136,34 @@ class PanDatFactory(object):
             data_row_predicates["parameters"][predicate_name] = good_parameter
 
         rtn = {}
-        TPN = clt.namedtuple("TablePredicateName", ["table", "predicate_name"])
         for tbl, row_predicates in data_row_predicates.items():
+            _table = getattr(pan_dat, tbl)
+            masks, row_by_row = {}, []
             for pn, p in row_predicates.items():
-                def _p(row):
-                    try:
-                        return p(row)
-                    except:
-                        return False
-                _table = getattr(pan_dat, tbl)
-                bad_row = lambda row: not _p(row)
-                where_bad_rows = _faster_df_apply(_table, bad_row)
-                if where_bad_rows.any():
-                    rtn[TPN(tbl, pn)] = _table[where_bad_rows].copy() if as_table else where_bad_rows
+                if pn in self._vectorized_data_row_predicates.get(tbl, ()):
+                    masks[pn] = _vectorized_predicate_failures(_table, p)
+                if masks.get(pn) is None:
+                    row_by_row.append((pn, p))
+            if row_by_row:
+                # the table is walked once for all the row-by-row predicates, but each predicate gets its own
+                # row dict, so that a predicate that edits its row can't affect the others
+                def bad_rows(row):
+                    rtn = []
+                    for pn, p in row_by_row:
+                        try:
+                            rtn.append(not p(dict(zip(cols, row))))
+                        except:
+                            rtn.append(True)
+                    return rtn
+                cols = list(_table.columns)
+                all_bad_rows = np.array([bad_rows(row)
+                                         for row in _table.itertuples(index=False, name=None)],
+                                        dtype=bool).reshape(len(_table), len(row_by_row))
+                for i, (pn, p) in enumerate(row_by_row):
+                    masks[pn] = pd.Series(all_bad_rows[:, i], index=_table.index)
+            for pn in row_predicates:
+                if masks[pn].any():
+                    rtn[tbl, pn] = masks[pn]
         return rtn
     def find_foreign_key_failures(self, pan_dat, verbosity="High", as_table=True):
         """
@@ -979,9 +1174,8 @@ class PanDatFactory(object):
         :param verbosity: either "High" or "Low"
 
         :param as_table: as_table boolean : if truthy then the values of the return dictionary will be the
-               failed rows themselves. Otherwise will return the a boolean list that indicates which rows
-               have failures. (For technical reasons, not returning a boolean Series like the
-               other find functions)
+               failed rows themselves. Otherwise will return the boolean Series that indicates which rows
+               have failures.
 
         :return: A dictionary constructed as follows:
 
@@ -993,13 +1187,11 @@ class PanDatFactory(object):
 
          The values are DataFrames that contain the subset of native table rows that fail to find
          the foreign table matching defined by the associated returned key (or the
-         list that identifies these rows).
+         Series that identifies these rows).
 
          For verbosity = 'Low' a simpler return object is created that doesn't use namedtuples
          and omits the foreign key cardinality.
         """
-        # note - the as_table argument is messy here because I'm applying an index to a copy of the table
-        # as a result, we provide the remove_foreign_key_failures companion function
         verify(verbosity in ["High", "Low"], "verbosity needs to be either 'High' or 'Low'")
         rtn = {}
         for fk, rows in self._find_foreign_key_failure_rows(pan_dat).items():
@@ -1012,38 +1204,30 @@ class PanDatFactory(object):
         msg  = []
         verify(self.good_pan_dat_object(pan_dat, msg.append),
                "pan_dat not a good object for this factory : %s"%"\n".join(msg))
-        rtn = {}
+        return self._foreign_key_failure_masks(pan_dat)
+    def _foreign_key_failure_masks(self, pan_dat):
+        rtn, look_into = {}, {}
         for fk in self.foreign_keys:
-            native, foreign, mappings, card = fk
-            child = getattr(pan_dat, native).copy(deep=True)
-            # makes sense to deep copy the possibly smaller drop_duplicates slice of the parent table
-            parent = getattr(pan_dat, foreign)
-            _ = 0
-            while any("_%s_"%_ in c for c in set(parent.columns).union(child.columns)):
-                _ += 1
-            magic_field = "_%s_"%_
-            if all(hasattr(mappings, _) for _ in ["native_field", "foreign_field"]):
-                parent = parent.drop_duplicates(mappings.foreign_field, inplace=False).copy(deep=True)
-                parent[mappings.native_field] = parent[mappings.foreign_field]
-                new_index = mappings.native_field
-            else:
-                parent = parent.drop_duplicates([_.foreign_field for _ in mappings], inplace=False).copy(deep=True)
-                for _ in mappings:
-                    parent[_.native_field] = parent[_.foreign_field]
-                new_index = [_.native_field for _ in mappings]
-            # sadly a join might knacker the row order, hence the ugliness with magic_field*2 for child
-            parent[magic_field] = True
-            child.insert(0, magic_field*2, range(0, len(child)))
-            parent.set_index(new_index, drop=True, inplace=True)
-            child.set_index(new_index, drop=True, inplace=True)
-            joined = child.join(parent, rsuffix=magic_field)
-            bad_rows = set(joined[joined[magic_field] != True][magic_field*2])
-            if bad_rows:
-                # I'm casting to list here because child is a copy that doesn't have the original index
-                # This is fixable, (i.e. we could return a Series with an index matching the original child table)
-                # but the fix isn't high priority.
-                rtn[fk] = list(_faster_df_apply(child, lambda row: row[magic_field*2] in bad_rows))
+            bad_rows = self._foreign_key_failure_mask(pan_dat, fk, look_into)
+            if bad_rows.any():
+                rtn[fk] = bad_rows
         return rtn
+    def _foreign_key_failure_mask(self, pan_dat, fk, look_into=None):
+        # boolean Series, aligned with the native table, that flags the rows that can't find a foreign match
+        # look_into, if provided, caches the foreign values so they can be shared across foreign keys
+        native, foreign, mappings, card = fk
+        child, parent = getattr(pan_dat, native), getattr(pan_dat, foreign)
+        look_into = {} if look_into is None else look_into
+        if all(hasattr(mappings, _) for _ in ["native_field", "foreign_field"]):
+            if (foreign, mappings.foreign_field) not in look_into:
+                look_into[foreign, mappings.foreign_field] = parent[mappings.foreign_field].unique()
+            good = child[mappings.native_field].isin(look_into[foreign, mappings.foreign_field]).to_numpy()
+        else:
+            ffs = tuple(_.foreign_field for _ in mappings)
+            if (foreign, ffs) not in look_into:
+                look_into[foreign, ffs] = pd.MultiIndex.from_frame(parent[list(ffs)])
+            good = pd.MultiIndex.from_frame(child[[_.native_field for _ in mappings]]).isin(look_into[foreign, ffs])
+        return pd.Series(~good, index=child.index)
     def create_full_parameters_dict(self, dat):
         """
         create a fully populated dictionary of all the parameters
@@ -1075,15 +1259,24 @@ class PanDatFactory(object):
                  Note that all foreign key removals are cascading. When a child removal results in
                  new foreign key failures, those failures are removed as well.
         """
-        remove_rows = self._find_foreign_key_failure_rows(pan_dat)
-        while remove_rows:
-            # just performing one bulk removal per iteration, since fks can intermingle in complicated ways
-            fk = next(iter(remove_rows))
-            native, foreign, mappings, card = fk
-            rows = remove_rows[fk]
-            setattr(pan_dat, native, getattr(pan_dat, native)[[not _ for _ in rows]].copy(deep=True))
-            remove_rows = self._find_foreign_key_failure_rows(pan_dat)
-
+        msg  = []
+        verify(self.good_pan_dat_object(pan_dat, msg.append),
+               "pan_dat not a good object for this factory : %s"%"\n".join(msg))
+        fks_by_foreign = clt.defaultdict(list)
+        for fk in self.foreign_keys:
+            fks_by_foreign[fk.foreign_table].append(fk)
+        # a removal can only create new failures for the foreign keys that point to the table that lost rows
+        to_check = clt.deque(self.foreign_keys)
+        while to_check:
+            fk = to_check.popleft()
+            bad_rows = self._foreign_key_failure_mask(pan_dat, fk).to_numpy()
+            if bad_rows.any():
+                df = getattr(pan_dat, fk.native_table)
+                if df.index.is_unique:
+                    df.drop(index=df.index[bad_rows], inplace=True)
+                else:
+                    setattr(pan_dat, fk.native_table, df[~bad_rows].copy())
+                to_check.extend(_ for _ in fks_by_foreign[fk.native_table] if _ not in to_check)
         return pan_dat
     def find_duplicates(self, pan_dat, keep="first", as_table=True):
         """
@@ -1105,13 +1298,162 @@ class PanDatFactory(object):
         msg  = []
         verify(self.good_pan_dat_object(pan_dat, msg.append),
                "pan_dat not a good object for this factory : %s"%"\n".join(msg))
+        return {t: getattr(pan_dat, t)[list(dups)] if as_table else dups
+                for t, dups in self._duplicate_masks(pan_dat, keep).items()}
+    def _duplicate_masks(self, pan_dat, keep="first"):
         rtn = {}
         for t in self.all_tables:
             if self.primary_key_fields.get(t):
                 dups = getattr(pan_dat, t).duplicated(list(self.primary_key_fields[t]), keep=keep)
                 if dups.any():
-                    rtn[t] = getattr(pan_dat, t)[list(dups)] if as_table else dups
+                    rtn[t] = dups
         return rtn
+    def find_all_failures(self, pan_dat, as_table=True):
+        """
+        Performs all the data integrity checks for a pandat object. This is equivalent to calling
+        find_duplicates, find_data_type_failures, find_data_row_failures and find_foreign_key_failures
+        (with their default arguments, aside from as_table) except that pan_dat is only validated once, and
+        the checks share their work where possible.
+
+        :param pan_dat: a pandat object
+
+        :param as_table: boolean - if truthy then the values of the various failure dictionaries will be
+                         the failed rows themselves. Otherwise will return the boolean Series that identify these
+                         rows.
+
+        :return: A namedtuple with members "duplicates", "data_type_failures", "data_row_failures",
+                 "foreign_key_failures" and "timings". The first four members are the dictionaries that would
+                 be returned by the corresponding find_ function. timings is a dictionary mapping each
+                 step of the work ("good_pan_dat_object", "duplicates", "data_type_failures",
+                 "data_row_failures", "foreign_key_failures") to the number of seconds it took.
+        """
+        timings = {}
+        start = time.perf_counter()
+        def record_time(step):
+            nonlocal start
+            timings[step] = time.perf_counter() - start
+            start = time.perf_counter()
+        msg  = []
+        verify(self.good_pan_dat_object(pan_dat, msg.append),
+               "pan_dat not a good object for this factory : %s"%"\n".join(msg))
+        record_time("good_pan_dat_object")
+        filtered = lambda t, rows: getattr(pan_dat, t)[rows].copy() if as_table else rows
+
+        duplicates = {t: getattr(pan_dat, t)[list(dups)] if as_table else dups
+                      for t, dups in self._duplicate_masks(pan_dat).items()}
+        record_time("duplicates")
+
+        TableField = clt.namedtuple("TableField", ["table", "field"])
+        data_type_failures = {TableField(t, f): filtered(t, rows) for (t, f), rows in
+                              self._data_type_failure_masks(pan_dat, self._true_data_types()).items()}
+        record_time("data_type_failures")
+
+        TPN = clt.namedtuple("TablePredicateName", ["table", "predicate_name"])
+        data_row_failures = {TPN(t, pn): filtered(t, rows) for (t, pn), rows in
+                             self._data_row_failure_masks(pan_dat).items()}
+        record_time("data_row_failures")
+
+        foreign_key_failures = {fk: getattr(pan_dat, fk.native_table)[rows] if as_table else rows
+                                for fk, rows in self._foreign_key_failure_masks(pan_dat).items()}
+        record_time("foreign_key_failures")
+
+        AllFailures = clt.namedtuple("AllFailures", ["duplicates", "data_type_failures", "data_row_failures",
+                                                     "foreign_key_failures", "timings"])
+        return AllFailures(duplicates, data_type_failures, data_row_failures, foreign_key_failures, timings)
+    def diff(self, pan_dat1, pan_dat2, epsilon=0, nans_are_same=True):
+        """
+        Finds the differences between two pandat objects.
+
+        :param pan_dat1: the "before" pandat object
+
+        :param pan_dat2: the "after" pandat object
+
+        :param epsilon: a non-negative number. Two numbers are treated as the same if their relative difference
+                        (as computed by ticdat.utils.per_error) is less than epsilon. Only used when comparing
+                        the data fields of tables with primary key fields.
+
+        :param nans_are_same: boolean. If truthy, then two null values (i.e. NaN or None) are treated as the same.
+
+        :return: A dictionary whose keys are the names of the tables that differ and whose values are
+                 namedtuples with members "added", "removed" and "changed".
+                 For tables with primary key fields, rows are matched by primary key. "added" holds the rows of
+                 pan_dat2 whose primary key isn't in pan_dat1, "removed" holds the rows of pan_dat1 whose
+                 primary key isn't in pan_dat2, and "changed" holds the rows of pan_dat2 whose data fields differ
+                 from those of the pan_dat1 row with the same primary key.
+                 For other tables, the rows are compared as a whole, so "added" holds the rows of pan_dat2 that
+                 can't be matched to a row of pan_dat1, "removed" holds the rows of pan_dat1 that can't be
+                 matched to a row of pan_dat2, and "changed" is always empty. Duplicated rows are matched one
+                 for one.
+                 The rows themselves keep the index of the pandat table they came from.
+        """
+        for i, pan_dat in enumerate([pan_dat1, pan_dat2]):
+            msg  = []
+            verify(self.good_pan_dat_object(pan_dat, msg.append),
+                   "pan_dat%s not a good object for this factory : %s"%(i+1, "\n".join(msg)))
+            verify(not self._duplicate_masks(pan_dat, keep=False),
+                   "pan_dat%s has duplicated primary keys. See find_duplicates"%(i+1))
+        verify(utils.numericish(epsilon) and epsilon >= 0, "epsilon should be a non-negative number")
+        TableDiff = clt.namedtuple("TableDiff", ["added", "removed", "changed"])
+        rtn = {}
+        for t in self.all_tables:
+            df1, df2 = getattr(pan_dat1, t), getattr(pan_dat2, t)
+            if self.primary_key_fields.get(t):
+                added, removed, changed = self._diff_by_primary_key(t, df1, df2, epsilon, nans_are_same)
+            else:
+                added, removed = self._diff_as_multisets(df1, df2, nans_are_same)
+                changed = pd.Series(False, index=df2.index)
+            if added.any() or removed.any() or changed.any():
+                rtn[t] = TableDiff(df2[added.values], df1[removed.values], df2[changed.values])
+        return rtn
+    def _diff_by_primary_key(self, table, df1, df2, epsilon, nans_are_same):
+        # returns the added, removed and changed masks, matching the rows of df1 and df2 by primary key
+        pks = list(self.primary_key_fields[table])
+        index = lambda df: pd.MultiIndex.from_frame(df[pks]) if len(pks) > 1 else pd.Index(df[pks[0]])
+        matches = index(df1).get_indexer(index(df2)) # the position in df1 of each df2 row (-1 if added)
+        added = pd.Series(matches < 0, index=df2.index)
+        removed = np.ones(len(df1), dtype=bool)
+        removed[matches[matches >= 0]] = False
+        removed = pd.Series(removed, index=df1.index)
+        changed = pd.Series(False, index=df2.index)
+        for f in self.data_fields.get(table, ()):
+            v1 = df1[f].iloc[np.where(matches < 0, 0, matches)].reset_index(drop=True) if len(df1) else \
+                 pd.Series([None] * len(df2))
+            v2 = df2[f].reset_index(drop=True)
+            same = v1 == v2
+            if nans_are_same:
+                same |= v1.isnull() & v2.isnull()
+            if epsilon:
+                # the tolerance is only for cells that are numbers in both frames (so not for strings like "007")
+                numbers = _numbers_mask(v1) & _numbers_mask(v2)
+                n1, n2 = pd.to_numeric(v1.where(numbers), errors="coerce"), pd.to_numeric(v2.where(numbers),
+                                                                                           errors="coerce")
+                bigger = np.maximum(n1.abs(), n2.abs())
+                # vectorized version of utils.nearly_same
+                same |= numbers & (((n1 - n2).abs() < epsilon * bigger) | (bigger <= 1e-10))
+            changed |= ~same.values
+        return added, removed, changed & ~added
+    def _diff_as_multisets(self, df1, df2, nans_are_same):
+        # returns the added and removed masks, matching the rows of df1 and df2 as a whole
+        if set(df1.columns) != set(df2.columns):
+            return pd.Series(True, index=df2.index), pd.Series(True, index=df1.index)
+        fields = list(df1.columns)
+        occurrence, position = "_ticdat_diff_occurrence", "_ticdat_diff_position"
+        def with_occurrences(df, offset):
+            rtn = df[fields].reset_index(drop=True)
+            rtn[occurrence] = rtn.groupby(fields, dropna=False, sort=False).cumcount() if fields else \
+                              range(len(rtn))
+            rtn[position] = range(len(rtn))
+            if not nans_are_same and fields:
+                # a row with a null value can't match anything, so gets an occurrence value that is unique
+                # across both frames (offset keeps those of df2 clear of those of df1)
+                rtn.loc[rtn[fields].isnull().any(axis=1).values, occurrence] = -1 - offset - rtn[position]
+            return rtn
+        occ1, occ2 = with_occurrences(df1, 0), with_occurrences(df2, len(df1))
+        merged = occ1.merge(occ2, on=fields + [occurrence], how="outer", indicator=True, suffixes=("_1", "_2"))
+        removed, added = pd.Series(False, index=df1.index), pd.Series(False, index=df2.index)
+        removed.iloc[merged[position + "_1"][merged["_merge"] == "left_only"].astype(int).values] = True
+        added.iloc[merged[position + "_2"][merged["_merge"] == "right_only"].astype(int).values] = True
+        return added, removed
     def copy_to_ampl(self, pan_dat, field_renamings = None, excluded_tables = None):
         """
         copies the pan_dat object into a new pan_dat object populated with amplpy.DataFrame objects
@@ -10,6 +10,7 @@ from ticdat.utils import freezable_factory, verify, case_space_to_pretty, pd, Ti
 from ticdat.utils import all_underscore_replacements, stringish, dictish
 from itertools import product, chain
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import inspect
 try:
     import numpy
@@ -215,7 +216,7 @@ class CsvPanFactory(freezable_factory(object, "_isFrozen")):
         """
         self.pan_dat_factory = pan_dat_factory
         self._isFrozen = True
-    def create_pan_dat(self, dir_path, fill_missing_fields=False, **kwargs):
+    def create_pan_dat(self, dir_path, fill_missing_fields=False, max_workers=None, **kwargs):
         """
         Create a PanDat object from a directory of csv files.
 
@@ -225,6 +226,9 @@ class CsvPanFactory(freezable_factory(object, "_isFrozen")):
                                     with their default value. Otherwise, missing fields
                                     throw an Exception.
 
+        :param max_workers: None or a positive integer. If an integer, the files are read concurrently on a pool
+                            of (up to) this many threads. (The pandas C parser releases the GIL, so threads suffice).
+
         :param kwargs: additional named arguments to pass to pandas.read_csv
 
         :return: a PanDat object populated by the matching tables.
@@ -246,13 +250,19 @@ class CsvPanFactory(freezable_factory(object, "_isFrozen")):
         This problem is even worse with df = pd.DataFrame({"a":["0100", "1200", "2300"]})
         """
         verify(os.path.isdir(dir_path), "%s not a directory path"%dir_path)
+        verify(max_workers is None or (isinstance(max_workers, int) and max_workers > 0),
+               "max_workers should be None or a positive integer")
         tbl_names = self._get_table_names(dir_path)
-        rtn = {}
-        for t, f in tbl_names.items():
+        def read_table(t):
             kwargs_ = dict(kwargs)
             if "dtype" not in kwargs_:
                 kwargs_["dtype"] = self.pan_dat_factory._dtypes_for_pandas_read(t)
-            rtn[t] = pd.read_csv(f, **kwargs_)
+            return pd.read_csv(tbl_names[t], **kwargs_)
+        if max_workers and len(tbl_names) > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(tbl_names))) as executor:
+                rtn = dict(zip(tbl_names, executor.map(read_table, tbl_names)))
+        else:
+            rtn = {t: read_table(t) for t in tbl_names}
         missing_tables = {t for t in self.pan_dat_factory.all_tables if t not in rtn}
         if missing_tables:
             print ("The following table names could not be found in the %s directory.\n%s\n"%
@@ -364,7 +374,7 @@ class SqlPanFactory(freezable_factory(object, "_isFrozen")):
         with con_maker() as _:
             con_ = con or _
             for t, s in self._get_table_names(con_).items():
-                rtn[t] = pd.read_sql(sql="Select * from [%s]"%s, con=con_)
+                rtn[t] = pd.read_sql(sql=self._select_sql(con_, t, s), con=con_)
         missing_fields = {(t, f) for t in rtn for f in all_fields(self.pan_dat_factory, t)
                           if f not in rtn[t].columns}
         if fill_missing_fields:
@@ -378,6 +388,15 @@ class SqlPanFactory(freezable_factory(object, "_isFrozen")):
                   "\n".join(missing_tables))
         return _clean_pandat_creator(self.pan_dat_factory, rtn)
 
+    def _select_sql(self, con, table, sql_table):
+        # selects just the fields that _clean_pandat_creator keeps, rather than every column of the table
+        if table in self.pan_dat_factory.generic_tables:
+            return "Select * from [%s]"%sql_table
+        columns = {d[0] for d in con.execute("Select * from [%s] LIMIT 0"%sql_table).description}
+        fields = [f for f in all_fields(self.pan_dat_factory, table) if f in columns]
+        if not fields:
+            return "Select * from [%s]"%sql_table
+        return "Select %s from [%s]"%(", ".join("[%s]"%f for f in fields), sql_table)
     def _get_table_names(self, con):
         rtn = {}
         def try_name(name):
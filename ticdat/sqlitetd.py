@@ -4,6 +4,7 @@ PEP8
 """
 import os
 from collections import defaultdict
+from itertools import repeat
 from ticdat.utils import freezable_factory, TicDatError, verify, stringish, dictish, containerish, numericish
 from ticdat.utils import FrozenDict, all_underscore_replacements, find_duplicates
 from ticdat.utils import create_duplicate_focused_tdf, create_generic_free, safe_apply
@@ -68,8 +69,9 @@ class SQLiteTicFactory(freezable_factory(object, "_isFrozen")) :
         self._duplicate_focused_tdf = create_duplicate_focused_tdf(tic_dat_factory)
         self._isFrozen = True
     def _Rtn(self, freeze_it):
-        def rtn(*args, **kwargs):
-            rtn = self.tic_dat_factory.TicDat(*args, **kwargs)
+        def rtn(**kwargs):
+            # the rows are selected field by field, so can be trusted
+            rtn = self.tic_dat_factory.TicDat.from_rows(trusted=True, **kwargs)
             rtn = self.tic_dat_factory._parameter_table_post_read_adjustment(rtn)
             if freeze_it:
                 return self.tic_dat_factory.freeze_me(rtn)
@@ -193,14 +195,56 @@ class SQLiteTicFactory(freezable_factory(object, "_isFrozen")) :
         if stringish(x) and x.lower() == "false":
             return False
         return self.tic_dat_factory._general_read_cell(t, f, x)
+    def _column_readers(self, t, fields):
+        """
+        the converter plan for reading the fields of a table, built from the schema
+        :return: a list of (reader, always) pairs, one for each field. reader is equivalent to _read_data_cell.
+                 If always is falsey, then reader only changes strings (i.e. "inf", "true", "false") and
+                 can be skipped for columns that don't hold any.
+        """
+        tdf = self.tic_dat_factory
+        inf_strings = tdf.infinity_io_flag == "N/A" and not (t == "parameters" and tdf.parameters)
+        def string_reader(x):
+            if x.__class__ is str:
+                lower = x.lower()
+                if inf_strings and lower in ("inf", "-inf"):
+                    return float(x)
+                if lower == "true":
+                    return True
+                if lower == "false":
+                    return False
+            return x
+        rtn = []
+        for f in fields:
+            dt = tdf.data_types.get(t, {}).get(f)
+            always = t != "parameters" and ((dt and dt.datetime) or numericish(tdf.infinity_io_flag) or
+                      (tdf.infinity_io_flag is None and numericish(tdf._none_as_infinity_bias(t, f))))
+            rtn.append(((lambda f : lambda x : self._read_data_cell(t, f, x))(f), True) if always
+                       else (string_reader, False))
+        return rtn
+    def _read_column_batches(self, cursor, t, fields, batch_size=100000):
+        """
+        reads the rows of a cursor a batch at a time, applying the converters of _column_readers only to the
+        columns that need them
+        :return: a generator of batches, each a list of columns (one for each field)
+        """
+        readers = self._column_readers(t, fields)
+        for batch in iter(lambda : cursor.fetchmany(batch_size), []):
+            yield [list(map(reader, col)) if always or str in set(map(type, col)) else col
+                   for (reader, always), col in zip(readers, zip(*batch))]
     def _create_gen_obj(self, db_file_path, table, table_name):
         tdf = self.tic_dat_factory
         def tableObj() :
+            for batch in batches(10000):
+                yield from batch
+        def batches(batch_size):
             assert (not tdf.primary_key_fields.get(table)) and (tdf.data_fields.get(table))
+            fields = tdf.data_fields[table]
             with sql.connect(db_file_path) as con:
-                for row in con.execute("Select %s from [%s]"%
-                        (", ".join(_brackets(tdf.data_fields[table])), table_name)):
-                    yield [self._read_data_cell(table, f, x) for f, x in zip(tdf.data_fields[table], row)]
+                cursor = con.execute("Select %s from [%s]"%(", ".join(_brackets(fields)), table_name))
+                for cols in self._read_column_batches(cursor, table, fields, batch_size):
+                    yield list(zip(*cols))
+        tableObj.batches = batches
         return tableObj
     def _create_tic_dat(self, db_file_path):
         tdf = self.tic_dat_factory
@@ -223,19 +267,17 @@ class SQLiteTicFactory(freezable_factory(object, "_isFrozen")) :
             if not fields:
                 assert table in tdf.generic_tables
                 fields = tuple(x[1] for x in con.execute("PRAGMA table_info(%s)"%table))
-            rtn[table]= {} if tdf.primary_key_fields.get(table, ())  else []
-            for row in con.execute("Select %s from [%s]"%(", ".join(_brackets(fields)),
-                                                          table_names[table])):
+            pklen = len(tdf.primary_key_fields.get(table, ()))
+            rtn[table]= {} if pklen else []
+            cursor = con.execute("Select %s from [%s]"%(", ".join(_brackets(fields)), table_names[table]))
+            for cols in self._read_column_batches(cursor, table, fields):
                 if table in tdf.generic_tables:
-                    rtn[table].append({f:self._read_data_cell(table, f, d) for f, d in zip(fields, row)})
+                    rtn[table].extend(dict(zip(fields, row)) for row in zip(*cols))
+                elif pklen:
+                    pks = cols[0] if pklen == 1 else zip(*cols[:pklen])
+                    rtn[table].update(zip(pks, zip(*cols[pklen:]) if len(fields) > pklen else repeat(())))
                 else:
-                    pkfs = tdf.primary_key_fields.get(table, ())
-                    pk = tuple(self._read_data_cell(table, f, x) for f, x in zip(pkfs, row[:len(pkfs)]))
-                    data = [self._read_data_cell(table, f, x) for f, x in zip(fields[len(pkfs):], row[len(pkfs):])]
-                    if dictish(rtn[table]) :
-                        rtn[table][pk[0] if len(pk) == 1 else tuple(pk)] = data
-                    else :
-                        rtn[table].append(data)
+                    rtn[table].extend(zip(*cols))
         return rtn
     def _ordered_tables(self):
         rtn = []
@@ -279,6 +321,37 @@ class SQLiteTicFactory(freezable_factory(object, "_isFrozen")) :
         if x is True or x is False:
             return str(x)
         return self.tic_dat_factory._infinity_flag_write_cell(t, f, x)
+    def _cell_writer(self, t, f):
+        # returns a function equivalent to _write_data_cell for the (t, f) cells
+        tdf = self.tic_dat_factory
+        if (t == "parameters" and tdf.parameters) or numericish(tdf.infinity_io_flag) or \
+           (tdf.infinity_io_flag is None and tdf._none_as_infinity_bias(t, f)):
+            return lambda x : self._write_data_cell(t, f, x)
+        # the infinity flagging leaves these cells as they are
+        return lambda x : str(x) if x is True or x is False else x
+    def _get_table_rows(self, tic_dat):
+        """
+        :return: a tuple of (insert statement, rows) pairs, one pair for each table. The rows are generators of
+                 lists, so the statement can be passed to executemany along with the rows.
+        """
+        tdf = self.tic_dat_factory
+        rtn = []
+        for t in tdf.all_tables:
+            fields = tdf.primary_key_fields.get(t, ()) + tdf.data_fields.get(t, ())
+            str = "INSERT INTO [%s] (%s) VALUES (%s)"%(t, ",".join(_brackets(fields)), ",".join("?" for _ in fields))
+            rtn.append((str, self._table_rows(t, getattr(tic_dat, t))))
+        return tuple(rtn)
+    def _table_rows(self, t, _t):
+        tdf = self.tic_dat_factory
+        pks, dfs = tuple(tdf.primary_key_fields.get(t, ())), tuple(tdf.data_fields.get(t, ()))
+        if not dictish(_t):
+            # as with _get_data, the cells of the keyless tables are written as they are
+            for row in (_t if containerish(_t) else _t()):
+                yield [row[f] for f in dfs]
+            return
+        writers = [self._cell_writer(t, f) for f in pks + dfs]
+        for pk, row in _t.items():
+            yield [w(x) for w, x in zip(writers, ((pk,) if len(pks) == 1 else pk) + tuple([row[f] for f in dfs]))]
     def _get_data(self, tic_dat, as_sql):
         rtn = []
         for t in self.tic_dat_factory.all_tables:
@@ -320,7 +393,7 @@ class SQLiteTicFactory(freezable_factory(object, "_isFrozen")) :
         with _sql_con(db_file_path, foreign_keys=False) as con:
             for str in self._get_schema_sql(self.tic_dat_factory.all_tables):
                 con.execute(str)
-    def write_db_data(self, tic_dat, db_file_path, allow_overwrite = False):
+    def write_db_data(self, tic_dat, db_file_path, allow_overwrite = False, fast_load = False):
         """
         write the ticDat data to an SQLite database file
 
@@ -330,6 +403,10 @@ class SQLiteTicFactory(freezable_factory(object, "_isFrozen")) :
 
         :param allow_overwrite: boolean - are we allowed to overwrite pre-existing data
 
+        :param fast_load: boolean - should the rollback journal and the syncing to disk be turned off while
+                          writing? This is much faster for large data, but a crash part way through the write
+                          can leave the database file corrupt.
+
         :return:
 
         caveats : True, False are written as "True", "False". Also see infinity_io_flag __doc__
@@ -341,19 +418,23 @@ class SQLiteTicFactory(freezable_factory(object, "_isFrozen")) :
         verify(not os.path.isdir(db_file_path), "A directory is not a valid SQLite file path")
         if self.tic_dat_factory.generic_tables:
              dat, tdf = create_generic_free(tic_dat, self.tic_dat_factory)
-             return tdf.sql.write_db_data(dat, db_file_path, allow_overwrite)
+             return tdf.sql.write_db_data(dat, db_file_path, allow_overwrite, fast_load)
         if not os.path.exists(db_file_path) :
             self.write_db_schema(db_file_path)
         table_names = self._check_tables_fields(db_file_path, self.tic_dat_factory.all_tables)
         with _sql_con(db_file_path, foreign_keys=False) as con:
+            if fast_load: # these only apply to this connection
+                con.execute("PRAGMA journal_mode = OFF")
+                con.execute("PRAGMA synchronous = OFF")
             for t in self.tic_dat_factory.all_tables:
                 verify(table_names.get(t) == t, "Failed to find table %s in path %s"%
                                             (t, db_file_path))
                 verify(allow_overwrite or not any(True for _ in  con.execute("Select * from [%s]"%t)),
                         "allow_overwrite is False, but there are already data records in %s"%t)
                 con.execute("Delete from [%s]"%t) if allow_overwrite else None
-            for sql_str, data in self._get_data(tic_dat, as_sql=False):
-                con.execute(sql_str, list(data))
+            # the deletes and inserts are all one transaction, committed when the with block exits
+            for sql_str, rows in self._get_table_rows(tic_dat):
+                con.executemany(sql_str, rows)
 
     def write_sql_file(self, tic_dat, sql_file_path, include_schema = False,
                        allow_overwrite = False):
@@ -251,6 +251,9 @@ class TestCsv(unittest.TestCase):
             ticDat5b = tdf5b.csv.create_tic_dat(dirPath, headers_present=headersPresent)
             self.assertTrue(tdf5b._same_data(tdf._keyless(ticDat), ticDat5b))
             self.assertTrue(callable(ticDat5b.a) and callable(ticDat5b.c) and not callable(ticDat5b.b))
+            batches = list(ticDat5b.a.batches(batch_size=2))
+            self.assertTrue(all(len(_) <= 2 for _ in batches) and
+                            [r for b in batches for r in b] == [tuple(r.values()) for r in ticDat5b.a()])
 
 
             ticDat6 = tdf6.csv.create_tic_dat(dirPath, headers_present=headersPresent)
@@ -433,6 +436,67 @@ class TestCsv(unittest.TestCase):
         self.assertTrue(raw_tdf._same_data(dat_nums, dat_nums_2))
         self.assertTrue(raw_tdf._same_data(dat_strs, dat_strs_2))
 
+    def testRowReading(self):
+        if not self.can_run:
+            return
+        tdf = TicDatFactory(table=[["pk one", "pk two"], ["data one", "data two"]], keyless=[[], ["a", "b"]])
+        dir_path = makeCleanDir(os.path.join(_scratchDir, "row_reading"))
+        with open(os.path.join(dir_path, "table.csv"), "w") as f:
+            f.write("Data Two,extra,PK TWO,pk one,data one\n")
+            f.write("1.5,junk,b,a,2\n\n")
+            f.write("x,junk,d,c,\n")
+            f.write("3,junk,f,e\n")
+        with open(os.path.join(dir_path, "keyless.csv"), "w") as f:
+            f.write("b,a\n1,2\n1,2\n3,4\n")
+        dat = tdf.csv.create_tic_dat(dir_path)
+        self.assertTrue(tdf._same_data(dat, tdf.TicDat(table=[["a", "b", 2, 1.5], ["c", "d", "", "x"],
+                                                              ["e", "f", None, 3]],
+                                                       keyless=[[2, 1], [2, 1], [4, 3]])))
+        self.assertFalse(tdf.csv.find_duplicates(dir_path))
+
+        with open(os.path.join(dir_path, "table.csv"), "w") as f:
+            f.write("a,b,1,2\na,b,3,4\nc,d,5\n")
+        os.remove(os.path.join(dir_path, "keyless.csv"))
+        dat = tdf.csv.create_tic_dat(dir_path, headers_present=False)
+        self.assertTrue(tdf._same_data(dat, tdf.TicDat(table=[["a", "b", 3, 4], ["c", "d", 5, None]])))
+        self.assertTrue(tdf.csv.find_duplicates(dir_path, headers_present=False) == {"table": {("a", "b"): 2}})
+        with open(os.path.join(dir_path, "table.csv"), "a") as f:
+            f.write("e,f,5,6,7\n")
+        self.assertTrue("Need 4 columns" in self.firesException(
+            lambda: tdf.csv.create_tic_dat(dir_path, headers_present=False)))
+
+        with open(os.path.join(dir_path, "table.csv"), "w") as f:
+            f.write("pk one,pk two,data one,Data One\na,b,1,2\n")
+        self.assertTrue("Duplicate field names" in self.firesException(lambda: tdf.csv.create_tic_dat(dir_path)))
+        with open(os.path.join(dir_path, "table.csv"), "w") as f:
+            f.write("pk one,pk two,data one\na,b,1\n")
+        self.assertTrue("Unable to find field name data two" in
+                        self.firesException(lambda: tdf.csv.create_tic_dat(dir_path)))
+
+    def testMaxWorkers(self):
+        if not self.can_run:
+            return
+        tdf = TicDatFactory(**dietSchema(), parameters=[["Key"], ["Value"]])
+        tdf.add_parameter("Big", 10, max=float("inf"), inclusive_max=True)
+        tdf.set_infinity_io_flag(999999999)
+        dat = tdf.TicDat(**{t: getattr(dietData(), t) for t in dietSchema()}, parameters=[["Big", float("inf")]])
+        dir_path = os.path.join(_scratchDir, "max_workers")
+        tdf.csv.write_directory(dat, makeCleanDir(dir_path))
+        dat_1 = tdf.csv.create_tic_dat(dir_path, max_workers=2)
+        self.assertTrue(tdf._same_data(dat, dat_1) and dat_1.parameters["Big"]["Value"] == float("inf"))
+        self.assertTrue(tdf._same_data(tdf.csv.create_tic_dat(dir_path), dat_1))
+
+        tdf_gen = TicDatFactory(categories=tdf.schema()["categories"], foods=[[], ["name", "cost"]])
+        tdf_gen.set_generator_tables(["foods"])
+        tdf_gen.set_infinity_io_flag(999999999)
+        dat_2 = tdf_gen.csv.create_tic_dat(dir_path, max_workers=2)
+        self.assertTrue({k: dict(v) for k, v in dat_2.categories.items()} ==
+                        {k: dict(v) for k, v in dat.categories.items()})
+        self.assertTrue(sorted((r["name"], r["cost"]) for r in dat_2.foods()) ==
+                        sorted((k, v["cost"]) for k, v in dat.foods.items()))
+        self.assertTrue("max_workers" in self.firesException(
+            lambda: tdf.csv.create_tic_dat(dir_path, max_workers=0)))
+
 _scratchDir = TestCsv.__name__ + "_scratch"
 
 # Run the tests.
@@ -121,8 +121,10 @@ class TestPandas(unittest.TestCase):
                             for src, r in oldDat.nodes["Boston"].arcs_destination.items()))
         ticDat = tdf.copy_to_pandas(oldDat, drop_pk_columns=True)
         rebornTicDat = tdf.TicDat(**{t:getattr(ticDat, t) for t in tdf.all_tables})
-        # because we have single pk field tables, dropping the pk columns is probelmatic
-        self.assertFalse(tdf._same_data(rebornTicDat, oldDat))
+        # the single pk field tables have no columns once the pk columns are dropped, but the index
+        # still provides the primary keys
+        self.assertTrue(not len(ticDat.nodes.columns) and len(ticDat.nodes) == len(oldDat.nodes))
+        self.assertTrue(tdf._same_data(rebornTicDat, oldDat))
 
         # but with the default argument all is well
         ticDat = tdf.copy_to_pandas(oldDat)
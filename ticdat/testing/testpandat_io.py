@@ -381,6 +381,10 @@ class TestIO(unittest.TestCase):
         pdf2.sql.write_file(panDat, filePath)
         sqlPanDat = pdf2.sql.create_pan_dat(filePath)
         self.assertTrue(pdf._same_data(panDat, sqlPanDat))
+        pdf3 = PanDatFactory(**dict(dietSchema(), foods=[["name"], []]))
+        sqlPanDat = pdf3.sql.create_pan_dat(filePath)
+        self.assertTrue(list(sqlPanDat.foods.columns) == ["name"] and
+                        set(sqlPanDat.foods["name"]) == set(panDat.foods["name"]))
 
 
         tdf = TicDatFactory(**netflowSchema())
@@ -472,6 +476,9 @@ class TestIO(unittest.TestCase):
         pdf.csv.write_directory(panDat, dirPath)
         panDat2 = pdf.csv.create_pan_dat(dirPath)
         self.assertTrue(pdf._same_data(panDat, panDat2))
+        panDat2 = pdf.csv.create_pan_dat(dirPath, max_workers=3)
+        self.assertTrue(pdf._same_data(panDat, panDat2))
+        self.assertTrue("max_workers" in self.firesException(lambda: pdf.csv.create_pan_dat(dirPath, max_workers=0)))
         pdf2 = PanDatFactory(**{t:'*' for t in pdf.all_tables})
         panDat2 = pdf2.csv.create_pan_dat(dirPath)
         self.assertTrue(pdf._same_data(panDat, panDat2))
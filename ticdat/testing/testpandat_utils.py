@@ -4,7 +4,7 @@ from ticdat.utils import DataFrame, numericish, ForeignKey, ForeignKeyMapping
 import ticdat.utils as utils
 from ticdat.testing.ticdattestutils import fail_to_debugger, flagged_as_run_alone, netflowPandasData
 from ticdat.testing.ticdattestutils import netflowSchema, copy_to_pandas_with_reset, dietSchema, netflowData
-from ticdat.testing.ticdattestutils import addNetflowForeignKeys, sillyMeSchema, dietData, pan_dat_maker
+from ticdat.testing.ticdattestutils import addNetflowForeignKeys, sillyMeSchema, dietData, pan_dat_maker, firesException
 from ticdat.ticdatfactory import TicDatFactory
 import itertools
 from math import isnan
@@ -159,6 +159,54 @@ class TestUtils(unittest.TestCase):
         self.assertTrue(len(errs) == 1)
         self.assertTrue(noneify(errs['foods', 'cost'].itertuples(index=False)) == {('b', None)})
 
+    def testDataTypes_three(self):
+        if not self.canRun:
+            return
+        import datetime
+        from pandas import isnull, Series
+        from ticdat.pandatfactory import _data_type_failure_mask
+        columns = [[1, 2, 3.5, -1, float("inf"), -float("inf"), None, 0],
+                   [1.0, float("nan"), 2.0, 100.0, float("inf")],
+                   [1, 2, 3, 4, 10 ** 30],
+                   ["a", "b", None, "c", 1, 2.5, True, False, "d", 10 ** 30],
+                   [True, False, True],
+                   [datetime.datetime(2020, 1, 1), None, "2020-01-02", "not a date", 12],
+                   list(Series(["2020-1-1", None, "2021-3-3"]).astype("datetime64[ns]")),
+                   [None, float("nan"), None]]
+        type_dictionaries = [utils.TypeDictionary.safe_creator(*_) for _ in
+                             [(True, True, True, 0, float("inf"), False, (), False),
+                              (True, False, True, 0, float("inf"), True, (), True),
+                              (True, True, False, -1, 3, True, ("a", "c"), False),
+                              (True, True, True, -float("inf"), float("inf"), False, "*", True),
+                              (False, True, True, 0, 0, False, ("a", "b"), True),
+                              (True, True, True, 0, 100, True, ("d",), False),
+                              (False, True, True, 0, 0, False, (), True, True),
+                              (False, True, True, 0, 0, False, (), False, True)]]
+        for col, dt in itertools.product(columns, type_dictionaries):
+            for series in [Series(col), Series(col, dtype=object), Series(col, index=[3] * len(col))]:
+                naive = [not dt.valid_data(None if isnull(_) else _) for _ in series]
+                where_bad_rows = _data_type_failure_mask(series, dt)
+                self.assertTrue(list(where_bad_rows) == naive)
+                self.assertTrue(list(where_bad_rows.index) == list(series.index))
+
+    def testInfFlaggingAdjustments(self):
+        if not self.canRun:
+            return
+        pdf = PanDatFactory(table=[["pk"], ["mixed", "floats", "strings"]])
+        pdf.set_infinity_io_flag(100)
+        dat = pdf.PanDat(table=DataFrame({"pk": [1, 2, 3, 4, 5], "mixed": ["a", 150, -200, 50, True],
+                                          "floats": [float("inf"), 1.5, -float("inf"), 100, None],
+                                          "strings": ["a", "b", "c", "d", "e"]}))
+        written = pdf._pre_write_adjustment(dat)
+        self.assertTrue(list(written.table["mixed"]) == ["a", 100, -100, 50, True])
+        self.assertTrue(list(written.table["floats"])[:4] == [100, 1.5, -100, 100])
+        self.assertTrue(list(dat.table["floats"])[:4] == [float("inf"), 1.5, -float("inf"), 100])
+        self.assertTrue(str(written.table["pk"].dtype).startswith("int"))
+        read = pdf._general_post_read_adjustment(written)
+        self.assertTrue(list(read.table["mixed"]) == ["a", float("inf"), -float("inf"), 50, True])
+        self.assertTrue(list(read.table["floats"])[:4] == [float("inf"), 1.5, -float("inf"), float("inf")])
+        self.assertTrue(list(read.table["strings"]) == ["a", "b", "c", "d", "e"])
+
     def testDataPredicates(self):
         if not self.canRun:
             return
@@ -182,14 +230,23 @@ class TestUtils(unittest.TestCase):
         ticdat.categories["3"] = ['a', 100]
         pandat_2 = pdf.copy_pan_dat(copy_to_pandas_with_reset(tdf, ticdat))
 
-        def perform_predicate_checks(sch):
+        def perform_predicate_checks(sch, vectorized=False):
             pdf = PanDatFactory(**sch)
             pdf.add_data_row_predicate("foods", lambda row: numericish(row["cost"]) and not isnan(row["cost"]), "cost")
-            good_qty = lambda qty : 5 < qty <= 12
-            pdf.add_data_row_predicate("nutritionQuantities", lambda row: good_qty(row["qty"]), "qty")
+            if vectorized:
+                pdf.add_data_row_predicate("nutritionQuantities", lambda df: (df["qty"] > 5) & (df["qty"] <= 12),
+                                           "qty", vectorized=True)
+            else:
+                good_qty = lambda qty : 5 < qty <= 12
+                pdf.add_data_row_predicate("nutritionQuantities", lambda row: good_qty(row["qty"]), "qty")
+            # when vectorized, this predicate will throw an exception for pandat_2, and thus be applied row by row
             pdf.add_data_row_predicate("categories",
                                        lambda row: row["maxNutrition"] >= row["minNutrition"],
-                                       "minmax")
+                                       "minmax", vectorized=vectorized)
+            if vectorized:
+                pdf = pdf.clone()
+                self.assertTrue({k: v for k, v in pdf._vectorized_data_row_predicates.items() if v} ==
+                                {"nutritionQuantities": {"qty"}, "categories": {"minmax"}})
             failed = pdf.find_data_row_failures(pandat)
             self.assertTrue(set(failed) == {('foods', 'cost'), ('nutritionQuantities', 'qty'), ('categories', 'minmax')})
             self.assertTrue(set(failed['foods', 'cost']["name"]) == {'b'})
@@ -204,6 +261,22 @@ class TestUtils(unittest.TestCase):
 
         perform_predicate_checks(dietSchema())
         perform_predicate_checks({t:'*' for t in dietSchema()})
+        perform_predicate_checks(dietSchema(), vectorized=True)
+
+        pdf = PanDatFactory(**dietSchema())
+        pdf.add_data_row_predicate("categories", lambda df: df["maxNutrition"] >= 21, "vector", vectorized=True)
+        pdf.add_data_row_predicate("categories", lambda df: df["maxNutrition"] >= 21, "vector")
+        pdf.add_data_row_predicate("foods", lambda df: df["cost"].notnull(), "vector", vectorized=True)
+        pdf.add_data_row_predicate("foods", lambda df: True, "scalar", vectorized=True)
+        pdf.add_data_row_predicate("nutritionQuantities", lambda df: df["qty"].iloc[:1], "short", vectorized=True)
+        self.assertTrue("wrong length" in str(firesException(lambda: pdf.find_data_row_failures(pandat))))
+        pdf.add_data_row_predicate("nutritionQuantities", None, "short")
+        self.assertTrue({k: v for k, v in pdf._vectorized_data_row_predicates.items() if v} ==
+                        {"foods": {"vector", "scalar"}})
+        failed = pdf.find_data_row_failures(pandat)
+        self.assertTrue(set(failed) == {('foods', 'vector'), ('categories', 'vector')})
+        self.assertTrue(set(failed['foods', 'vector']["name"]) == {'b'})
+        self.assertTrue(set(failed['categories', 'vector']["name"]) == {'2'})
 
         tdf = TicDatFactory(**netflowSchema())
         tdf.enable_foreign_key_links()
@@ -267,10 +340,11 @@ class TestUtils(unittest.TestCase):
         fk_fails_3 = input_schema.find_foreign_key_failures(new_pan_dat, verbosity="Low", as_table=False)
         self.assertTrue({tuple(k)[:2] + (tuple(k[2]),): len(v) for k,v in fk_fails.items()} ==
                         {k:len(v) for k,v in fk_fails_2.items()} ==
-                        {k:v.count(True) for k,v in fk_fails_3.items()} ==
+                        {k:v.sum() for k,v in fk_fails_3.items()} ==
                         {('position_constraints', 'innings', ("Inning Group", "Inning Group")): 2,
                          ('position_constraints', 'positions', ("Position Group", "Position Group")): 2,
                          ('position_constraints', 'roster', ("Grade", "Grade")): 1})
+        self.assertTrue(all(v.index.equals(new_pan_dat.position_constraints.index) for v in fk_fails_3.values()))
         input_schema.remove_foreign_key_failures(new_pan_dat)
         self.assertFalse(input_schema.find_foreign_key_failures(new_pan_dat))
         self.assertTrue(input_schema._same_data(orig_pan_dat, new_pan_dat))
@@ -439,6 +513,143 @@ class TestUtils(unittest.TestCase):
                 c = df.columns[0]
                 self.assertTrue({'ay', 'j', 'nk', 'u'} == set(df[c]))
 
+    def testCascadingFKRemovals(self):
+        if not self.canRun:
+            return
+        pdf = PanDatFactory(level_one=[["One"], []], level_two=[["One", "Two"], []],
+                            level_three=[["One", "Two", "Three"], ["Data"]], unrelated=[["One"], []])
+        pdf.add_foreign_key("level_two", "level_one", ["One", "One"])
+        pdf.add_foreign_key("level_three", "level_two", [["One", "One"], ["Two", "Two"]])
+        dat = pdf.PanDat(level_one=DataFrame({"One": [1, 2, 3]}),
+                         level_two=DataFrame({"One": [1, 1, 2, 3, 4], "Two": ["a", "b", "a", "c", "d"]}),
+                         level_three=DataFrame({"One": [1, 1, 2, 2, 3, 4, 5], "Two": ["a", "b", "b", "a", "c", "d", "e"],
+                                                "Three": range(7), "Data": range(7)}),
+                         unrelated=DataFrame({"One": [9]}))
+        fk_fails = pdf.find_foreign_key_failures(dat)
+        self.assertTrue({k.native_table: len(v) for k, v in fk_fails.items()} == {"level_two": 1, "level_three": 2})
+        level_three = dat.level_three
+        dat.level_one = dat.level_one[dat.level_one["One"] != 3].copy()
+        pdf.remove_foreign_key_failures(dat)
+        self.assertFalse(pdf.find_foreign_key_failures(dat))
+        self.assertTrue(dat.level_three is level_three) # removals happen in place
+        self.assertTrue(list(dat.level_two.itertuples(index=False, name=None)) == [(1, "a"), (1, "b"), (2, "a")])
+        self.assertTrue(list(dat.level_three["Three"]) == [0, 1, 3] and list(dat.level_three.index) == [0, 1, 3])
+        self.assertTrue(len(dat.unrelated) == 1)
+
+    def testFindAllFailures(self):
+        if not self.canRun:
+            return
+        pdf = PanDatFactory(table_one=[["One"], ["Data"]], table_two=[["One", "Two"], ["Data"]])
+        pdf.add_foreign_key("table_two", "table_one", ["One", "One"])
+        pdf.set_data_type("table_one", "Data", max=10, inclusive_max=True)
+        pdf.add_data_row_predicate("table_two", lambda row: row["Data"] != row["One"], "not_one")
+        dat = pdf.PanDat(table_one=DataFrame({"One": [1, 2, 2, 3], "Data": [1, 20, 3, 4]}),
+                         table_two=DataFrame({"One": [1, 2, 4], "Two": ["a", "b", "c"], "Data": [1, 5, 6]}))
+        for as_table in [True, False]:
+            all_fails = pdf.find_all_failures(dat, as_table=as_table)
+            self.assertTrue(set(all_fails.timings) == {"good_pan_dat_object", "duplicates", "data_type_failures",
+                                                       "data_row_failures", "foreign_key_failures"})
+            for attr, found in [["duplicates", pdf.find_duplicates(dat, as_table=as_table)],
+                                ["data_type_failures", pdf.find_data_type_failures(dat, as_table=as_table)],
+                                ["data_row_failures", pdf.find_data_row_failures(dat, as_table=as_table)],
+                                ["foreign_key_failures", pdf.find_foreign_key_failures(dat, as_table=as_table)]]:
+                self.assertTrue(set(getattr(all_fails, attr)) == set(found) and len(found) == 1)
+                self.assertTrue(all(getattr(all_fails, attr)[k].equals(v) for k, v in found.items()))
+        self.assertTrue(list(all_fails.foreign_key_failures.values())[0].sum() == 1)
+        dat = pdf.PanDat(table_one=DataFrame({"One": [1, 2], "Data": [1, 2]}),
+                         table_two=DataFrame({"One": [1, 2], "Two": ["a", "b"], "Data": [2, 1]}))
+        self.assertFalse(any(pdf.find_all_failures(dat)[:4]))
+        # a predicate that edits its row doesn't change the row seen by the other predicates
+        def clobber(row):
+            row["Data"] = row["One"]
+            return True
+        pdf = pdf.clone()
+        pdf.add_data_row_predicate("table_two", clobber, "clobber")
+        pdf.add_data_row_predicate("table_two", lambda row: row["Data"] != row["One"], "not_one_again")
+        self.assertFalse(any(pdf.find_all_failures(dat)[:4]) or pdf.find_data_row_failures(dat))
+
+    def testCopyToTicDat(self):
+        if not self.canRun:
+            return
+        pdf = PanDatFactory(one=[["a", "b"], ["c", "d"]], two=[["a"], []], three=[[], ["c", "d"]], four=[["a"], ["c"]])
+        dat = pdf.PanDat(one=DataFrame({"a": [1, 1, 2], "b": ["x", "y", "x"], "c": [1.5, 2.5, 3.5], "d": [1, 2, 3]}),
+                         two=DataFrame({"a": [1, 2, 3]}), three=DataFrame({"c": [1, 2], "d": ["e", "f"]}),
+                         four=DataFrame({"a": [], "c": []}))
+        td = pdf.copy_to_tic_dat(dat)
+        self.assertTrue({k: dict(v) for k, v in td.one.items()} ==
+                        {(1, "x"): {"c": 1.5, "d": 1}, (1, "y"): {"c": 2.5, "d": 2}, (2, "x"): {"c": 3.5, "d": 3}})
+        self.assertTrue(all(type(v["d"]) is int for v in td.one.values()))
+        self.assertTrue(set(td.two) == {1, 2, 3} and not td.four)
+        self.assertTrue([dict(_) for _ in td.three] == [{"c": 1, "d": "e"}, {"c": 2, "d": "f"}])
+        tdf = TicDatFactory(**pdf.schema())
+        td_2 = tdf.TicDat(**{t: getattr(dat, t).set_index(list(pdf.primary_key_fields[t])) if
+                                pdf.primary_key_fields[t] else getattr(dat, t) for t in pdf.all_tables})
+        self.assertTrue(tdf._same_data(td, td_2) and not td_2.four)
+
+    def testDiff(self):
+        if not self.canRun:
+            return
+        pdf = PanDatFactory(**dict(dietSchema(), keyless=[[], ["One", "Two"]]))
+        tdf = TicDatFactory(**dietSchema())
+        diet_dat = pan_dat_maker(dietSchema(), tdf.TicDat(**{t: getattr(dietData(), t) for t in tdf.all_tables}))
+        dat = pdf.PanDat(**{t: getattr(diet_dat, t) for t in dietSchema()})
+        self.assertFalse(pdf.diff(dat, dat) or pdf.diff(dat, pdf.copy_pan_dat(dat)))
+        dat2 = pdf.copy_pan_dat(dat)
+        dat2.foods = dat2.foods[dat2.foods["name"] != "pizza"].copy()
+        dat2.foods.loc[dat2.foods["name"] == "hamburger", "cost"] += 1
+        dat2.foods = utils.pd.concat([dat2.foods, DataFrame({"name": ["lumberjack"], "cost": [1.5]})])
+        qtys = dat2.nutritionQuantities
+        qtys.loc[(qtys["food"] == "milk") & (qtys["category"] == "fat"), "qty"] *= 1 + 1e-9
+        dat = pdf.PanDat(**{t: getattr(dat, t) for t in dietSchema()},
+                         keyless=DataFrame({"One": [1, 1, 2, float("nan")], "Two": ["a", "a", "b", "c"]}))
+        dat2.keyless = DataFrame({"One": [1, 2, float("nan"), 3], "Two": ["a", "b", "c", "d"]})
+        diff = pdf.diff(dat, dat2)
+        self.assertTrue(set(diff) == {"foods", "nutritionQuantities", "keyless"})
+        self.assertTrue(list(diff["foods"].added["name"]) == ["lumberjack"])
+        self.assertTrue(list(diff["foods"].removed["name"]) == ["pizza"])
+        self.assertTrue(list(diff["foods"].changed["name"]) == ["hamburger"])
+        self.assertTrue(list(zip(diff["nutritionQuantities"].changed["food"],
+                                 diff["nutritionQuantities"].changed["category"])) == [("milk", "fat")])
+        self.assertFalse(len(diff["nutritionQuantities"].added) or len(diff["nutritionQuantities"].removed))
+        self.assertTrue("nutritionQuantities" not in pdf.diff(dat, dat2, epsilon=1e-6))
+        self.assertTrue(list(diff["keyless"].added["Two"]) == ["d"] and list(diff["keyless"].removed["Two"]) == ["a"])
+        self.assertTrue(sorted(pdf.diff(dat, dat2, nans_are_same=False)["keyless"].added["Two"]) == ["c", "d"])
+        # the null rows can't match, even at the same position in both tables
+        dat.keyless = DataFrame({"One": [float("nan"), 1], "Two": ["c", "a"]})
+        dat2.keyless = DataFrame({"One": [float("nan"), 2], "Two": ["c", "b"]})
+        diff = pdf.diff(dat, dat2, nans_are_same=False)["keyless"]
+        self.assertTrue(sorted(diff.added["Two"]) == ["b", "c"] and sorted(diff.removed["Two"]) == ["a", "c"])
+        diff = pdf.diff(dat, dat2)["keyless"]
+        self.assertTrue(list(diff.added["Two"]) == ["b"] and list(diff.removed["Two"]) == ["a"])
+        dat2.foods = utils.pd.concat([dat2.foods, dat2.foods.head(1)])
+        self.assertTrue(firesException(lambda: pdf.diff(dat, dat2)))
+        # epsilon only applies when both cells are numbers
+        pdf = PanDatFactory(t=[["k"], ["v"]])
+        dat = pdf.PanDat(t=DataFrame({"k": [1, 2, 3, 4], "v": ["007", 1.0, "a", 5]}))
+        dat2 = pdf.PanDat(t=DataFrame({"k": [1, 2, 3, 4], "v": ["7", 1.0 + 1e-9, "a", "5"]}))
+        for epsilon in [0, 1e-4]:
+            self.assertTrue(list(pdf.diff(dat, dat2, epsilon=epsilon)["t"].changed["k"]) ==
+                            ([1, 2, 4] if not epsilon else [1, 4]))
+
+    def testSchemaCache(self):
+        if not self.canRun:
+            return
+        pdf = PanDatFactory(**dietSchema())
+        pdf.set_data_type("foods", "cost", nullable=True)
+        pdf.set_data_type("categories", "name", number_allowed=False, strings_allowed='*')
+        pdf.add_foreign_key("nutritionQuantities", "foods", ["food", "name"])
+        self.assertFalse(pdf._true_data_types() is pdf._true_data_types())
+        pdf.add_foreign_key("nutritionQuantities", "categories", ["category", "name"])
+        self.assertTrue(len(pdf.foreign_keys) == 2)
+        pdf.PanDat()
+        self.assertTrue(pdf._true_data_types() is pdf._true_data_types())
+        self.assertTrue(pdf.foreign_keys is pdf.foreign_keys and len(pdf.foreign_keys) == 2)
+        self.assertTrue(pdf._all_fields("foods") is pdf._all_fields("foods"))
+        dtypes = pdf._dtypes_for_pandas_read("categories")
+        self.assertTrue(dtypes == {"name": str})
+        dtypes["name"] = int
+        self.assertTrue(pdf._dtypes_for_pandas_read("categories") == {"name": str})
+
     def testAdditionalFKs(self):
         pdf = PanDatFactory(pt1 = [["F1"],[]], pt2 = [["F2"],[]], pt3 = [["F1","F2"],[]],
                             pt4 = [["F1"],["F2"]], pt5 = [[],["F1","F2"]])
@@ -287,6 +287,9 @@ class TestSql(unittest.TestCase):
         ticDat5 = tdf5.sql.create_tic_dat(filePath)
         self.assertTrue(tdf5._same_data(tdf._keyless(ticDat), ticDat5))
         self.assertTrue(callable(ticDat5.a) and callable(ticDat5.c) and not callable(ticDat5.b))
+        batches = list(ticDat5.c.batches(batch_size=2))
+        self.assertTrue(all(len(_) <= 2 for _ in batches) and
+                        [r for b in batches for r in b] == [tuple(r.values()) for r in ticDat5.c()])
 
         self.assertTrue(tdf._same_data(ticDat, tdf6.sql.create_tic_dat(filePath)))
         ticDat.a["theboger"] = (1, None, 12)
@@ -465,6 +468,57 @@ class TestSql(unittest.TestCase):
         dat_2 = tdf.sql.create_tic_dat_from_sql(path)
         self.assertTrue(tdf._same_data(dat_1, dat_2, nans_are_same_for_data_rows=True))
 
+    def testFastLoad(self):
+        tdf = TicDatFactory(**dict(dietSchema(), gen=[[], ["a", "b"]]))
+        tdf.set_generator_tables(["gen"])
+        tdf.set_infinity_io_flag(999999999)
+        dat = tdf.TicDat(**{t: getattr(dietData(), t) for t in dietSchema()},
+                         gen=lambda : ([i, True if i % 2 else float("inf")] for i in range(1000)))
+        path = os.path.join(_scratchDir, "fastLoad.db")
+        tdf.sql.write_db_data(dat, makeCleanPath(path), fast_load=True)
+        dat_1 = tdf.sql.create_tic_dat(path)
+        self.assertTrue(tdf._same_data(dat, dat_1))
+        self.assertTrue(sorted(r["a"] for r in dat_1.gen()) == list(range(1000)))
+        self.assertTrue({r["b"] for r in dat_1.gen()} == {True, float("inf")})
+        with sql.connect(path) as con: # the fast load settings don't persist past the write
+            self.assertTrue(list(con.execute("PRAGMA journal_mode")) == [("delete",)])
+        self.assertTrue(firesException(lambda : tdf.sql.write_db_data(dat, path, fast_load=True)))
+        tdf.sql.write_db_data(tdf.copy_tic_dat(dat_1), path, allow_overwrite=True, fast_load=True)
+        self.assertTrue(tdf._same_data(dat, tdf.sql.create_tic_dat(path)))
+        # the keyless cells are written as they are, by both write_db_data and write_sql_file
+        tdf = TicDatFactory(keyless=[[], ["a", "b"]])
+        tdf.set_infinity_io_flag(100)
+        dat = tdf.TicDat(keyless=[[True, float("inf")], [1, 2]])
+        self.assertTrue([list(v) for _, v in tdf.sql._get_data(dat, as_sql=False)] ==
+                        list(tdf.sql._table_rows("keyless", dat.keyless)) == [[True, float("inf")], [1, 2]])
+        path = os.path.join(_scratchDir, "keyless.db")
+        tdf.sql.write_db_data(dat, makeCleanPath(path))
+        with sql.connect(path) as con:
+            self.assertTrue(list(con.execute("Select * from keyless")) == [(1, float("inf")), (1, 2)])
+
+    def testColumnReaders(self):
+        tdf = TicDatFactory(table=[["a", "b"], ["c", "d"]], pks_only=[["x"], []], keyless=[[], ["y", "z"]])
+        tdf.set_data_type("table", "d", max=float("inf"), inclusive_max=True, strings_allowed="*")
+        tdf.set_infinity_io_flag(None)
+        path = os.path.join(_scratchDir, "columnReaders.db")
+        tdf.sql.write_db_schema(makeCleanPath(path))
+        with sql.connect(path) as con:
+            con.executemany("INSERT INTO [table] VALUES (?, ?, ?, ?)",
+                            [[i, "s%s" % i, ["True", "inf", "x"][i % 3], None if i % 2 else i] for i in range(25)])
+            con.executemany("INSERT INTO [pks_only] VALUES (?)", [[i] for i in range(5)])
+            con.executemany("INSERT INTO [keyless] VALUES (?, ?)", [["FALSE", 1], ["-INF", 2]])
+        with sql.connect(path) as con:
+            dat = tdf.TicDat(**tdf.sql._create_tic_dat_from_con(con, {t: t for t in tdf.all_tables}))
+            cursor = con.execute("Select [a], [b], [c], [d] from [table]")
+            self.assertTrue([len(_[0]) for _ in tdf.sql._read_column_batches(cursor, "table", list("abcd"), 10)] ==
+                            [10, 10, 5])
+        self.assertTrue(tdf._same_data(dat, tdf.sql.create_tic_dat(path)))
+        self.assertTrue(set(dat.pks_only) == set(range(5)) and len(dat.table) == 25)
+        # "inf" strings are only read as floats when the infinity_io_flag is "N/A"
+        self.assertTrue([dat.table[i, "s%s" % i]["c"] for i in range(3)] == [True, "inf", "x"])
+        self.assertTrue([dat.table[i, "s%s" % i]["d"] for i in range(3)] == [0, float("inf"), 2])
+        self.assertTrue([tuple(r.values()) for r in dat.keyless] == [(False, 1), ("-INF", 2)])
+
 _scratchDir = TestSql.__name__ + "_scratch"
 
 # Run the tests.
@@ -9,6 +9,7 @@ from ticdat.testing.ticdattestutils import assertTicDatTablesSame, DEBUG, addNet
 from ticdat.testing.ticdattestutils import spacesSchema, spacesData, clean_denormalization_errors, get_testing_file_path
 import os
 import itertools
+import random
 import shutil
 import json
 try:
@@ -1346,6 +1347,468 @@ class TestUtils(unittest.TestCase):
         postgresql.stop()
         sys.modules.pop(funky_diet.solve.__module__)
 
+    def testThirtyOne(self):
+        tdf = TicDatFactory(**netflowSchema())
+        addNetflowForeignKeys(tdf)
+        plan = tdf._foreign_key_failures_plan()
+        self.assertFalse(plan is tdf._foreign_key_failures_plan()) # the schema can still change
+        dat = tdf.copy_tic_dat(netflowData())
+        plan = tdf._foreign_key_failures_plan()
+        self.assertTrue(plan is tdf._foreign_key_failures_plan())
+        self.assertTrue({fk for checks in plan.values() for fk in [_.fk for _ in checks]} == set(tdf.foreign_keys))
+        self.assertFalse(tdf.find_foreign_key_failures(dat))
+        dat.arcs["Detroit", "Atlantis"] = 100
+        dat.cost["Pencils", "Atlantis", "Boston"] = dat.cost["Nukes", "Detroit", "Boston"] = 10
+        dat.inflow["Nukes", "Boston"] = 1
+        fk_fails = tdf.find_foreign_key_failures(dat)
+        self.assertTrue({(fk.native_table, fk.mapping.native_field): (v.native_values, v.native_pks)
+                         for fk, v in fk_fails.items()} ==
+                        {("arcs", "destination"): (("Atlantis",), (("Detroit", "Atlantis"),)),
+                         ("cost", "source"): (("Atlantis",), (("Pencils", "Atlantis", "Boston"),)),
+                         ("cost", "commodity"): (("Nukes",), (("Nukes", "Detroit", "Boston"),)),
+                         ("inflow", "commodity"): (("Nukes",), (("Nukes", "Boston"),))})
+        tdf.remove_foreign_key_failures(dat)
+        self.assertTrue(tdf._same_data(dat, tdf.copy_tic_dat(netflowData())))
+        self.assertTrue(plan is tdf._foreign_key_failures_plan())
+
+    def testThirtyTwo(self):
+        tdf = TicDatFactory(**dict(dietSchema(), keyless=[[], ["One", "Two"]]))
+        tdf.set_data_type("categories", "minNutrition", max=2000)
+        tdf.set_data_type("nutritionQuantities", "qty", max=10**6, inclusive_max=True)
+        tdf.set_data_type("keyless", "One", strings_allowed="*", number_allowed=False)
+        tdf.add_data_row_predicate("categories", lambda row: row["maxNutrition"] >= row["minNutrition"], "minmax")
+        tdf.add_data_row_predicate("nutritionQuantities", lambda row: row["food"] != "hamburger", "no burgers")
+        tdf.add_data_row_predicate("keyless", lambda row: row["Two"] > 0, "positive")
+        dat = tdf.TicDat(**{t: getattr(dietData(), t) for t in dietSchema()})
+        dat.keyless.extend([["a", 1], [2, 2], ["c", "weird"], ["d", -1]])
+        dat.categories["fat"]["minNutrition"] = 3000
+        dat.nutritionQuantities["milk", "sodium"] = -1
+        dat.categories[None] = [1, 2]
+        data_type_fails, row_fails = tdf.find_data_type_failures(dat), tdf.find_data_row_failures(dat)
+        self.assertTrue({k: (set(v.bad_values), set(v.pks)) for k, v in data_type_fails.items()} ==
+                        {("categories", "minNutrition"): ({3000}, {"fat"}),
+                         ("categories", "name"): ({None}, {None}),
+                         ("nutritionQuantities", "qty"): ({-1}, {("milk", "sodium")}),
+                         ("keyless", "One"): ({2}, {1})})
+        self.assertTrue({k: set(v) for k, v in row_fails.items()} ==
+                        {("categories", "minmax"): {"fat"},
+                         ("nutritionQuantities", "no burgers"): {_ for _ in dat.nutritionQuantities
+                                                                 if _[0] == "hamburger"},
+                         ("keyless", "positive"): {2, 3}})
+        values, pks, rows = tdf._find_data_type_and_row_failures(dat)
+        self.assertTrue(tdf._data_type_failures_result(values, pks) == data_type_fails)
+        self.assertTrue(tdf._data_row_failures_result(rows) == row_fails)
+        self.assertTrue(tdf._true_data_types() is tdf._true_data_types())
+        self.assertTrue(set(tdf._true_data_types()) == set(tdf.all_tables))
+        # a predicate that edits its row doesn't change the row seen by the other predicates
+        tdf = TicDatFactory(t=[["k"], ["a", "b"]])
+        def clobber(row):
+            row["b"] = row["a"]
+            return True
+        tdf.add_data_row_predicate("t", clobber, "clobber")
+        tdf.add_data_row_predicate("t", lambda row: row["a"] != row["b"], "differ")
+        dat = tdf.TicDat(t={1: [1, 2]})
+        self.assertFalse(tdf.find_data_row_failures(dat) or tdf.find_all_failures(dat).data_row_failures)
+        self.assertTrue(dat.t[1]["b"] == 2)
+
+    def testThirtyThree(self):
+        tdf = TicDatFactory(**dietSchema())
+        addDietForeignKeys(tdf)
+        tdf.set_data_type("categories", "minNutrition", max=2000)
+        tdf.add_data_row_predicate("categories", lambda row: row["maxNutrition"] >= row["minNutrition"], "minmax")
+        dat = tdf.copy_tic_dat(dietData())
+        all_fails = tdf.find_all_failures(dat)
+        self.assertFalse(any(all_fails[:4]))
+        self.assertTrue(set(all_fails.timings) ==
+                        {"good_tic_dat_object", "data_type_and_row_failures", "foreign_key_failures"})
+        dat.categories["fat"]["minNutrition"] = 3000
+        dat.nutritionQuantities["pizza", "unobtanium"] = 10
+        all_fails = tdf.find_all_failures(dat)
+        self.assertTrue(all_fails.duplicates == {})
+        self.assertTrue(all_fails.data_type_failures == tdf.find_data_type_failures(dat))
+        self.assertTrue(all_fails.data_row_failures == tdf.find_data_row_failures(dat))
+        self.assertTrue(all_fails.foreign_key_failures == tdf.find_foreign_key_failures(dat))
+        self.assertTrue(all(len(_) == 1 for _ in all_fails[1:4]))
+        self.assertTrue(all(v >= 0 for v in all_fails.timings.values()))
+
+    def testThirtyFour(self):
+        tdf = TicDatFactory(**netflowSchema())
+        addNetflowForeignKeys(tdf)
+        tdf.enable_foreign_key_links()
+        dat = tdf.copy_tic_dat(netflowData())
+        row = dat.nodes["Detroit"]
+        self.assertFalse(hasattr(dat.arcs["Detroit", "Boston"], "__dict__"))
+        self.assertTrue(set(row.arcs_source) == {k[1] for k in dat.arcs if k[0] == "Detroit"})
+        arc = dat.arcs["Detroit", "Boston"]
+        self.assertFalse(hasattr(arc, "lumberjack") or arc._dataFrozen)
+        arc.lumberjack = 1
+        self.assertTrue(arc.lumberjack == 1)
+        del arc.lumberjack
+        self.assertFalse(hasattr(arc, "lumberjack"))
+        arc["capacity"] = 12
+        self.assertTrue(dict(arc) == {"capacity": 12} and arc.keys() == ("capacity",))
+        dat = tdf.freeze_me(dat)
+        arc = dat.arcs["Detroit", "Boston"]
+        self.assertTrue(firesException(lambda : arc.__setitem__("capacity", 13)))
+        self.assertTrue(firesException(lambda : setattr(arc, "lumberjack", 1)))
+        self.assertTrue(firesException(lambda : delattr(dat.nodes["Detroit"], "arcs_source")))
+        self.assertTrue(arc["capacity"] == 12 and hasattr(dat.nodes["Detroit"], "arcs_source"))
+
+        tdf = TicDatFactory(**dietSchema())
+        addDietForeignKeys(tdf)
+        tdf.enable_foreign_key_links()
+        dat = tdf.freeze_me(tdf.copy_tic_dat(dietData()))
+        pizza = dat.foods["pizza"]
+        self.assertFalse(hasattr(pizza, "__dict__"))
+        self.assertTrue(set(pizza.nutritionQuantities) == {k[1] for k in dat.nutritionQuantities if k[0] == "pizza"})
+        self.assertTrue(firesException(lambda : setattr(pizza, "nutritionQuantities", {})))
+
+    def testThirtyFive(self):
+        for schema, data, add_fks in [[dietSchema(), dietData(), addDietForeignKeys],
+                                      [netflowSchema(), netflowData(), addNetflowForeignKeys]]:
+            tdf, tdf_columnar = TicDatFactory(**schema), TicDatFactory(**schema)
+            tdf_columnar.enable_columnar_storage()
+            for _ in [tdf, tdf_columnar]:
+                add_fks(_)
+            self.assertTrue(tdf_columnar.clone()._columnar_storage_enabled)
+            dat, dat_columnar = tdf.copy_tic_dat(data), tdf_columnar.copy_tic_dat(data)
+            self.assertTrue(tdf._same_data(dat, dat_columnar))
+            for t in tdf.all_tables:
+                self.assertTrue(bool(tdf.data_fields[t]) == hasattr(getattr(dat_columnar, t), "_columns"))
+                df, df_columnar = tdf.copy_to_pandas(dat).__dict__[t], tdf.copy_to_pandas(dat_columnar).__dict__[t]
+                self.assertTrue(df.equals(df_columnar))
+        table = dat_columnar.arcs
+        table["Detroit", "Boston"]["capacity"] = 1
+        table["Denver", "Boston"] = {"capacity": "bad"}
+        table["New York", "Boston"] = 7
+        detached = table["Detroit", "New York"]
+        detached_capacity = detached["capacity"]
+        del table["Detroit", "New York"]
+        self.assertTrue(len(table._columns[0]) == len(table) + 1 == len(table) + len(table._free_posns))
+        self.assertTrue(table["Detroit", "Boston"]["capacity"] == 1 and table["New York", "Boston"]["capacity"] == 7)
+        # the slots of the overwritten and deleted rows are reused
+        table["Boston", "Boston"] = 8
+        self.assertTrue(len(table._columns[0]) == len(table) and not table._free_posns)
+        table["Denver", "Denver"] = 9
+        self.assertTrue(len(table._columns[0]) == len(table))
+        self.assertTrue(table["Boston", "Boston"]["capacity"] == 8 and table["Denver", "Denver"]["capacity"] == 9)
+        self.assertTrue(detached["capacity"] == detached_capacity and ("Detroit", "New York") not in table)
+        for i in range(10):
+            table["Boston", "Boston"] = i
+            table["Denver", "Denver"] = table.pop(("Denver", "Denver"))
+        self.assertTrue(len(table._columns[0]) == len(table) + 1)
+        self.assertTrue(table["Boston", "Boston"]["capacity"] == 9 and table["Denver", "Denver"]["capacity"] == 9)
+        del table["Boston", "Boston"], table["Denver", "Denver"]
+        table_copy = tdf_columnar.copy_tic_dat(dat_columnar).arcs
+        table_copy.clear()
+        self.assertTrue(not table_copy and not table_copy._columns[0] and len(table) == len(dat_columnar.arcs))
+        tdf_columnar = tdf_columnar.clone()
+        tdf_columnar.set_data_type("arcs", "capacity")
+        tdf_columnar.set_data_type("arcs", "source", number_allowed=False, strings_allowed=["Denver"])
+        fails = tdf_columnar.find_data_type_failures(dat_columnar)
+        self.assertTrue(set(fails) == {("arcs", "capacity"), ("arcs", "source")})
+        self.assertTrue(fails["arcs", "capacity"].bad_values == ("bad",))
+        self.assertTrue("Denver" not in fails["arcs", "source"].bad_values)
+        df = tdf_columnar.copy_to_pandas(dat_columnar, drop_pk_columns=False).arcs
+        self.assertTrue(dict(zip(zip(df.source, df.destination), df.capacity)) ==
+                        {k: v["capacity"] for k, v in table.items()})
+        dat_columnar = tdf_columnar.freeze_me(dat_columnar)
+        self.assertTrue(firesException(lambda : dat_columnar.arcs["Detroit", "Boston"].__setitem__("capacity", 2)))
+        self.assertTrue(firesException(lambda : dat_columnar.arcs.__setitem__(("Detroit", "Boston"), 2)))
+
+    def testThirtySix(self):
+        for columnar in [False, True]:
+            tdf = TicDatFactory(**dict(netflowSchema(), keyless=[[], ["One", "Two"]]))
+            addNetflowForeignKeys(tdf)
+            tdf.enable_foreign_key_links()
+            if columnar:
+                tdf.enable_columnar_storage()
+            orig = tdf.TicDat(**{t: getattr(netflowData(), t) for t in netflowSchema()})
+            orig.keyless.extend([[1, 2], ["a", "b"]])
+            rows = {t: [(list(k) if utils.containerish(k) else [k]) + list(v.values()) for k, v in getattr(orig, t).items()]
+                    for t in tdf.primary_key_fields if t != "keyless"}
+            rows["keyless"] = [list(_.values()) for _ in orig.keyless]
+            dat = tdf.TicDat.from_rows(trusted=True, **rows)
+            self.assertTrue(tdf._same_data(dat, orig) and tdf._same_data(dat, tdf.TicDat.from_rows(**rows)))
+            self.assertTrue(set(dat.nodes["Detroit"].arcs_source) == set(orig.nodes["Detroit"].arcs_source))
+            dat = tdf.TicDat.from_rows(trusted=True, arcs={k: v["capacity"] for k, v in orig.arcs.items()},
+                                       cost={k: tuple(v.values()) for k, v in orig.cost.items()},
+                                       nodes={k: () for k in orig.nodes})
+            self.assertTrue(dat.arcs["Detroit", "Boston"]["capacity"] == orig.arcs["Detroit", "Boston"]["capacity"])
+            self.assertTrue(set(dat.cost) == set(orig.cost) and set(dat.nodes) == set(orig.nodes))
+            self.assertFalse(dat.inflow or dat.keyless)
+            self.assertTrue(tdf.good_tic_dat_object(tdf.freeze_me(dat)))
+            self.assertTrue(firesException(lambda : tdf.TicDat.from_rows(trusted=True, not_a_table=[])))
+
+    def testThirtySeven(self):
+        for columnar in [False, True]:
+            tdf, tdf_lazy = TicDatFactory(**dietSchema()), TicDatFactory(**dietSchema())
+            for _ in [tdf, tdf_lazy]:
+                addDietForeignKeys(_)
+                if columnar:
+                    _.enable_columnar_storage()
+            tdf.enable_foreign_key_links()
+            tdf_lazy.enable_foreign_key_links(lazy=True)
+            self.assertTrue(tdf_lazy.clone()._foreign_key_links_enabled == ["lazy"])
+            dat, dat_lazy = tdf.copy_tic_dat(dietData()), tdf_lazy.copy_tic_dat(dietData())
+            self.assertTrue(len(dat._all_data_dicts) > len(dat_lazy._all_data_dicts))
+            num_data_dicts = len(dat_lazy._all_data_dicts)
+            chicken = dat_lazy.foods["chicken"]
+            self.assertTrue(chicken.nutritionQuantities["protein"] is dat_lazy.nutritionQuantities["chicken", "protein"])
+            self.assertTrue(len(dat_lazy._all_data_dicts) == num_data_dicts + len(dat_lazy.foods))
+            self.assertTrue(all(set(v.nutritionQuantities) == set(dat.foods[k].nutritionQuantities)
+                                for k, v in dat_lazy.foods.items()))
+            self.assertFalse(hasattr(chicken, "lumberjack"))
+            # links are built when first accessed, so they reflect the data at that time
+            dat_lazy.nutritionQuantities["chicken", "fat"]["qty"] = 1000
+            del dat_lazy.nutritionQuantities["chicken", "sodium"]
+            dat_lazy = tdf_lazy.freeze_me(dat_lazy)
+            protein = dat_lazy.categories["protein"]
+            self.assertTrue(dat_lazy.categories["fat"].nutritionQuantities["chicken"]["qty"] == 1000)
+            self.assertFalse("chicken" in dat_lazy.categories["sodium"].nutritionQuantities)
+            self.assertTrue(protein.nutritionQuantities["chicken"] is dat_lazy.nutritionQuantities["chicken", "protein"])
+            self.assertTrue(firesException(lambda : setattr(protein, "nutritionQuantities", {})))
+
+    def testThirtyEight(self):
+        for columnar in [False, True]:
+            tdf = TicDatFactory(**dict(dietSchema(), keyless=[[], ["One", "Two"]]))
+            if columnar:
+                tdf.enable_columnar_storage()
+            dat = tdf.TicDat(**{t: getattr(dietData(), t) for t in dietSchema()}, keyless=[[1, 2], [3, 4]])
+            other_dat = tdf.copy_tic_dat(dat)
+            pizza, keyless_row = dat.foods["pizza"], dat.keyless[0]
+            self.assertFalse(pizza._dataFrozen or getattr(keyless_row, "_attributesFrozen", False))
+            dat = tdf.freeze_me(dat)
+            for row in [pizza, keyless_row, dat.nutritionQuantities["pizza", "fat"]]:
+                self.assertTrue(row._dataFrozen and row._attributesFrozen)
+                self.assertTrue(firesException(lambda : row.__setitem__(list(row)[0], 1)))
+                self.assertTrue(firesException(lambda : setattr(row, "lumberjack", 1)))
+            self.assertTrue(isinstance(dat.keyless, tuple) and len(dat.keyless) == 2)
+            self.assertTrue(firesException(lambda : dat.foods.__setitem__("pizza", 1)))
+            # freezing one TicDat doesn't freeze the rows of another
+            other_dat.foods["pizza"]["cost"] = 10
+            other_dat.keyless[0]["One"] = 10
+            self.assertTrue(other_dat.foods["pizza"]["cost"] == 10 and dat.foods["pizza"]["cost"] != 10)
+            self.assertFalse(other_dat.foods["pizza"]._dataFrozen)
+            self.assertTrue(tdf._same_data(tdf.copy_tic_dat(dat, freeze_it=True), dat))
+            # the bulk inserts are checked just like __setitem__, so the factory can trust its own tables
+            for insert in [lambda t: t.update({"pizza": 7, ("a", "b"): 1}), lambda t: t.setdefault(("a", "b"), 1),
+                           lambda t: t.__ior__({("a", "b"): 1}), lambda t: t.update(pizza={"lumberjack": 1})]:
+                self.assertTrue(firesException(lambda : insert(other_dat.foods)))
+                self.assertTrue(tdf.good_tic_dat_object(other_dat) and ("a", "b") not in other_dat.foods)
+            other_dat.foods.update({"pizza": 7}, newbie=8)
+            other_dat.foods |= {"newer": 9}
+            self.assertTrue(other_dat.foods.setdefault("newest", 10)["cost"] == 10)
+            self.assertTrue([other_dat.foods[k]["cost"] for k in ["pizza", "newbie", "newer", "newest"]] ==
+                            [7, 8, 9, 10])
+            self.assertTrue(tdf.good_tic_dat_object(other_dat) and not tdf.find_data_type_failures(other_dat))
+
+    def testThirtyNine(self):
+        for columnar in [False, True]:
+            tdf = TicDatFactory(**dict(dietSchema(), keyless=[[], ["One", "Two"]]))
+            if columnar:
+                tdf.enable_columnar_storage()
+            dat = tdf.freeze_me(tdf.TicDat(**{t: getattr(dietData(), t) for t in dietSchema()},
+                                           keyless=[[1, 2], [3, 4]]))
+            copied = tdf.copy_tic_dat(dat)
+            # the copy starts out sharing the rows of the frozen original
+            self.assertTrue(dict.__getitem__(copied.foods, "pizza") is dict.__getitem__(dat.foods, "pizza"))
+            self.assertTrue(tdf._same_data(copied, dat))
+            copied.foods["pizza"]["cost"] = 100
+            copied.nutritionQuantities["pizza", "fat"]["qty"] = 100
+            copied.keyless[0]["One"] = 100
+            copied.categories["newbie"] = {"minNutrition": 1}
+            self.assertTrue(dat.foods["pizza"]["cost"] != 100 and dat.keyless[0]["One"] == 1)
+            self.assertTrue(dat.nutritionQuantities["pizza", "fat"]["qty"] != 100 and "newbie" not in dat.categories)
+            self.assertTrue(copied.foods.get("pizza")["cost"] == 100 and copied.keyless[0]["One"] == 100)
+            self.assertFalse(tdf._same_data(copied, dat))
+            for row in copied.foods.values():
+                row["cost"] = 1
+            self.assertTrue(all(row["cost"] != 1 for row in dat.foods.values()))
+            frozen_copy = tdf.copy_tic_dat(dat, freeze_it=True)
+            self.assertTrue(tdf._same_data(frozen_copy, dat))
+            self.assertTrue(firesException(lambda : frozen_copy.foods["pizza"].__setitem__("cost", 1)))
+            # every way of reading the rows out of the copy gives rows that can be edited
+            grabs = [lambda c: dict(c.foods)["pizza"], lambda c: {**c.foods}["pizza"],
+                     lambda c: c.foods.copy()["pizza"], lambda c: c.foods.pop("pizza"),
+                     lambda c: c.foods.setdefault("pizza"), lambda c: dict([c.foods.popitem()]).popitem()[1],
+                     lambda c: c.nutritionQuantities.pop(("pizza", "fat")), lambda c: c.keyless[:1][0]]
+            for grab in grabs:
+                row = grab(tdf.copy_tic_dat(dat))
+                row[list(row)[0]] = 100
+                self.assertTrue(row[list(row)[0]] == 100)
+            self.assertTrue(tdf._same_data(dat, tdf.copy_tic_dat(frozen_copy)))
+
+    def testForty(self):
+        tdf = TicDatFactory(**dietSchema())
+        tdf.add_foreign_key("nutritionQuantities", "foods", ["food", "name"])
+        self.assertFalse(tdf.foreign_keys is tdf.foreign_keys)
+        tdf.add_foreign_key("nutritionQuantities", "categories", ["category", "name"])
+        self.assertTrue(len(tdf._foreign_keys_by_native()["nutritionQuantities"]) == 2)
+        tdf.TicDat()
+        self.assertTrue(tdf.foreign_keys is tdf.foreign_keys and len(tdf.foreign_keys) == 2)
+        self.assertTrue(tdf._foreign_keys_by_native() is tdf._foreign_keys_by_native())
+        self.assertTrue(tdf._complex_fks() is tdf._complex_fks() and not tdf._complex_fks())
+        self.assertTrue(tdf._allFields("foods") == {"name", "cost"})
+        self.assertTrue(firesException(lambda : tdf.add_foreign_key("foods", "categories", ["name", "name"])))
+
+    def testFortyOne(self):
+        tdf = TicDatFactory(keyless=[[], ["a", "b", "c"]], gen=[[], ["a", "b"]])
+        tdf.set_generator_tables(["gen"])
+        nan = float("nan")
+        rows = [[i % 7, "x%s" % (i % 3), i / 10.] for i in range(1000)]
+        dat = tdf.TicDat(keyless=rows, gen=[[1, 2], [1, 2], [3, 4]])
+        self.assertTrue(tdf._same_data(dat, tdf.TicDat(keyless=rows[::-1], gen=[[3, 4], [1, 2], [1, 2]])))
+        # the rows are compared as multisets, so duplicated rows have to be matched one for one
+        self.assertFalse(tdf._same_data(dat, tdf.TicDat(keyless=rows, gen=[[1, 2], [3, 4], [3, 4]])))
+        self.assertFalse(tdf._same_data(dat, tdf.TicDat(keyless=rows[1:] + rows[-1:], gen=dat.gen)))
+        nearly = tdf.TicDat(keyless=[[a, b, c * (1 + 1e-9)] for a, b, c in rows[::-1]], gen=dat.gen)
+        self.assertFalse(tdf._same_data(dat, nearly))
+        self.assertTrue(tdf._same_data(dat, nearly, epsilon=1e-6))
+        self.assertFalse(tdf._same_data(dat, tdf.TicDat(keyless=[[a, b + "_", c] for a, b, c in rows], gen=dat.gen),
+                                        epsilon=1e-6))
+        dat_nan = tdf.TicDat(keyless=[[1, None, nan], [1, None, nan], [2, "a", 3]])
+        dat_nan_2 = tdf.TicDat(keyless=[[1, nan, None], [2, "a", 3], [1, None, nan]])
+        self.assertFalse(tdf._same_data(dat_nan, dat_nan_2))
+        self.assertTrue(tdf._same_data(dat_nan, dat_nan_2, nans_are_same_for_data_rows=True))
+        self.assertTrue(tdf._same_data(dat_nan, dat_nan_2, epsilon=1e-6, nans_are_same_for_data_rows=True))
+        # as with the keyed tables, nearly_same lets a NaN match when epsilon is positive
+        self.assertFalse(tdf._same_data(dat_nan, tdf.copy_tic_dat(dat_nan)))
+        self.assertTrue(tdf._same_data(dat_nan, tdf.copy_tic_dat(dat_nan), epsilon=1e-6))
+        self.assertTrue(tdf._same_data(dat_nan, dat_nan_2, epsilon=1e-6))
+        # unhashable data falls back to comparing row by row
+        self.assertTrue(tdf._same_data(tdf.TicDat(keyless=[[[1], 2, 3], [[4], 5, 6]]),
+                                       tdf.TicDat(keyless=[[[4], 5, 6], [[1], 2, 3]])))
+
+    def testFortyTwo(self):
+        for columnar in [False, True]:
+            tdf = TicDatFactory(**dict(dietSchema(), keyless=[[], ["One", "Two"]]))
+            dat = tdf.TicDat(**{t: getattr(dietData(), t) for t in dietSchema()})
+            self.assertTrue(firesException(lambda : tdf.find_changes(dat)))
+            tdf.enable_change_tracking()
+            if columnar:
+                tdf.enable_columnar_storage()
+            dat = tdf.TicDat(**{t: getattr(dietData(), t) for t in dietSchema()}, keyless=[[1, 2]])
+            self.assertFalse(tdf.find_changes(dat))
+            dat.foods["pizza"]["cost"] = 10
+            dat.foods["lumberjack"] = {"cost": 1}
+            dat.foods["lumberjack"]["cost"] = 2
+            del dat.foods["hamburger"]
+            dat.foods["hamburger"] = 2
+            del dat.foods["milk"]
+            dat.categories.pop("fat")
+            dat.categories.update({"fat": [1, 2], "sillyness": [3, 4]})
+            dat.nutritionQuantities["chicken", "protein"] = {"qty": 1}
+            dat.keyless.append([3, 4])
+            changes = tdf.find_changes(dat)
+            self.assertTrue(set(changes) == {"foods", "categories", "nutritionQuantities", "keyless"})
+            self.assertTrue(changes["foods"] == (frozenset(["lumberjack"]),
+                                                 {"pizza": frozenset(["cost"]), "hamburger": frozenset(["cost"])},
+                                                 frozenset(["milk"])))
+            self.assertTrue(changes["categories"].inserted == {"sillyness"} and not changes["categories"].deleted)
+            self.assertTrue(set(changes["categories"].modified) == {"fat"})
+            self.assertTrue(changes["nutritionQuantities"].modified == {("chicken", "protein"): frozenset(["qty"])})
+            self.assertTrue(changes["keyless"] == (None, None, None))
+            tdf.clear_changes(dat)
+            self.assertFalse(tdf.find_changes(dat))
+            dat.nutritionQuantities = {}
+            self.assertTrue(tdf.find_changes(dat) == {"nutritionQuantities": (None, None, None)})
+            # a replaced table can't record its edits, so it is reported as changed even after clear_changes
+            dat.foods = tdf.TicDat(foods=dat.foods).foods
+            tdf.clear_changes(dat)
+            self.assertTrue(set(tdf.find_changes(dat)) == {"nutritionQuantities", "foods"})
+            dat.foods["pizza"]["cost"] = 11
+            dat.nutritionQuantities["pizza", "fat"] = {"qty": 3}
+            self.assertTrue(tdf.find_changes(dat) == {"nutritionQuantities": (None, None, None),
+                                                      "foods": (None, None, None)})
+            # copies track their own changes
+            dat = tdf.freeze_me(tdf.TicDat(**{t: getattr(dietData(), t) for t in dietSchema()}))
+            copied = tdf.copy_tic_dat(dat)
+            copied.foods["pizza"]["cost"] = 10
+            self.assertTrue(tdf.find_changes(copied) == {"foods": (frozenset(), {"pizza": frozenset(["cost"])},
+                                                                   frozenset())})
+            self.assertFalse(tdf.find_changes(dat))
+
+    def testFortyThree(self):
+        as_sets = lambda failures: {k: tuple(map(set, v)) if isinstance(v[0], tuple) else set(v)
+                                    for k, v in failures.items()}
+        rand = random.Random(13)
+        for columnar in [False, True]:
+            tdf = TicDatFactory(**dict(dietSchema(), keyless=[[], ["food", "Two"]], alias=[["nick"], ["food"]]))
+            addDietForeignKeys(tdf)
+            tdf.add_foreign_key("keyless", "foods", ["food", "name"])
+            tdf.add_foreign_key("categories", "alias", ["name", "food"])
+            tdf.set_data_type("foods", "cost", min=0, max=10)
+            tdf.add_data_row_predicate("categories", lambda r: r["minNutrition"] <= r["maxNutrition"], "minmax")
+            tdf.enable_change_tracking()
+            if columnar:
+                tdf.enable_columnar_storage()
+            dat = tdf.TicDat(**{t: getattr(dietData(), t) for t in dietSchema()}, keyless=[["milk", 1]])
+            validator = tdf.incremental_validator(dat)
+            foods, cats = list(dat.foods) + ["lumberjack"], list(dat.categories) + ["sillyness"]
+            edits = [lambda: dat.foods.__setitem__(rand.choice(foods), rand.choice([-1, 5, 20])),
+                     lambda: dat.foods.pop(rand.choice(foods), None),
+                     lambda: dat.nutritionQuantities[rand.choice(foods), rand.choice(cats)].__setitem__("qty", 1),
+                     lambda: dat.categories[rand.choice(cats)].__setitem__("maxNutrition", rand.choice([0, 1e3])),
+                     lambda: dat.categories.pop(rand.choice(cats), None),
+                     lambda: dat.alias.__setitem__(rand.choice("ab"), rand.choice(cats)),
+                     lambda: dat.keyless.append([rand.choice(foods), 1])]
+            for i in range(60):
+                for _ in range(3):
+                    rand.choice(edits)()
+                validator.update() if i % 2 else validator.update(tdf.find_changes(dat))
+                tdf.clear_changes(dat)
+                self.assertTrue(as_sets(validator.find_data_type_failures()) ==
+                                as_sets(tdf.find_data_type_failures(dat)))
+                self.assertTrue(as_sets(validator.find_data_row_failures()) ==
+                                as_sets(tdf.find_data_row_failures(dat)))
+                self.assertTrue(as_sets(validator.find_foreign_key_failures()) ==
+                                as_sets(tdf.find_foreign_key_failures(dat)))
+            self.assertTrue(validator.find_foreign_key_failures() and validator.find_data_type_failures())
+            # a replaced table can't record its edits, so the validator rescans it
+            dat.foods = {k: dict(v) for k, v in dat.foods.items() if 0 <= v["cost"] <= 10}
+            validator.update()
+            tdf.clear_changes(dat)
+            dat.foods["whale"] = {"cost": 50}
+            dat.nutritionQuantities["whale", "fat"] = {"qty": 1}
+            validator.update()
+            self.assertTrue(as_sets(validator.find_data_type_failures()) == as_sets(tdf.find_data_type_failures(dat))
+                            and set(tdf.find_data_type_failures(dat)[("foods", "cost")].pks) == {"whale"})
+            self.assertTrue(as_sets(validator.find_foreign_key_failures()) ==
+                            as_sets(tdf.find_foreign_key_failures(dat)))
+        # a predicate that edits its row doesn't change the row seen by the other predicates
+        tdf = TicDatFactory(t=[["k"], ["a", "b"]])
+        def clobber(row):
+            row["b"] = row["a"]
+            return True
+        tdf.add_data_row_predicate("t", clobber, "clobber")
+        tdf.add_data_row_predicate("t", lambda row: row["a"] != row["b"], "differ")
+        tdf.enable_change_tracking()
+        dat = tdf.TicDat(t={1: [1, 2]})
+        validator = tdf.incremental_validator(dat)
+        dat.t[2] = [3, 3]
+        validator.update()
+        self.assertTrue(as_sets(validator.find_data_row_failures()) == as_sets(tdf.find_data_row_failures(dat)) ==
+                        {("t", "differ"): {2}})
+
+    def testFortyFour(self):
+        tdf = TicDatFactory(gen=[[], ["a", "b"]])
+        tdf.set_generator_tables(["gen"])
+        rows = [[i, "x%s" % i] for i in range(25)]
+        dat = tdf.TicDat(gen=rows)
+        batches = list(dat.gen.batches(batch_size=10))
+        self.assertTrue([len(_) for _ in batches] == [10, 10, 5])
+        self.assertTrue([r for b in batches for r in b] == list(map(tuple, rows)))
+        self.assertTrue(list(dat.gen.batches(batch_size=25)) == [list(map(tuple, rows))])
+        self.assertTrue(list(tdf.TicDat().gen.batches()) == [])
+        self.assertTrue(list(tdf.copy_tic_dat(dat).gen.batches(batch_size=10)) == batches)
+        dat = tdf.TicDat(gen=lambda : ({"b": b, "a": a} for a, b in rows))
+        self.assertTrue(list(dat.gen.batches(batch_size=10)) == batches)
+        if utils.DataFrame:
+            dfs = list(dat.gen.batches(batch_size=10, as_data_frame=True))
+            self.assertTrue(list(dfs[0].columns) == ["a", "b"] and [len(_) for _ in dfs] == [10, 10, 5])
+        self.assertTrue(firesException(lambda : list(dat.gen.batches(batch_size=0))))
+
 _scratchDir = TestUtils.__name__ + "_scratch"
 
 
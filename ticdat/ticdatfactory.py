@@ -9,7 +9,7 @@ from ticdat.utils import verify, freezable_factory, FrozenDict, FreezeableDict
 from ticdat.utils import dictish, containerish, deep_freeze, lupish, safe_apply
 from ticdat.utils import ForeignKey, ForeignKeyMapping, TypeDictionary
 from string import ascii_uppercase as uppercase
-from itertools import count
+from itertools import count, islice
 import ticdat.xls as xls
 import ticdat.csvtd as csv
 import ticdat.sqlitetd as sql
@@ -18,6 +18,8 @@ import ticdat.jsontd as json
 from ticdat.pgtd import PostgresTicFactory
 import sys
 import math
+import time
+import functools
 try:
     import amplpy
 except:
@@ -34,6 +36,117 @@ def _keylen(k) :
         rtn = 0
     return rtn
 
+class _TableChangeJournal(object):
+    # the changes made to a table since the last checkpoint (see TicDatFactory.enable_change_tracking)
+    def __init__(self):
+        self.inserted, self.deleted, self.replaced = set(), set(), set() # primary keys
+        # the rows whose data fields were set, by id. the rows themselves are kept so the ids stay unique
+        self.modified_rows = {}
+        self.everything = False # for tables without primary keys, or tables that were replaced wholesale
+    def key_set(self, key, existed):
+        if existed or key in self.deleted:
+            self.deleted.discard(key)
+            if key not in self.inserted:
+                self.replaced.add(key)
+        else:
+            self.inserted.add(key)
+    def key_deleted(self, key):
+        if key in self.inserted:
+            self.inserted.discard(key)
+        else:
+            self.deleted.add(key)
+        self.replaced.discard(key)
+    def row_modified(self, row, field):
+        self.modified_rows.setdefault(id(row), (row, set()))[1].add(field)
+
+class _TicDatDictBase(FreezeableDict):
+    # A table that can start out holding the (frozen) rows of another table, as made by copy_tic_dat.
+    # A shared row is replaced by a copy made with this table's own row class the first time it is read,
+    # so the rows of the source are never exposed for editing.
+    # If change tracking is enabled, then the table (and its row class) are given a _TableChangeJournal.
+    _shared_rows, _journal = False, None
+    def __setitem__(self, key, value):
+        existed = key in self
+        super(_TicDatDictBase, self).__setitem__(key, value)
+        if self._journal is not None:
+            self._journal.key_set(key, existed)
+    def __delitem__(self, key):
+        super(_TicDatDictBase, self).__delitem__(key)
+        if self._journal is not None:
+            self._journal.key_deleted(key)
+    def update(self, *args, **kwargs):
+        # each key and row is checked by __setitem__, as good_tic_dat_table trusts this factory's own tables
+        if getattr(self, "_dataFrozen", False):
+            return super(_TicDatDictBase, self).update(*args, **kwargs)
+        for k, v in dict(*args, **kwargs).items():
+            self[k] = v
+    def __ior__(self, other):
+        self.update(other)
+        return self
+    def _unchecked_update(self, items):
+        # for rows that are already known to be well formed
+        if self._journal is None:
+            return super(_TicDatDictBase, self).update(items)
+        other = dict(items)
+        existed = {k: k in self for k in other}
+        super(_TicDatDictBase, self).update(other)
+        for k in other:
+            self._journal.key_set(k, existed[k])
+    def _own_row(self, row):
+        # a copy of a shared row, made with this table's row class
+        return type(self)._row_class(row)
+    def _shared_load(self, table):
+        super(_TicDatDictBase, self).update(table)
+        self._shared_rows = True
+    def _unshared(self, key, row):
+        if self._shared_rows and not getattr(self, "_dataFrozen", False) and not isinstance(row, self._row_class):
+            row = self._own_row(row)
+            dict.__setitem__(self, key, row)
+        return row
+    def __getitem__(self, item):
+        if (item not in self) and (not getattr(self, "_dataFrozen", False)):
+            self[item] = {}
+        return self._unshared(item, super(_TicDatDictBase, self).__getitem__(item))
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+        return self._unshared(key, super(_TicDatDictBase, self).__getitem__(key))
+    def _unshare_all(self):
+        if self._shared_rows and not getattr(self, "_dataFrozen", False):
+            for k, v in list(super(_TicDatDictBase, self).items()):
+                self._unshared(k, v)
+            self._shared_rows = False
+    def values(self):
+        self._unshare_all()
+        return super(_TicDatDictBase, self).values()
+    def items(self):
+        self._unshare_all()
+        return super(_TicDatDictBase, self).items()
+    def __iter__(self):
+        # overriding __iter__ sends dict(t) and {**t} through keys() and __getitem__, which unshares the rows
+        return super(_TicDatDictBase, self).__iter__()
+    def copy(self):
+        self._unshare_all()
+        return super(_TicDatDictBase, self).copy()
+    def pop(self, key, *args):
+        existed = key in self
+        if existed:
+            self._unshared(key, super(_TicDatDictBase, self).__getitem__(key))
+        rtn = super(_TicDatDictBase, self).pop(key, *args)
+        if existed and self._journal is not None:
+            self._journal.key_deleted(key)
+        return rtn
+    def popitem(self):
+        self._unshare_all()
+        rtn = super(_TicDatDictBase, self).popitem()
+        if self._journal is not None:
+            self._journal.key_deleted(rtn[0])
+        return rtn
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self.get(key)
+
 class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl_prepend"})) :
     """
     Primary class for ticdat library. This class is constructed with a schema.
@@ -360,6 +473,9 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         sets which tables are to be generator tables. Generator tables are represented as generators
         pulled from the actual data store. This prevents them from being fulled loaded into memory.
         Generator tables are only appropriate for truly massive data tables with no primary key.
+        In addition to being called, a generator table has a batches(batch_size=10000, as_data_frame=False)
+        function that generates the rows in batches of (up to) batch_size rows, with each batch a list of data field
+        tuples (or a DataFrame if as_data_frame). The csv and SQLite readers batch directly from the file.
 
         :param g: An iterable of table name.
 
@@ -394,28 +510,32 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
             del(self._foreign_keys[nt,ft])
     @property
     def foreign_keys(self):
-        rtn = []
-        for (native,foreign), nativeforeignmappings in self._foreign_keys.items():
-            for n_f_mapping in nativeforeignmappings :
-                mappings = tuple(ForeignKeyMapping(nf,ff) for nf,ff in n_f_mapping)
-                mappings = mappings[0] if len(mappings)==1 else mappings
-                def half_card(tbl, fields):
-                    assert fields.issubset(self._allFields(tbl))
-                    pkfs = self.primary_key_fields.get(tbl, ())
-                    if pkfs and fields.issuperset(pkfs):
-                        return "one"
-                    return "many"
-                cardinality = "%s-to-%s"%(half_card(native, {_[0] for _ in n_f_mapping}),
-                                          half_card(foreign, {_[1] for _ in n_f_mapping}))
-                rtn.append(ForeignKey(native, foreign, mappings, cardinality))
-        assert len(rtn) == len(set(rtn))
-        return tuple(rtn)
+        def make_foreign_keys():
+            rtn = []
+            for (native,foreign), nativeforeignmappings in self._foreign_keys.items():
+                for n_f_mapping in nativeforeignmappings :
+                    mappings = tuple(ForeignKeyMapping(nf,ff) for nf,ff in n_f_mapping)
+                    mappings = mappings[0] if len(mappings)==1 else mappings
+                    def half_card(tbl, fields):
+                        assert fields.issubset(self._allFields(tbl))
+                        pkfs = self.primary_key_fields.get(tbl, ())
+                        if pkfs and fields.issuperset(pkfs):
+                            return "one"
+                        return "many"
+                    cardinality = "%s-to-%s"%(half_card(native, {_[0] for _ in n_f_mapping}),
+                                              half_card(foreign, {_[1] for _ in n_f_mapping}))
+                    rtn.append(ForeignKey(native, foreign, mappings, cardinality))
+            assert len(rtn) == len(set(rtn))
+            return tuple(rtn)
+        return self._cached_once_used("foreign_keys", make_foreign_keys)
     def _foreign_keys_by_native(self):
-        rtn = clt.defaultdict(list)
-        for fk in self.foreign_keys:
-            rtn[fk.native_table].append(fk)
-        return utils.FrozenDict({k:frozenset(v) for k,v in rtn.items()})
-    def enable_foreign_key_links(self):
+        def make_foreign_keys_by_native():
+            rtn = clt.defaultdict(list)
+            for fk in self.foreign_keys:
+                rtn[fk.native_table].append(fk)
+            return utils.FrozenDict({k:frozenset(v) for k,v in rtn.items()})
+        return self._cached_once_used("foreign_keys_by_native", make_foreign_keys_by_native)
+    def enable_foreign_key_links(self, lazy=False):
         """
         call to enable foreign key links. For ex. a TicDat object made from
         a factory with foreign key enabled will pass the following assert
@@ -425,9 +545,133 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         Note that by default, TicDatFactories don't create foreign key links since doing so
         can slow down TicDat creation.
 
+        :param lazy: boolean. If truthy, then each link (i.e. the nutritionQuantities attribute of the foods rows)
+                     isn't created when the TicDat is constructed, but rather the first time it is accessed
+                     on any row of the foreign table. This way, you only pay for the links you use. Note that a lazy
+                     link reflects the native table at the time the link is first accessed.
+
+        :return:
+        """
+        self._foreign_key_links_enabled[:] = ["lazy"] if lazy else [True]
+    def enable_columnar_storage(self):
+        """
+        call to enable columnar storage. For a TicDat object made from a factory with columnar storage enabled,
+        each table with both primary key and data fields stores its data in one list per data field, and
+        each row (i.e. dat.table[pk]) is a lightweight view into these lists. The rows otherwise behave exactly
+        as they do by default. This reduces the memory used by large tables, and
+        speeds up copy_to_pandas (which can read the columns directly).
+
+        Note that by default, TicDatFactories store each row separately.
+
+        :return:
+        """
+        self._columnar_storage_enabled[:] = [True]
+    def enable_change_tracking(self):
+        """
+        call to enable change tracking. A TicDat object made from a factory with change tracking enabled
+        records which rows of its tables have been inserted, modified or deleted. See find_changes and
+        clear_changes for how to retrieve and reset these records.
+
+        Note that by default, TicDatFactories don't track changes.
+
+        :return:
+        """
+        self._change_tracking_enabled[:] = [True]
+    def find_changes(self, tic_dat):
+        """
+        Finds the changes made to a ticdat object since it was created, or since clear_changes was last called.
+        Requires that change tracking was enabled before tic_dat was created (see enable_change_tracking).
+        Generic tables and generator tables aren't tracked.
+
+        :param tic_dat: a ticdat object
+
+        :return: A dictionary whose keys are the names of the tables that have changed, and whose values are
+                 namedtuples with members "inserted", "modified" and "deleted".
+                 For tables with primary key fields, "inserted" and "deleted" are frozensets of the primary keys
+                 of the inserted and deleted rows, and "modified" is a dictionary mapping the primary key of each
+                 modified row to a frozenset of the data fields that were set. (A row that was replaced
+                 wholesale, i.e. with tic_dat.table[pk] = {...}, lists all its data fields).
+                 For tables without primary key fields, as well as for tables that were replaced with a new
+                 object (i.e. with tic_dat.table = {...}), all three members are None, indicating that
+                 the entire table should be treated as changed.
+        """
+        msg  = []
+        verify(self.good_tic_dat_object(tic_dat, msg.append),
+               "tic_dat not a good object for this factory : %s"%"\n".join(msg))
+        verify(getattr(tic_dat, "_change_journals", None) is not None,
+               "tic_dat was not created with change tracking enabled. See enable_change_tracking")
+        TableChanges = clt.namedtuple("TableChanges", ["inserted", "modified", "deleted"])
+        rtn = {}
+        for t, journal in tic_dat._change_journals.items():
+            if journal.everything or (journal.modified_rows and not self.primary_key_fields.get(t)):
+                rtn[t] = TableChanges(None, None, None)
+                continue
+            modified = {k: frozenset(self.data_fields.get(t, ())) for k in journal.replaced}
+            if journal.modified_rows:
+                for k, row in dict.items(getattr(tic_dat, t)):
+                    if id(row) in journal.modified_rows and row is journal.modified_rows[id(row)][0] and \
+                       k not in journal.inserted:
+                        modified[k] = modified.get(k, frozenset()).union(journal.modified_rows[id(row)][1])
+            if journal.inserted or journal.deleted or modified:
+                rtn[t] = TableChanges(frozenset(journal.inserted), modified, frozenset(journal.deleted))
+        return rtn
+    def _normalized_changes(self, tic_dat, changes):
+        # maps each changed table to the primary keys of its changed rows, or to None if the whole table changed
+        if changes is None:
+            changes = dict(self.find_changes(tic_dat))
+            if not getattr(tic_dat, "_isFrozen", False):
+                # a table can only be trusted to have recorded its edits if it still has the current journal
+                for t, journal in tic_dat._change_journals.items():
+                    _t = getattr(tic_dat, t)
+                    if not (_t is tic_dat._own_tables.get(t) and type(_t)._journal is journal):
+                        changes[t] = None
+            self.clear_changes(tic_dat)
+        verify(dictish(changes) and set(changes).issubset(self.all_tables),
+               "changes should be a dictionary keyed by table name")
+        rtn = {}
+        for t, pks in changes.items():
+            if hasattr(pks, "inserted") and hasattr(pks, "deleted"): # i.e. from find_changes
+                pks = None if pks.inserted is None else set(pks.inserted).union(pks.modified, pks.deleted)
+            rtn[t] = None if (pks is None or not self.primary_key_fields.get(t) or
+                              not dictish(getattr(tic_dat, t))) else set(pks)
+        return rtn
+    def incremental_validator(self, tic_dat):
+        """
+        Creates an object that finds the data integrity failures of tic_dat, and can then be updated
+        as tic_dat is edited by rechecking only the edited rows (and the rows that reference them).
+
+        The returned object has the methods find_data_type_failures(), find_data_row_failures() and
+        find_foreign_key_failures(verbosity="High"), which return the same failures as the TicDatFactory
+        methods of the same name would return for tic_dat at the time of the last update.
+
+        It also has the method update(changes=None), which should be called after tic_dat is edited.
+        changes is a dictionary mapping the edited tables to the primary keys of the added, modified or deleted
+        rows (or to None, to recheck the whole table). Tables without primary key fields are always rechecked
+        in full. The return value of find_changes can also be used as changes. If changes is None, then
+        find_changes is called (and then clear_changes), which requires change tracking to be enabled
+        (see enable_change_tracking).
+
+        :param tic_dat: a ticdat object
+
+        :return: an incremental validator object for tic_dat
+        """
+        msg  = []
+        verify(self.good_tic_dat_object(tic_dat, msg.append),
+               "tic_dat not a good object for this factory : %s"%"\n".join(msg))
+        return _IncrementalValidator(self, tic_dat)
+    def clear_changes(self, tic_dat):
+        """
+        Clears the changes recorded for a ticdat object, so that subsequent calls to find_changes only
+        report the changes made after this call.
+        Requires that change tracking was enabled before tic_dat was created (see enable_change_tracking).
+
+        :param tic_dat: a ticdat object
+
         :return:
         """
-        self._foreign_key_links_enabled[:] = [True]
+        verify(getattr(tic_dat, "_change_journals", None) is not None,
+               "tic_dat was not created with change tracking enabled. See enable_change_tracking")
+        tic_dat._start_change_tracking()
     def add_foreign_key(self, native_table, foreign_table, mappings):
         """
         Adds a foreign key relationship to the schema.  Adding a foreign key doesn't block
@@ -474,8 +718,9 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         assert ffs.issubset(ftbl_pks.union(self.data_fields.get(ftbl,())))
         return ftbl_pks == ffs
     def _complex_fks(self):
-        return tuple((native, foreign, fk) for (native, foreign), fks in self._foreign_keys.items()
-                    for fk in fks if not self._simple_fk(foreign, fk))
+        return self._cached_once_used("complex_fks", lambda :
+            tuple((native, foreign, fk) for (native, foreign), fks in self._foreign_keys.items()
+                  for fk in fks if not self._simple_fk(foreign, fk)))
     def _trigger_has_been_used(self):
         if self._has_been_used :
             return # idempotent
@@ -511,6 +756,53 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                     self._linkName[nativetable, foreigntable, nativeFields] = \
                         "_".join([nativetable] + [x for x in trialLinkName or nativeFields])
         self._has_been_used[:] = [True]
+    def _cached_once_used(self, key, creator):
+        # once a factory has been used, its schema can't change, so schema derived objects can be reused
+        # (all the schema editing routines refuse to run on a used factory, so the cache never goes stale)
+        if not self._has_been_used:
+            return creator()
+        if key not in self._used_schema_cache:
+            self._used_schema_cache[key] = creator()
+        return self._used_schema_cache[key]
+    def _fields_getter(self, table, fields, as_tuple=True):
+        # returns a function that maps a (primary key, data row) pair to the values for fields
+        pkfs = self.primary_key_fields.get(table, ())
+        def cell_getter(f):
+            assert f in pkfs + self.data_fields.get(table, ())
+            if [f] == list(pkfs):
+                return lambda pk, row: pk
+            if f in self.data_fields.get(table, ()):
+                return lambda pk, row: row[f]
+            i = pkfs.index(f)
+            return lambda pk, row: pk[i]
+        getters = tuple(map(cell_getter, fields))
+        if not as_tuple:
+            assert len(getters) == 1
+            return getters[0]
+        if all(f in self.data_fields.get(table, ()) for f in fields):
+            return lambda pk, row: tuple(row[f] for f in fields)
+        return lambda pk, row: tuple(g(pk, row) for g in getters)
+    def _foreign_key_failures_plan(self):
+        def make_plan():
+            FKCheck = namedtuple("FKCheck", ["fk", "foreign_fields", "native_look_up", "foreign_look_up",
+                                             "native_values"])
+            rtn = {}
+            for native, fks in self._foreign_keys_by_native().items():
+                rtn[native] = []
+                for fk in fks:
+                    foreign_to_native = fk.foreigntonativemapping()
+                    ffs = tuple(_ff for _ff in self.primary_key_fields.get(fk.foreign_table, ()) +
+                                self.data_fields.get(fk.foreign_table, ()) if _ff in foreign_to_native)
+                    use_pk = ffs == self.primary_key_fields.get(fk.foreign_table)
+                    rtn[native].append(FKCheck(fk, ffs,
+                        self._fields_getter(native, [foreign_to_native[_ff] for _ff in ffs],
+                                            as_tuple=not (use_pk and len(ffs) == 1)),
+                        None if use_pk else self._fields_getter(fk.foreign_table, ffs),
+                        self._fields_getter(native, [fk.mapping.native_field],  as_tuple=False)
+                            if type(fk.mapping) is ForeignKeyMapping else
+                        self._fields_getter(native, [_.native_field for _ in fk.mapping])))
+            return rtn
+        return self._cached_once_used("foreign_key_failures_plan", make_plan)
     def as_dict(self, ticdat):
         '''
         Returns the ticdat object as a dictionary.
@@ -553,6 +845,7 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         :return: a TicDatFactory
         """
         self._has_been_used = [] # append to this to make it truthy
+        self._used_schema_cache = {} # schema derived objects that can be reused once the schema is locked
         self._linkName = {}
         verify(not any(x.startswith("_") for x in init_fields),
                "table names shouldn't start with underscore")
@@ -590,9 +883,13 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         self.all_tables = frozenset(init_fields)
         # using list for truthiness to work around freezing headaches
         self._foreign_key_links_enabled = []
+        self._columnar_storage_enabled = []
+        self._change_tracking_enabled = []
 
         datarowfactory = lambda t :  utils.td_row_factory(t, self.primary_key_fields.get(t, ()),
                         self.data_fields.get(t, ()), self.default_values.get(t, {}))
+        columnartable = lambda t : bool(self._columnar_storage_enabled and self.primary_key_fields.get(t) and
+                                        self.data_fields.get(t))
 
         goodticdattable = self._good_tic_dat_table_for_init
         superself = self
@@ -601,34 +898,142 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
             assert containerish(primarykey)
             primarykey = primarykey or  self.primary_key_fields.get(tablename, ())
             keylen = len(primarykey)
+            if not rowfactory_ and columnartable(tablename):
+                datafields = self.data_fields[tablename]
+                columnarrowfactory = utils.td_columnar_row_factory(tablename, primarykey, datafields,
+                                                                   self.default_values.get(tablename, {}))
+                class ColumnarTicDatDict (_TicDatDictBase) :
+                    _lazy_links, _frozen_rows = columnarrowfactory._lazy_links, columnarrowfactory._frozen_rows
+                    _owner, _row_class = (superself, tablename), columnarrowfactory
+                    def __init__(self, *_args, **_kwargs):
+                        # one list per data field. The slots of overwritten and deleted rows are reused (see _release)
+                        self._columns, self._free_posns = tuple([] for _ in datafields), []
+                        super(ColumnarTicDatDict, self).__init__()
+                        for k, v in dict(*_args, **_kwargs).items():
+                            self[k] = v
+                        alldatadicts.append(self)
+                    def __setitem__(self, key, value):
+                        verify(containerish(key) ==  (keylen > 1) and
+                               (keylen == 1 or keylen == len(key)),
+                               "inconsistent key length for %s"%tablename)
+                        old_row = dict.get(self, key)
+                        super(ColumnarTicDatDict, self).__setitem__(key, self._own_row(value))
+                        self._release(old_row)
+                    def __delitem__(self, key):
+                        row = dict.get(self, key)
+                        super(ColumnarTicDatDict, self).__delitem__(key)
+                        self._release(row)
+                    def pop(self, key, *args):
+                        existed = key in self
+                        rtn = super(ColumnarTicDatDict, self).pop(key, *args)
+                        if existed:
+                            self._release(rtn)
+                        return rtn
+                    def popitem(self):
+                        rtn = super(ColumnarTicDatDict, self).popitem()
+                        self._release(rtn[1])
+                        return rtn
+                    def clear(self):
+                        rows = list(dict.values(self))
+                        super(ColumnarTicDatDict, self).clear()
+                        for row in rows:
+                            if isinstance(row, columnarrowfactory) and row._columns is self._columns:
+                                row._detach()
+                        for column in self._columns:
+                            del column[:]
+                        del self._free_posns[:]
+                    def _own_row(self, row):
+                        # stored in the slot of a row that has left the table, if there is one
+                        posn = self._free_posns[-1] if self._free_posns else None
+                        rtn = columnarrowfactory(row, self._columns, posn)
+                        if posn is not None:
+                            self._free_posns.pop()
+                        return rtn
+                    def _release(self, row):
+                        # a row that has left the table keeps its data, and its slot in the columns is freed
+                        if isinstance(row, columnarrowfactory) and row._columns is self._columns:
+                            posn = row._posn
+                            row._detach()
+                            for column in self._columns:
+                                column[posn] = None
+                            self._free_posns.append(posn)
+                    def _trusted_load(self, keys, data):
+                        # keys and data values that are known to be well formed, so can skip the verification
+                        keys, data, start = list(keys), list(data), len(self._columns[0])
+                        if len(self._columns) == 1:
+                            self._columns[0].extend(v[0] if isinstance(v, (list, tuple)) else v for v in data)
+                        else:
+                            for i, column in enumerate(self._columns):
+                                column.extend(v[i] for v in data)
+                        self._unchecked_update(zip(keys, [columnarrowfactory._trusted(self._columns, i)
+                                                          for i in range(start, start + len(keys))]))
+                    def _live_columns(self):
+                        # the columns, restricted to the rows currently in the table (in table order)
+                        posns = [row._posn for row in self.values()]
+                        if posns == list(range(len(self._columns[0]))):
+                            return self._columns
+                        return tuple([column[p] for p in posns] for column in self._columns)
+                assert dictish(ColumnarTicDatDict)
+                return ColumnarTicDatDict
             rowfactory = rowfactory_ or datarowfactory(tablename)
+            trustedrowfactory = getattr(rowfactory, "_trusted", rowfactory)
             if keylen > 0 :
-                class TicDatDict (FreezeableDict) :
+                class TicDatDict (_TicDatDictBase) :
+                    _lazy_links = getattr(rowfactory, "_lazy_links", None)
+                    _frozen_rows = getattr(rowfactory, "_frozen_rows", None)
+                    _owner = (superself, tablename) if not rowfactory_ else None
+                    _row_class = rowfactory
                     def __init__(self, *_args, **_kwargs):
-                        super(TicDatDict, self).__init__(*_args, **_kwargs)
+                        # the rows are made here so that they share this table's row class (see lazy links)
+                        super(TicDatDict, self).__init__()
+                        for k, v in dict(*_args, **_kwargs).items():
+                            self[k] = v
                         alldatadicts.append(self)
                     def __setitem__(self, key, value):
                         verify(containerish(key) ==  (keylen > 1) and
                                (keylen == 1 or keylen == len(key)),
                                "inconsistent key length for %s"%tablename)
                         return super(TicDatDict, self).__setitem__(key, rowfactory(value))
-                    def __getitem__(self, item):
-                        if (item not in self) and (not getattr(self, "_dataFrozen", False)):
-                            self[item] = rowfactory({})
-                        return super(TicDatDict, self).__getitem__(item)
+                    def _trusted_load(self, keys, data):
+                        # keys and data values that are known to be well formed, so can skip the verification
+                        self._unchecked_update(zip(keys, map(trustedrowfactory, data)))
                 assert dictish(TicDatDict)
                 return TicDatDict
             class TicDatDataList(clt.abc.MutableSequence):
+                _frozen_rows = getattr(rowfactory, "_frozen_rows", None)
+                _owner = (superself, tablename) if not rowfactory_ else None
+                _row_class, _journal = rowfactory, None
                 def __init__(self, *_args):
                     self._list = list()
                     self.extend(list(_args))
+                def _record_change(self):
+                    if self._journal is not None:
+                        self._journal.everything = True
                 def __len__(self): return len(self._list)
-                def __getitem__(self, i): return self._list[i]
-                def __delitem__(self, i): del self._list[i]
+                def __getitem__(self, i):
+                    if isinstance(i, slice):
+                        return [self[j] for j in range(*i.indices(len(self._list)))]
+                    rtn = self._list[i]
+                    if isinstance(rtn, rowfactory):
+                        return rtn
+                    # a row shared with the table this was copied from (see _shared_load)
+                    rtn = self._list[i] = rowfactory(rtn)
+                    return rtn
+                def __delitem__(self, i):
+                    del self._list[i]
+                    self._record_change()
                 def __setitem__(self, i, v):
                     self._list[i] = rowfactory(v)
+                    self._record_change()
                 def insert(self, i, v):
                     self._list.insert(i, rowfactory(v))
+                    self._record_change()
+                def _trusted_load(self, rows):
+                    # data rows that are known to be well formed, so can skip the verification
+                    self._list.extend(map(trustedrowfactory, rows))
+                def _shared_load(self, rows):
+                    # the (frozen) rows of another table, to be copied into this table as they are read
+                    self._list.extend(rows)
                 def __repr__(self):
                     return "td:" + self._list.__repr__()
             assert containerish(TicDatDataList) and not dictish(TicDatDataList)
@@ -639,6 +1044,20 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
             def generatorFunction() :
                 for row in (data if containerish(data) else data()):
                     yield drf(row)
+            def batches(batch_size=10000, as_data_frame=False):
+                verify(isinstance(batch_size, int) and batch_size > 0, "batch_size should be a positive integer")
+                verify(DataFrame or not as_data_frame, "pandas needs to be installed to batch as DataFrames")
+                fields = self.data_fields[tablename]
+                source_batches = getattr(data, "batches", None)
+                if source_batches:
+                    # the data source can batch for itself, which is cheaper than batching the rows
+                    source = (list(map(tuple, b)) for b in source_batches(batch_size=batch_size))
+                else:
+                    rows = (tuple(r[f] for f in fields) for r in generatorFunction())
+                    source = iter(lambda : list(islice(rows, batch_size)), [])
+                for batch in source:
+                    yield DataFrame(batch, columns=fields) if as_data_frame else batch
+            generatorFunction.batches = batches
             return generatorFunction
         class _TicDat(utils.freezable_factory(object, "_isFrozen")) :
             def _freeze(self):
@@ -647,17 +1066,22 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                 for t in set(superself.all_tables).difference(superself.generic_tables):
                     _t = getattr(self, t)
                     if utils.dictish(_t) or utils.containerish(_t) :
-                        for v in getattr(_t, "values", lambda : _t)() :
-                            if not getattr(v, "_dataFrozen", False) :
-                                v._dataFrozen =True
-                                v._attributesFrozen = True
-                            else : # we freeze the data-less ones off the bat as empties
-                                assert (len(v) == 0) and v._attributesFrozen
+                        if getattr(_t, "_frozen_rows", None) is not None:
+                            # all the rows of the table share a row class, so they can be frozen in one step
+                            _t._frozen_rows[:] = [True]
+                        else:
+                            for v in getattr(_t, "values", lambda : _t)() :
+                                if not getattr(v, "_dataFrozen", False) :
+                                    v._dataFrozen =True
+                                    v._attributesFrozen = True
+                                else : # we freeze the data-less ones off the bat as empties
+                                    assert (len(v) == 0) and v._attributesFrozen
                         if utils.dictish(_t) :
                             _t._dataFrozen  = True
                             _t._attributesFrozen = True
                         elif utils.containerish(_t) :
-                            setattr(self, t, tuple(_t))
+                            # not a change to the data, so bypasses the change tracking in __setattr__
+                            super(_TicDat, self).__setattr__(t, tuple(getattr(_t, "_list", _t)))
                     else :
                         assert callable(_t) and t in superself.generator_tables
                 for _t in getattr(self, "_allDataDicts", ()) :
@@ -665,13 +1089,77 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                         _t._dataFrozen  = True
                         _t._attributesFrozen = True
                 self._isFrozen = True
+            def __setattr__(self, key, value):
+                journals = self.__dict__.get("_change_journals")
+                if journals and key in journals:
+                    journals[key].everything = True # the table is being replaced wholesale
+                super(_TicDat, self).__setattr__(key, value)
+            def _start_change_tracking(self):
+                tracked = set(superself.all_tables).difference(superself.generic_tables, superself.generator_tables)
+                if "_own_tables" not in self.__dict__:
+                    # the tables made by __init__ each have a table class and row class of their own
+                    self.__dict__["_own_tables"] = {t: getattr(self, t) for t in tracked
+                                                    if getattr(getattr(self, t), "_owner", None) == (superself, t)}
+                journals = {}
+                for t in tracked:
+                    journals[t] = _TableChangeJournal()
+                    _t = getattr(self, t)
+                    if getattr(self, "_isFrozen", False):
+                        continue
+                    if _t is self._own_tables.get(t):
+                        # the journal can be stored on the table class and row class
+                        type(_t)._journal = type(_t)._row_class._journal = journals[t]
+                    else:
+                        # a table that replaced one made by __init__ (i.e. with tic_dat.table = {...}) can't record
+                        # its edits, so it is always treated as changed in full
+                        journals[t].everything = True
+                self.__dict__["_change_journals"] = journals # not a change to the data, so allowed even if frozen
             def __repr__(self):
                 tlen = lambda t: utils.safe_apply(len)(getattr(self, t))
                 return "td: {" + ", ".join("%s: %s"%(t, tlen(t)) for t in superself.all_tables) + "}"
         class TicDat(_TicDat) :
             def _generatorfactory(self, data, tableName):
                 return generatorfactory(data, tableName)
-            def __init__(self, **init_tables):
+            @classmethod
+            def from_rows(cls, trusted=False, **tables):
+                """
+                Create a TicDat object from table data, optionally skipping the per row verification.
+
+                :param trusted: boolean. If falsey, this is the same as calling the TicDat constructor.
+                                If truthy, then each table that is a dict or a list is assumed to be well formed,
+                                and is loaded in bulk without checking the individual rows. This is intended for
+                                data whose shape has already been checked, such as the data produced by the
+                                file readers.
+
+                :param tables: the table data, keyed by table name. For trusted loading, each primary key table
+                               is either a dict mapping primary keys to data values, or a list of full rows
+                               (primary key fields followed by data fields). Each table without primary key
+                               fields is a list of data values. The data values for a row are a list or tuple
+                               in data field order (or a single value for a table with one data field).
+                               Tables that aren't dicts or lists (as well as generic and generator tables)
+                               are handled by the TicDat constructor.
+
+                :return: a TicDat object
+                """
+                if not trusted:
+                    return cls(**tables)
+                verify(set(tables).issubset(superself.all_tables),
+                       "Unexpected table names %s"%set(tables).difference(superself.all_tables))
+                trusted_tables = {} # the arguments to pass to each table's _trusted_load
+                for t, v in tables.items():
+                    if t not in superself.generic_tables and t not in superself.generator_tables and \
+                       (dictish(v) or isinstance(v, (list, tuple))):
+                        keylen = len(superself.primary_key_fields.get(t, ()))
+                        if not keylen:
+                            trusted_tables[t] = (v,)
+                        elif dictish(v):
+                            trusted_tables[t] = (v.keys(), v.values())
+                        else:
+                            trusted_tables[t] = ([r[0] for r in v] if keylen == 1 else [tuple(r[:keylen]) for r in v],
+                                                 [r[keylen:] for r in v])
+                return cls(_trusted_tables=trusted_tables,
+                           **{t: v for t, v in tables.items() if t not in trusted_tables})
+            def __init__(self, _trusted_tables=None, _shared_tables=None, **init_tables):
                 superself._trigger_has_been_used()
                 self._all_data_dicts = []
                 self._made_foreign_links = False
@@ -689,14 +1177,13 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                         v = DataFrame(v)
                         v.rename(columns = {v.columns[0] : superself.data_fields[t][0]}, inplace=True)
                     if DataFrame and isinstance(v, DataFrame):
-                      row_dict = lambda r : {df:r[df] for df in superself.data_fields.get(t, ())}
+                      # the index and columns have been checked against the schema, so the rows can be
+                      # assembled from whole columns and trusted
+                      data_fields = superself.data_fields.get(t, ())
+                      rows = list(zip(*[v[f].tolist() for f in data_fields])) if data_fields else [()] * len(v)
                       setattr(self, t, ticdattablefactory(self._all_data_dicts, t)())
-                      if superself.primary_key_fields.get(t) :
-                          def add_row(r):
-                              getattr(self, t)[r.name] = row_dict(r)
-                          v.apply(add_row, axis=1)
-                      else :
-                          v.apply(lambda r : getattr(self, t).append(row_dict(r)), axis=1)
+                      getattr(self, t)._trusted_load(*((v.index.tolist(), rows) if superself.primary_key_fields.get(t)
+                                                       else (rows,)))
                     elif superself.primary_key_fields.get(t) and not utils.dictish(v):
                          pklen = len(superself.primary_key_fields[t])
                          def handle_row_dict(r):
@@ -704,11 +1191,11 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                                  return r
                              return [r.get(k, 0) for k in superself.primary_key_fields[t] +
                                       superself.data_fields.get(t,[])]
-                         drf = datarowfactory(t) # lots of verification inside the datarowfactory
+                         # the table makes the rows, and there is lots of verification inside the row factory
                          setattr(self, t, ticdattablefactory(self._all_data_dicts, t)(
                              {r if not utils.containerish(r) else
                               (r[0] if pklen == 1 else tuple(r[:pklen])):
-                              drf([] if not utils.containerish(r) else r[pklen:])
+                              [] if not utils.containerish(r) else r[pklen:]
                               for _r in v for r in [handle_row_dict(_r)]}
                          ))
                     elif superself.primary_key_fields.get(t) :
@@ -717,9 +1204,9 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                                 (len(_k) == len(superself.primary_key_fields.get(t, ())) > 1)
                                 or len(superself.primary_key_fields.get(t, ())) == 1),
                            "Unexpected number of primary key fields for %s"%t)
-                     drf = datarowfactory(t) # lots of verification inside the datarowfactory
+                     # the table makes the rows, and there is lots of verification inside the row factory
                      setattr(self, t, ticdattablefactory(self._all_data_dicts, t)(
-                                    {_k : drf(v[_k] if utils.dictish(v) else ()) for _k in v}))
+                                    {_k : v[_k] if utils.dictish(v) else () for _k in v}))
                     elif t in superself.generator_tables :
                         setattr(self, t, generatorfactory(v, t))
                     else :
@@ -732,8 +1219,14 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                         setattr(self, t, DataFrame())
                     else :
                         setattr(self, t, ticdattablefactory(self._all_data_dicts, t)())
-                if init_tables :
+                for t, v in (_trusted_tables or {}).items():
+                    getattr(self, t)._trusted_load(*v)
+                for t, v in (_shared_tables or {}).items():
+                    getattr(self, t)._shared_load(v)
+                if init_tables or _trusted_tables or _shared_tables :
                     self._try_make_foreign_links()
+                if superself._change_tracking_enabled:
+                    self._start_change_tracking()
             def _try_make_foreign_links(self):
                 if not superself._foreign_key_links_enabled:
                     return
@@ -741,6 +1234,7 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                        "prevents foreign_key_links")%((superself._complex_fks() or [(None,)*3])[0][:2]))
                 assert not self._made_foreign_links, "call once"
                 self._made_foreign_links = True
+                lazy = superself._foreign_key_links_enabled == ["lazy"]
                 can_link_w_me = lambda t : t not in superself.generator_tables and \
                                            superself.primary_key_fields.get(t)
                 for fk in superself.foreign_keys :
@@ -750,44 +1244,54 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                         nativefields = fk.nativefields()
                         linkname = superself._linkName[t, fk.foreign_table, frozenset(nativefields)]
                         if linkname not in ("keys", "items", "values") :
-                            ft = getattr(self, fk.foreign_table)
-                            foreign_pk = superself.primary_key_fields[fk.foreign_table]
-                            local_pk = superself.primary_key_fields[t]
-                            assert all(pk for pk in (foreign_pk, local_pk))
-                            reversemapping  = fk.foreigntonativemapping()
-                            if len(nativefields) == 1:
-                                assert set(foreign_pk) =={fk.mapping.foreign_field}
+                            if lazy:
+                                # built the first time the link attribute is looked up on any foreign table row.
+                                # the rows might be frozen by then, so the links are set without the freezing checks
+                                getattr(self, fk.foreign_table)._lazy_links[linkname] = \
+                                    functools.partial(self._make_foreign_link, fk, linkname,
+                                                      lambda row, name, value : row._set_link(name, value))
                             else:
-                                assert set(foreign_pk) == {_.foreign_field for _ in fk.mapping}
-                            appendage_fk = fk.cardinality == "one-to-one"
-                            tablefields = superself.primary_key_fields.get(t, ()) + \
-                                          superself.data_fields.get(t, ())
-                            local_posn = {x:tablefields.index(reversemapping[x])
-                                             for x in foreign_pk}
-                            unused_local_posn = {i for i,_ in enumerate(tablefields) if i not in
-                                                    local_posn.values()}
-                            if not appendage_fk :
-                                new_pk = tuple(x for x in local_pk if x not in nativefields)
-                                new_data_dct = ticdattablefactory(self._all_data_dicts, linkname,
-                                                new_pk, lambda x : x)
-                                for row in ft.values() :
-                                    setattr(row, linkname, new_data_dct())
-                            for key,row in getattr(self, t).items() :
-                                keyrow = ((key,) if not containerish(key) else key) + \
-                                         tuple(row[x] for x in superself.data_fields[t])
-                                lookup = tuple(keyrow[local_posn[x]] for x in foreign_pk)
-                                linkrow = ft.get(lookup[0] if len(lookup) ==1 else lookup, None)
-                                if linkrow is not None :
-                                    if appendage_fk :
-                                        # the attribute is simply a reference to the mapping table
-                                        assert not hasattr(linkrow, linkname)
-                                        setattr(linkrow, linkname,row)
-                                    else :
-                                        _key = keyrow[:-len(row)] if row else keyrow
-                                        _key = tuple(x for i,x in enumerate(_key)
-                                                     if i in unused_local_posn)
-                                        getattr(linkrow, linkname)\
-                                            [_key[0] if len(_key) == 1 else _key] = row
+                                self._make_foreign_link(fk, linkname, setattr)
+            def _make_foreign_link(self, fk, linkname, set_link):
+                t, nativefields = fk.native_table, fk.nativefields()
+                ft = getattr(self, fk.foreign_table)
+                foreign_pk = superself.primary_key_fields[fk.foreign_table]
+                local_pk = superself.primary_key_fields[t]
+                assert all(pk for pk in (foreign_pk, local_pk))
+                reversemapping  = fk.foreigntonativemapping()
+                if len(nativefields) == 1:
+                    assert set(foreign_pk) =={fk.mapping.foreign_field}
+                else:
+                    assert set(foreign_pk) == {_.foreign_field for _ in fk.mapping}
+                appendage_fk = fk.cardinality == "one-to-one"
+                tablefields = superself.primary_key_fields.get(t, ()) + \
+                              superself.data_fields.get(t, ())
+                local_posn = {x:tablefields.index(reversemapping[x])
+                                 for x in foreign_pk}
+                unused_local_posn = {i for i,_ in enumerate(tablefields) if i not in
+                                        local_posn.values()}
+                if not appendage_fk :
+                    new_pk = tuple(x for x in local_pk if x not in nativefields)
+                    new_data_dct = ticdattablefactory(self._all_data_dicts, linkname,
+                                    new_pk, lambda x : x)
+                    for row in ft.values() :
+                        set_link(row, linkname, new_data_dct())
+                for key,row in getattr(self, t).items() :
+                    keyrow = ((key,) if not containerish(key) else key) + \
+                             tuple(row[x] for x in superself.data_fields[t])
+                    lookup = tuple(keyrow[local_posn[x]] for x in foreign_pk)
+                    linkrow = ft.get(lookup[0] if len(lookup) ==1 else lookup, None)
+                    if linkrow is not None :
+                        if appendage_fk :
+                            # the attribute is simply a reference to the mapping table
+                            assert not hasattr(linkrow, linkname)
+                            set_link(linkrow, linkname,row)
+                        else :
+                            _key = keyrow[:-len(row)] if row else keyrow
+                            _key = tuple(x for i,x in enumerate(_key)
+                                         if i in unused_local_posn)
+                            getattr(linkrow, linkname)\
+                                [_key[0] if len(_key) == 1 else _key] = row
 
         self.TicDat = TicDat
         self.xls = xls.XlsTicFactory(self)
@@ -919,7 +1423,8 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
 
     def _allFields(self, table):
         assert table in self.all_tables
-        return set(self.primary_key_fields.get(table, ())).union(self.data_fields.get(table, ()))
+        return self._cached_once_used(("all_fields", table), lambda :
+            frozenset(self.primary_key_fields.get(table, ())).union(self.data_fields.get(table, ())))
 
     def good_tic_dat_object(self, data_obj, bad_message_handler = lambda x : None):
         """
@@ -986,6 +1491,10 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                    "Expecting a container of rows or a generator function of rows for %s"%table_name)
             return self._good_data_rows(data_table if containerish(data_table) else data_table(),
                                       table_name, bad_message_handler)
+        owner = getattr(data_table, "_owner", None)
+        if owner and owner[0] is self and owner[1] == table_name:
+            # this factory's own table class verifies every key and row as it is added
+            return True
         if pd and isinstance(data_table, pd.Series) and len(self.data_fields.get(table_name, ())) == 1:
             data_table = DataFrame(data_table)
             data_table.rename(columns = {data_table.columns[0] : self.data_fields[table_name][0]},
@@ -1120,12 +1629,89 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                         return False
             else :
                 _iter = lambda x : x if containerish(x) else x()
-                if not len(list(_iter(t1))) == len(list(_iter(t2))) :
+                rows1, rows2 = list(_iter(t1)), list(_iter(t2))
+                if not len(rows1) == len(rows2) :
                     return False
-                for r1 in _iter(t1):
-                    if not any (samerow(r1, r2) for r2 in _iter(t2)) :
+                same = None if t in self.generic_tables else \
+                       self._same_keyless_rows(t, rows1, rows2, epsilon, nans_are_same_for_data_rows, samerow)
+                if same is not None:
+                    if not same:
+                        return False
+                    continue
+                for r1 in rows1:
+                    if not any (samerow(r1, r2) for r2 in rows2) :
                         return False
         return True
+    def _same_keyless_rows(self, table, rows1, rows2, epsilon, nans_are_same, samerow):
+        # compares the rows of a table without primary keys as multisets, in (nearly) linear time
+        # returns None if the rows can't be compared this way, in which case the caller compares row by row
+        fields = self.data_fields.get(table, ())
+        _nan = float("nan") # stands in for every null value when nans_are_same
+        def is_nan(x):
+            try:
+                return bool(x != x)
+            except Exception: # i.e. pandas.NA
+                return True
+        kinds = {} # the rows are checked by type, since the rows of a table typically share a type
+        def kind(r):
+            if type(r) not in kinds:
+                kinds[type(r)] = ("row" if set(getattr(type(r), "_fieldtoindex", ())) == set(fields) else "dict") \
+                                 if dictish(r) else "other"
+            return kinds[type(r)]
+        values = ([], [])
+        for rows, _values in zip([rows1, rows2], values):
+            for r in rows:
+                _kind = kind(r)
+                if _kind != "other":
+                    if _kind == "dict" and set(r) != set(fields):
+                        return None
+                    v = tuple(map(r.__getitem__, fields))
+                else:
+                    v = tuple(r) if containerish(r) else (r,)
+                    if len(v) != len(fields):
+                        return None
+                if nans_are_same:
+                    v = tuple(_nan if (x is None or is_nan(x)) else x for x in v)
+                elif any(map(is_nan, v)):
+                    # without epsilon, samerow never matches a NaN in a dict row. with epsilon, nearly_same can
+                    # match a NaN to any value, so these rows are left to the row by row comparison
+                    return False if _kind != "other" and not epsilon else None
+                _values.append(v)
+        try:
+            counts1, counts2 = clt.Counter(values[0]), clt.Counter(values[1])
+        except TypeError: # unhashable data
+            return None
+        if counts1 == counts2:
+            return True
+        if not epsilon:
+            return False
+        # match the remaining rows within epsilon. Rows can only match if their non-numeric values are the same,
+        # and sorting the rows of each such group will pair off the nearly same rows in all but unusual cases
+        numeric_types = {}
+        def numeric(x):
+            if type(x) not in numeric_types:
+                numeric_types[type(x)] = utils.numericish(x)
+            return numeric_types[type(x)] and x is not _nan
+        groups = clt.defaultdict(lambda : ([], []))
+        for i, counts in enumerate([counts1 - counts2, counts2 - counts1]):
+            for v, n in counts.items():
+                if _nan in v: # as above, nearly_same can match a NaN to any value
+                    return None
+                groups[tuple(None if numeric(x) else (x,) for x in v)][i].extend([v] * n)
+        same = lambda v1, v2: samerow(dict(zip(fields, v1)), dict(zip(fields, v2)))
+        sort_key = lambda v: tuple(x for x in v if numeric(x))
+        for left, right in groups.values():
+            if len(left) != len(right):
+                return False
+            left, right = sorted(left, key=sort_key), sorted(right, key=sort_key)
+            if all(same(v1, v2) for v1, v2 in zip(left, right)):
+                continue
+            for v1 in left:
+                match = next((i for i, v2 in enumerate(right) if same(v1, v2)), None)
+                if match is None:
+                    return False
+                right.pop(match)
+        return True
     def clone(self, table_restrictions=None):
         """
         clones the TicDatFactory
@@ -1141,13 +1727,21 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
             if table_restrictions is None or tbl in table_restrictions:
                 for pn, p in row_predicates.items():
                     rtn.add_data_row_predicate(tbl, predicate=p, predicate_name=pn)
-        rtn.enable_foreign_key_links() if self._foreign_key_links_enabled else None
+        rtn.enable_foreign_key_links(lazy=self._foreign_key_links_enabled == ["lazy"]) \
+            if self._foreign_key_links_enabled else None
+        rtn.enable_columnar_storage() if self._columnar_storage_enabled else None
+        rtn.enable_change_tracking() if self._change_tracking_enabled else None
         return rtn
     def copy_tic_dat(self, tic_dat, freeze_it = False):
         """
         copies the tic_dat object into a new tic_dat object
         performs a deep copy
 
+        If tic_dat is a frozen TicDat object made by this factory (and foreign key links are not enabled),
+        then the copy shares the rows of tic_dat, and each row is copied over only when it is first read
+        from the returned object. This makes copying a frozen object (see freeze_me) very fast, and
+        the rows that are never read from the copy cost no additional memory.
+
         :param tic_dat: a ticdat object
 
         :param freeze_it: boolean. should the returned object be frozen?
@@ -1157,7 +1751,14 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         msg  = []
         verify(self.good_tic_dat_object(tic_dat, msg.append),
                "tic_dat not a good object for this factory : %s"%"\n".join(msg))
-        rtn = self.TicDat(**{t:getattr(tic_dat, t) for t in self.all_tables})
+        if getattr(tic_dat, "_isFrozen", False) and isinstance(tic_dat, self.TicDat) and \
+           not self._foreign_key_links_enabled:
+            # a frozen TicDat can't change, so its rows can be shared safely
+            shared = set(self.all_tables).difference(self.generic_tables, self.generator_tables)
+            rtn = self.TicDat(_shared_tables={t:getattr(tic_dat, t) for t in shared},
+                              **{t:getattr(tic_dat, t) for t in set(self.all_tables).difference(shared)})
+        else:
+            rtn = self.TicDat(**{t:getattr(tic_dat, t) for t in self.all_tables})
         return self.freeze_me(rtn) if freeze_it else rtn
     def copy_from_ampl_variables(self, ampl_variables):
         """
@@ -1342,9 +1943,13 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                 pks = self.primary_key_fields[tname]
                 dfs = self.data_fields.get(tname, tuple())
                 cols = pks + dfs
-                df = DataFrame([ (list(k) if containerish(k) else [k]) + [v[_] for _ in dfs]
-                              for k,v in _sorted(getattr(tic_dat, tname).items())],
-                              columns =cols)
+                if hasattr(tdtable, "_live_columns"): # columnar storage, so no need to walk the rows
+                    pk_columns = [list(tdtable)] if len(pks) == 1 else [list(_) for _ in zip(*tdtable)]
+                    df = DataFrame(dict(zip(cols, pk_columns + list(tdtable._live_columns()))), columns=cols)
+                else:
+                    df = DataFrame([ (list(k) if containerish(k) else [k]) + [v[_] for _ in dfs]
+                                  for k,v in _sorted(getattr(tic_dat, tname).items())],
+                                  columns =cols)
                 df.set_index(list(pks), inplace=True,
                              drop= bool(dfs if drop_pk_columns == None else drop_pk_columns))
                 utils.Sloc.add_sloc(df)
@@ -1399,59 +2004,69 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         """
         verify(verbosity in ["High", "Low"], "verbosity needs to be either 'High' or 'Low'")
         assert self.good_tic_dat_object(tic_dat), "tic_dat not a good object for this factory"
+        rtn = self._find_foreign_key_failures(tic_dat)
+        if verbosity == "Low":
+            rtn = {tuple(k[:2]) + (tuple(k[2]),): tuple(v) for k,v in rtn.items()}
+        return rtn
+    def _find_foreign_key_failures(self, tic_dat):
         rtn_values, rtn_pks = clt.defaultdict(set), clt.defaultdict(set)
-
-        def getcell(tblname, native_pk, native_data_row, field_name):
-             assert field_name in self.primary_key_fields.get(tblname, ()) + \
-                                  self.data_fields.get(tblname, ())
-             if [field_name] == list(self.primary_key_fields.get(tblname, ())):
-                 return native_pk
-             if field_name in native_data_row:
-                 return native_data_row[field_name]
-             return native_pk[self.primary_key_fields[tblname].index(field_name)]
-
-        table_data = defaultdict(set)
-        def get_table_data(tblname, fields):
-            if fields == self.primary_key_fields.get(tblname, ()):
-                return getattr(tic_dat, tblname)
-            if (tblname, fields) not in table_data:
-                add_here = table_data[tblname, fields]
-                tbl = getattr(tic_dat, tblname)
-                for k,v in (tbl.items() if dictish(tbl) else enumerate(tbl)):
-                    add_here.add(tuple(getcell(tblname, k, v, f) for f in fields))
-            return table_data[tblname, fields]
-
-        for native, fks in self._foreign_keys_by_native().items():
-            def getcell_(native_pk, native_data_row, field_name):
-                 return getcell(native, native_pk, native_data_row, field_name)
-            for fk in fks:
-                foreign_to_native = fk.foreigntonativemapping()
-                for native_pk, native_data_row in (getattr(tic_dat, native).items()
-                            if dictish(getattr(tic_dat, native))
-                            else enumerate(getattr(tic_dat, native))):
-                    ffs = tuple(_ff for _ff in self.primary_key_fields.get(fk.foreign_table, ()) +
-                                self.data_fields.get(fk.foreign_table, ())
-                                if _ff in foreign_to_native)
-                    foreign_look_up = tuple(getcell_(native_pk, native_data_row, foreign_to_native[_ff])
-                                        for _ff in ffs)
-                    if ffs == self.primary_key_fields.get(fk.foreign_table) and len(ffs)==1:
-                        foreign_look_up = foreign_look_up[0]
-                    foreign_look_into = get_table_data(fk.foreign_table, ffs)
-                    if foreign_look_up not in foreign_look_into:
-                        rtn_pks[fk].add(native_pk)
-                        if type(fk.mapping) is ForeignKeyMapping :
-                            rtn_values[fk].add(getcell_(native_pk, native_data_row,
-                                                        fk.mapping.native_field))
-                        else:
-                            rtn_values[fk].add(tuple(getcell_(native_pk,
-                                                native_data_row, _.native_field) for _ in fk.mapping))
+        table_items = lambda t: getattr(tic_dat, t).items() if dictish(getattr(tic_dat, t)) \
+                                else enumerate(getattr(tic_dat, t))
+        look_into = {}
+        def get_look_into(check):
+            if check.foreign_look_up is None: # i.e. look into the foreign table itself
+                return getattr(tic_dat, check.fk.foreign_table)
+            key = (check.fk.foreign_table, check.foreign_fields)
+            if key not in look_into:
+                look_into[key] = {check.foreign_look_up(k, v) for k, v in table_items(key[0])}
+            return look_into[key]
+
+        for native, checks in self._foreign_key_failures_plan().items():
+            checks = [(check, get_look_into(check)) for check in checks]
+            for native_pk, native_data_row in table_items(native):
+                for check, foreign_look_into in checks:
+                    if check.native_look_up(native_pk, native_data_row) not in foreign_look_into:
+                        rtn_pks[check.fk].add(native_pk)
+                        rtn_values[check.fk].add(check.native_values(native_pk, native_data_row))
         assert set(rtn_pks) == set(rtn_values)
         RtnType = namedtuple("ForeignKeyFailures", ("native_values", "native_pks"))
 
-        rtn = {k:RtnType(tuple(rtn_values[k]), tuple(rtn_pks[k])) for k in rtn_pks}
-        if verbosity == "Low":
-            rtn = {tuple(k[:2]) + (tuple(k[2]),): tuple(v) for k,v in rtn.items()}
-        return rtn
+        return {k:RtnType(tuple(rtn_values[k]), tuple(rtn_pks[k])) for k in rtn_pks}
+    def find_all_failures(self, tic_dat):
+        """
+        Performs all the data integrity checks for a ticdat object. This is equivalent to calling
+        find_data_type_failures, find_data_row_failures and find_foreign_key_failures (with default arguments)
+        except that tic_dat is only validated once, and each table is only walked once for both the
+        data type and the data row checks.
+
+        :param tic_dat: ticdat object
+
+        :return: A namedtuple with members "duplicates", "data_type_failures", "data_row_failures",
+                 "foreign_key_failures" and "timings". The data_type_failures, data_row_failures and
+                 foreign_key_failures members are the dictionaries that would be returned by the corresponding
+                 find_ function. duplicates is always an empty dictionary, since ticdat tables can't store
+                 duplicate primary keys (it is provided for symmetry with PanDatFactory.find_all_failures, and
+                 find_duplicates can be used to check the source data). timings is a dictionary mapping each step
+                 of the work ("good_tic_dat_object", "data_type_and_row_failures", "foreign_key_failures")
+                 to the number of seconds it took.
+        """
+        timings = {}
+        start = time.perf_counter()
+        def record_time(step):
+            nonlocal start
+            timings[step] = time.perf_counter() - start
+            start = time.perf_counter()
+        assert self.good_tic_dat_object(tic_dat), "tic_dat not a good object for this factory"
+        record_time("good_tic_dat_object")
+        rtn_values, rtn_pks, rtn_rows = self._find_data_type_and_row_failures(tic_dat)
+        data_type_failures = self._data_type_failures_result(rtn_values, rtn_pks)
+        data_row_failures = self._data_row_failures_result(rtn_rows)
+        record_time("data_type_and_row_failures")
+        foreign_key_failures = self._find_foreign_key_failures(tic_dat)
+        record_time("foreign_key_failures")
+        AllFailures = clt.namedtuple("AllFailures", ["duplicates", "data_type_failures", "data_row_failures",
+                                                     "foreign_key_failures", "timings"])
+        return AllFailures({}, data_type_failures, data_row_failures, foreign_key_failures, timings)
     def create_full_parameters_dict(self, dat):
         """
         create a fully populated dictionary of all the parameters
@@ -1496,14 +2111,6 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
             return self.remove_foreign_key_failures(tic_dat)
         return tic_dat
 
-    def _get_full_row(self, ticdat, table, pk):
-        full_row = dict(getattr(ticdat, table)[pk])
-        if len(self.primary_key_fields[table]) == 1:
-            full_row[self.primary_key_fields[table][0]] = pk
-        else:
-            full_row = dict(full_row, **{f:d for f,d in
-                                         zip(self.primary_key_fields[table], pk)})
-        return full_row
     def find_data_type_failures(self, tic_dat):
         """
         Finds the data type failures for a ticdat object
@@ -1534,38 +2141,107 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
          See issue https://github.com/ticdat/ticdat/issues/46 for more info.
         """
         assert self.good_tic_dat_object(tic_dat), "tic_dat not a good object for this factory"
-
-
-        rtn_values, rtn_pks = clt.defaultdict(set), clt.defaultdict(set)
-        tmp_tdf = TicDatFactory.create_from_full_schema(self.schema(include_ancillary_info=True))
-        for t, pks in self.primary_key_fields.items():
-            for pk in pks:
-                if pk not in self._data_types.get(t, ()):
-                    tmp_tdf.set_data_type(t, pk, number_allowed=True,
-                      inclusive_min=True, inclusive_max=True, min=-float("inf"), max=float("inf"),
-                      must_be_int=False, strings_allowed='*', nullable=False, datetime=False)
-
-        for table, type_row in tmp_tdf._data_types.items():
-            _table = getattr(tic_dat, table)
-            if dictish(_table):
-                for pk  in _table:
-                    full_row = self._get_full_row(tic_dat, table, pk)
-                    for field, data_type in type_row.items():
-                        if not data_type.valid_data(full_row[field]) :
-                            rtn_values[(table, field)].add(full_row[field])
-                            rtn_pks[(table, field)].add(pk)
-            elif containerish(_table):
-                for pk, data_row in enumerate(_table):
-                    for field, data_type in type_row.items():
-                        if not data_type.valid_data(data_row[field]) :
-                            rtn_values[(table, field)].add(data_row[field])
-                            rtn_pks[(table, field)].add(pk)
+        rtn_values, rtn_pks, _ = self._find_data_type_and_row_failures(tic_dat, data_row_predicates=False)
+        return self._data_type_failures_result(rtn_values, rtn_pks)
+    def _data_type_failures_result(self, rtn_values, rtn_pks):
         assert set(rtn_values).issuperset(set(rtn_pks))
         TableField = clt.namedtuple("TableField", ["table", "field"])
         ValuesPks = clt.namedtuple("ValuesPks", ["bad_values", "pks"])
         return {TableField(*tf):ValuesPks(tuple(rtn_values[tf]),
                                           tuple(rtn_pks[tf]) if tf in rtn_pks else None)
                 for tf in rtn_values}
+    def _true_data_types(self):
+        '''
+        See issue https://github.com/ticdat/ticdat/issues/46  and the doc string for find_data_type_failures
+        for more info
+        :return: the data types, with a not-Null data type added for the primary key fields that lack a data type
+        '''
+        def make_true_data_types():
+            pk_data_type = TypeDictionary.safe_creator(number_allowed=True, inclusive_min=True, inclusive_max=True,
+                              min=-float("inf"), max=float("inf"), must_be_int=False, strings_allowed='*',
+                              nullable=False, datetime=False)
+            rtn = clt.defaultdict(dict, {t: dict(v) for t, v in self._data_types.items() if v})
+            for t, pks in self.primary_key_fields.items():
+                for pk in pks:
+                    if pk not in self._data_types.get(t, ()):
+                        rtn[t][pk] = pk_data_type
+            return FrozenDict({t: FrozenDict(v) for t, v in rtn.items()})
+        return self._cached_once_used("true_data_types", make_true_data_types)
+    def _all_data_row_predicates(self):
+        # the user specified row predicates, along with the predicate implied by add_parameter
+        data_row_predicates = {k: dict(v) for k,v in self._data_row_predicates.items()}
+        if self._parameters:
+            def good_parameter(row):
+                k = row[self.primary_key_fields["parameters"][0]]
+                v = row[self.data_fields["parameters"][0]]
+                chk = self._parameters.get(k)
+                return chk and (chk.type_dictionary is None or chk.type_dictionary.valid_data(v))
+            _ = "Good Name/Value Check"
+            make_name = lambda i: _ if _ not in self._data_row_predicates.get("parameters", {}) else f"{_}_{i}"
+            predicate_name = next(make_name(i) for i in count() if make_name(i) not in
+                                  self._data_row_predicates.get("parameters", {}))
+            data_row_predicates["parameters"] = data_row_predicates.get("parameters", {})
+            data_row_predicates["parameters"][predicate_name] = good_parameter
+        return data_row_predicates
+    def _find_data_type_and_row_failures(self, tic_dat, data_types=True, data_row_predicates=True):
+        '''
+        the validation engine behind find_data_type_failures and find_data_row_failures. Each table is walked once,
+        and each record is materialized into a single full row that is checked against every data type
+        and every row predicate.
+        :return: a triplet of defaultdict(set) - the data type failure values and pks, keyed by (table, field),
+                 and the row predicate failure pks (or row positions), keyed by (table, predicate_name)
+        '''
+        rtn_values, rtn_pks, rtn_rows = clt.defaultdict(set), clt.defaultdict(set), clt.defaultdict(set)
+        true_data_types = self._true_data_types() if data_types else {}
+        all_predicates = self._all_data_row_predicates() if data_row_predicates else {}
+        def _p(p, row):
+            try:
+                return p(row)
+            except:
+                return False
+        for table in set(true_data_types).union(all_predicates):
+            type_row = tuple(true_data_types.get(table, {}).items())
+            predicates = tuple(all_predicates.get(table, {}).items())
+            _table = getattr(tic_dat, table)
+            if dictish(_table) and hasattr(_table, "_live_columns") and not predicates:
+                # columnar storage, so the data types can be checked one column at a time
+                pkfs, pks = self.primary_key_fields[table], list(_table)
+                columns = dict(zip(self.data_fields[table], _table._live_columns()))
+                for field, data_type in type_row:
+                    if field in columns:
+                        values = columns[field]
+                    else:
+                        values = pks if len(pkfs) == 1 else [pk[pkfs.index(field)] for pk in pks]
+                    for pk, value in zip(pks, values):
+                        if not data_type.valid_data(value):
+                            rtn_values[table, field].add(value)
+                            rtn_pks[table, field].add(pk)
+            elif dictish(_table):
+                pkfs, dfs = self.primary_key_fields[table], self.data_fields[table]
+                for pk, data_row in _table.items():
+                    full_row = dict(zip(dfs, data_row.values()))
+                    if len(pkfs) == 1:
+                        full_row[pkfs[0]] = pk
+                    else:
+                        full_row.update(zip(pkfs, pk))
+                    for field, data_type in type_row:
+                        if not data_type.valid_data(full_row[field]):
+                            rtn_values[table, field].add(full_row[field])
+                            rtn_pks[table, field].add(pk)
+                    for pn, p in predicates:
+                        # each predicate gets its own copy, so that one that edits its row can't affect the others
+                        if not _p(p, dict(full_row)):
+                            rtn_rows[table, pn].add(pk)
+            elif containerish(_table):
+                for i, data_row in enumerate(_table):
+                    for field, data_type in type_row:
+                        if not data_type.valid_data(data_row[field]):
+                            rtn_values[table, field].add(data_row[field])
+                            rtn_pks[table, field].add(i)
+                    for pn, p in predicates:
+                        if not _p(p, data_row):
+                            rtn_rows[table, pn].add(i)
+        return rtn_values, rtn_pks, rtn_rows
 
     def replace_data_type_failures(self, tic_dat, replacement_values = FrozenDict()):
         """
@@ -1634,38 +2310,9 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
          and thus a predicate that throws an Exception is a sign of a row that is "dirty".
         """
         assert self.good_tic_dat_object(tic_dat), "tic_dat not a good object for this factory"
-        data_row_predicates = {k: dict(v) for k,v in self._data_row_predicates.items()}
-        if self._parameters:
-            def good_parameter(row):
-                k = row[self.primary_key_fields["parameters"][0]]
-                v = row[self.data_fields["parameters"][0]]
-                chk = self._parameters.get(k)
-                return chk and (chk.type_dictionary is None or chk.type_dictionary.valid_data(v))
-            _ = "Good Name/Value Check"
-            make_name = lambda i: _ if _ not in self._data_row_predicates.get("parameters", {}) else f"{_}_{i}"
-            predicate_name = next(make_name(i) for i in count() if make_name(i) not in
-                                  self._data_row_predicates.get("parameters", {}))
-            data_row_predicates["parameters"] = data_row_predicates.get("parameters", {})
-            data_row_predicates["parameters"][predicate_name] = good_parameter
-
-        rtn = clt.defaultdict(set)
-        for tbl, row_predicates in data_row_predicates.items():
-            for pn, p in row_predicates.items():
-                def _p(row):
-                    try:
-                        return p(row)
-                    except:
-                        return False
-                _table = getattr(tic_dat, tbl)
-                if dictish(_table):
-                    for pk  in _table:
-                        full_row = self._get_full_row(tic_dat, tbl, pk)
-                        if not _p(full_row):
-                            rtn[tbl, pn].add(pk)
-                else:
-                    for i, data_row in enumerate(_table):
-                        if not p(data_row):
-                            rtn[tbl, pn].add(i)
+        _, _, rtn = self._find_data_type_and_row_failures(tic_dat, data_types=False)
+        return self._data_row_failures_result(rtn)
+    def _data_row_failures_result(self, rtn):
         TPN = clt.namedtuple("TablePredicateName", ["table", "predicate_name"])
         return {TPN(*k):tuple(v) for k,v in rtn.items()}
 
@@ -1826,3 +2473,166 @@ def freeze_me(x) :
     assert x._isFrozen
     return x
 
+
+class _IncrementalValidator(object):
+    # see TicDatFactory.incremental_validator
+    def __init__(self, tdf, tic_dat):
+        self._tdf, self._tic_dat = tdf, tic_dat
+        self._true_data_types = tdf._true_data_types()
+        self._predicates = tdf._all_data_row_predicates()
+        self._fk_checks = [check for checks in tdf._foreign_key_failures_plan().values() for check in checks]
+        self._type_failures = {} # table -> {pk (or row position) -> {field -> bad value}}
+        self._row_failures = {} # table -> {pk (or row position) -> set of predicate names}
+        self._native_look_ups = {} # fk -> {native pk -> native look up value}
+        self._natives_by_look_up = {} # fk -> {native look up value -> set of native pks}
+        self._foreign_look_ups = {} # fk -> {foreign pk -> foreign look up value}, if not looking into the table itself
+        self._foreign_counts = {} # fk -> Counter of the foreign look up values, if not looking into the table itself
+        self._fk_failures = {} # fk -> {native pk -> native values}
+        for t in set(self._true_data_types).union(self._predicates):
+            self._rescan_table(t)
+        for check in self._fk_checks:
+            self._rescan_fk(check)
+    def _table_items(self, t):
+        _t = getattr(self._tic_dat, t)
+        return _t.items() if dictish(_t) else enumerate(_t)
+    def _row_failures_for(self, t, pk, data_row):
+        # mirrors TicDatFactory._find_data_type_and_row_failures for a single row
+        if self._tdf.primary_key_fields.get(t):
+            pkfs = self._tdf.primary_key_fields[t]
+            full_row = dict(zip(self._tdf.data_fields[t], data_row.values()))
+            if len(pkfs) == 1:
+                full_row[pkfs[0]] = pk
+            else:
+                full_row.update(zip(pkfs, pk))
+        else:
+            full_row = data_row
+        bad_types = {f: full_row[f] for f, data_type in self._true_data_types.get(t, {}).items()
+                     if not data_type.valid_data(full_row[f])}
+        def _p(p):
+            try:
+                # as with the full scan, each predicate gets its own copy of a keyed row
+                return p(full_row if full_row is data_row else dict(full_row))
+            except:
+                return False
+        return bad_types, {pn for pn, p in self._predicates.get(t, {}).items() if not _p(p)}
+    def _recheck_row(self, t, pk):
+        _t = getattr(self._tic_dat, t)
+        self._type_failures[t].pop(pk, None)
+        self._row_failures[t].pop(pk, None)
+        if pk in _t:
+            bad_types, bad_predicates = self._row_failures_for(t, pk, _t[pk])
+            if bad_types:
+                self._type_failures[t][pk] = bad_types
+            if bad_predicates:
+                self._row_failures[t][pk] = bad_predicates
+    def _rescan_table(self, t):
+        self._type_failures[t], self._row_failures[t] = {}, {}
+        for pk, data_row in self._table_items(t):
+            bad_types, bad_predicates = self._row_failures_for(t, pk, data_row)
+            if bad_types:
+                self._type_failures[t][pk] = bad_types
+            if bad_predicates:
+                self._row_failures[t][pk] = bad_predicates
+    def _fk_fails(self, check, look_up_value):
+        if check.foreign_look_up is None: # i.e. look into the foreign table itself
+            return look_up_value not in getattr(self._tic_dat, check.fk.foreign_table)
+        return not self._foreign_counts[check.fk][look_up_value]
+    def _recheck_native(self, check, native_pk):
+        native_table = getattr(self._tic_dat, check.fk.native_table)
+        failures = self._fk_failures[check.fk]
+        failures.pop(native_pk, None)
+        if native_pk in self._native_look_ups[check.fk] and \
+           self._fk_fails(check, self._native_look_ups[check.fk][native_pk]):
+            failures[native_pk] = check.native_values(native_pk, native_table[native_pk])
+    def _set_native(self, check, native_pk):
+        # updates the native side indexes for native_pk
+        look_ups, by_look_up = self._native_look_ups[check.fk], self._natives_by_look_up[check.fk]
+        if native_pk in look_ups:
+            old = look_ups.pop(native_pk)
+            by_look_up[old].discard(native_pk)
+            if not by_look_up[old]:
+                del by_look_up[old]
+        native_table = getattr(self._tic_dat, check.fk.native_table)
+        if native_pk in native_table:
+            look_ups[native_pk] = new = check.native_look_up(native_pk, native_table[native_pk])
+            by_look_up.setdefault(new, set()).add(native_pk)
+    def _set_foreign(self, check, foreign_pk):
+        # updates the foreign side indexes for foreign_pk, and returns the affected native look up values
+        if check.foreign_look_up is None:
+            return {foreign_pk}
+        rtn = set()
+        look_ups, counts = self._foreign_look_ups[check.fk], self._foreign_counts[check.fk]
+        if foreign_pk in look_ups:
+            old = look_ups.pop(foreign_pk)
+            counts[old] -= 1
+            if not counts[old]:
+                del counts[old]
+            rtn.add(old)
+        foreign_table = getattr(self._tic_dat, check.fk.foreign_table)
+        if foreign_pk in foreign_table:
+            look_ups[foreign_pk] = new = check.foreign_look_up(foreign_pk, foreign_table[foreign_pk])
+            counts[new] += 1
+            rtn.add(new)
+        return rtn
+    def _rescan_fk(self, check):
+        fk = check.fk
+        self._native_look_ups[fk] = {pk: check.native_look_up(pk, row)
+                                     for pk, row in self._table_items(fk.native_table)}
+        self._natives_by_look_up[fk] = {}
+        for pk, look_up_value in self._native_look_ups[fk].items():
+            self._natives_by_look_up[fk].setdefault(look_up_value, set()).add(pk)
+        if check.foreign_look_up is not None:
+            self._foreign_look_ups[fk] = {pk: check.foreign_look_up(pk, row)
+                                          for pk, row in self._table_items(fk.foreign_table)}
+            self._foreign_counts[fk] = clt.Counter(self._foreign_look_ups[fk].values())
+        self._fk_failures[fk] = {}
+        native_table = getattr(self._tic_dat, fk.native_table)
+        for pk, look_up_value in self._native_look_ups[fk].items():
+            if self._fk_fails(check, look_up_value):
+                self._fk_failures[fk][pk] = check.native_values(pk, native_table[pk])
+    def update(self, changes=None):
+        changes = self._tdf._normalized_changes(self._tic_dat, changes)
+        rescan = {t for t, pks in changes.items() if pks is None}
+        for t in set(self._true_data_types).union(self._predicates).intersection(changes):
+            if t in rescan:
+                self._rescan_table(t)
+            else:
+                for pk in changes[t]:
+                    self._recheck_row(t, pk)
+        for check in self._fk_checks:
+            fk = check.fk
+            if rescan.intersection([fk.native_table, fk.foreign_table]):
+                self._rescan_fk(check)
+                continue
+            to_recheck = set(changes.get(fk.native_table, ()))
+            for native_pk in to_recheck:
+                self._set_native(check, native_pk)
+            for foreign_pk in changes.get(fk.foreign_table, ()):
+                for look_up_value in self._set_foreign(check, foreign_pk):
+                    to_recheck.update(self._natives_by_look_up[fk].get(look_up_value, ()))
+            for native_pk in to_recheck:
+                self._recheck_native(check, native_pk)
+        return self
+    def find_data_type_failures(self):
+        rtn_values, rtn_pks = clt.defaultdict(set), clt.defaultdict(set)
+        for t, failures in self._type_failures.items():
+            for pk, bad_types in failures.items():
+                for f, value in bad_types.items():
+                    rtn_values[t, f].add(value)
+                    rtn_pks[t, f].add(pk)
+        return self._tdf._data_type_failures_result(rtn_values, rtn_pks)
+    def find_data_row_failures(self):
+        rtn = clt.defaultdict(set)
+        for t, failures in self._row_failures.items():
+            for pk, predicate_names in failures.items():
+                for pn in predicate_names:
+                    rtn[t, pn].add(pk)
+        return self._tdf._data_row_failures_result(rtn)
+    def find_foreign_key_failures(self, verbosity="High"):
+        verify(verbosity in ["High", "Low"], "verbosity needs to be either 'High' or 'Low'")
+        RtnType = namedtuple("ForeignKeyFailures", ("native_values", "native_pks"))
+        rtn = {fk: RtnType(tuple(set(failures.values())), tuple(failures)) for fk, failures in
+               self._fk_failures.items() if failures}
+        if verbosity == "Low":
+            rtn = {tuple(k[:2]) + (tuple(k[2]),): tuple(v) for k,v in rtn.items()}
+        return rtn
@@ -825,63 +825,216 @@ def deep_freeze(x) :
     return frozenset(map(deep_freeze,x))
 
 
+class _TicDatDataRowBase(object) :
+    # there can be millions of rows, so the instances have no __dict__. The freezing flags get their own slots,
+    # and any other attributes (i.e. the foreign key links) are stored in a lazily created dictionary
+    __slots__ = ()
+    # the rows can be frozen all at once by their row class (see TicDat._freeze), or else one by one
+    @property
+    def _dataFrozen(self):
+        return bool(type(self)._frozen_rows) or self._row_data_frozen
+    @_dataFrozen.setter
+    def _dataFrozen(self, value):
+        object.__setattr__(self, "_row_data_frozen", value)
+    @property
+    def _attributesFrozen(self):
+        return bool(type(self)._frozen_rows) or self._row_attributes_frozen
+    @_attributesFrozen.setter
+    def _attributesFrozen(self, value):
+        object.__setattr__(self, "_row_attributes_frozen", value)
+    def _init_freezing_flags(self):
+        object.__setattr__(self, "_row_data_frozen", False)
+        object.__setattr__(self, "_row_attributes_frozen", False)
+    _table, _fieldtoindex, _default_values = None, {}, {}
+    _lazy_links, _frozen_rows = {}, () # each row class has its own
+    _journal = None # records the changes to the rows when change tracking is enabled
+    def _row_values(self, x):
+        # the data values implied by x, in field order
+        # since ticDat targeting numerical analysis, 0 is good default default
+        rtn = [0] * len(self._fieldtoindex)
+        if dictish(x) :
+            verify(set(x.keys()).issubset(self._fieldtoindex),
+                   "Applying inappropriate data field names to %s"%self._table)
+            for f,i in self._fieldtoindex.items():
+                if f in self._default_values :
+                    rtn[i] = self._default_values[f]
+            for f,_d in x.items():
+                rtn[self._fieldtoindex[f]] = _d
+        elif containerish(x) :
+            verify(len(x) == len(rtn), "%s requires each row to have %s data values"%
+                   (self._table, len(rtn)))
+            for i in range(len(rtn)):
+                rtn[i] = x[i]
+        else:
+            verify(len(rtn) ==1, "%s requires each row to have %s data values"%
+                   (self._table, len(rtn)))
+            rtn[0] = x
+        return rtn
+    def __getattr__(self, item):
+        # only called when normal attribute lookup fails
+        try:
+            return object.__getattribute__(self, "_links")[item]
+        except (AttributeError, KeyError):
+            return _build_lazy_link(self, item)
+    def _set_link(self, name, value):
+        # for lazy foreign key links, which might be built after the row is frozen
+        if not hasattr(self, "_links"):
+            object.__setattr__(self, "_links", {})
+        self._links[name] = value
+    def __setattr__(self, key, value):
+        if self._attributesFrozen:
+            raise TicDatError("can't set attributes to a frozen " + self.__class__.__name__)
+        if key in type(self).__slots__ or key in _row_freezing_flags:
+            return object.__setattr__(self, key, value)
+        if not hasattr(self, "_links"):
+            object.__setattr__(self, "_links", {})
+        self._links[key] = value
+    def __delattr__(self, item):
+        if self._attributesFrozen:
+            raise TicDatError("can't del attributes to a frozen " + self.__class__.__name__)
+        if item in type(self).__slots__:
+            return object.__delattr__(self, item)
+        try:
+            del object.__getattribute__(self, "_links")[item]
+        except (AttributeError, KeyError):
+            raise AttributeError("%s row has no attribute %s"%(self._table, item))
+    def _check_setitem(self, key):
+        verify(key in self._fieldtoindex, "Key error : %s not data field name for table %s"%
+               (key, self._table))
+        if type(self)._frozen_rows or self._row_data_frozen:
+            raise TicDatError("Can't edit a frozen TicDatDataRow")
+        if self._journal is not None:
+            self._journal.row_modified(self, key)
+    def keys(self):
+        return tuple(self._fieldtoindex)
+    def items(self):
+        return zip(self.keys(), self.values())
+    def __contains__(self, item):
+        return item in self._fieldtoindex
+    def __iter__(self):
+        return iter(self._fieldtoindex)
+    def __len__(self):
+        return len(self._fieldtoindex)
+    def __repr__(self):
+        return "_td:" + {k:v for k,v in self.items()}.__repr__()
+
+_row_freezing_flags = frozenset(["_dataFrozen", "_attributesFrozen"])
+def _build_lazy_link(row, item):
+    # the fallback attribute lookup for rows. the data-less rows of a table can be frozen all at once by their row
+    # class (see TicDat._freeze, and _TicDatDataRowBase for the other rows). otherwise, builds a lazy foreign key
+    # link (for every row of the table) the first time it is accessed
+    if item in _row_freezing_flags:
+        if type(row)._frozen_rows:
+            return True
+        raise AttributeError("%s row has no attribute %s"%(row._table, item))
+    builder = type(row)._lazy_links.pop(item, None)
+    if builder is None:
+        raise AttributeError("%s row has no attribute %s"%(row._table, item))
+    builder()
+    return getattr(row, item)
+
+def _data_less_row_factory(table):
+    # need a freezeable dict not a frozen dict here so can still link foreign keys
+    class TicDatDataLessRow(FreezeableDict) :
+        _table, _lazy_links, _frozen_rows = table, {}, []
+        def __init__(self, x=()):
+            verify(containerish(x) and len(x) == 0, "Attempting to add non-empty data to %s"%table)
+            super(TicDatDataLessRow, self).__init__()
+        def __getattr__(self, item):
+            # only called when normal attribute lookup fails
+            return _build_lazy_link(self, item)
+        def _set_link(self, name, value):
+            # for lazy foreign key links, which might be built after the row is frozen
+            object.__setattr__(self, name, value)
+    return TicDatDataLessRow
+
 def td_row_factory(table, key_field_names, data_field_names, default_values={}):
     assert dictish(default_values) and set(default_values).issubset(data_field_names)
     assert not set(key_field_names).intersection(data_field_names)
     if not data_field_names:
-         # need a freezeable dict not a frozen dict here so can still link foreign keys
-        def makefreezeabledict(x=()) :
-            verify(containerish(x) and len(x) == 0, "Attempting to add non-empty data to %s"%table)
-            return FreezeableDict()
-        return makefreezeabledict
-    fieldtoindex = {x:data_field_names.index(x) for x in data_field_names}
-    indextofield = {v:k for k,v in fieldtoindex.items()}
-    class TicDatDataRow(freezable_factory(object, "_attributesFrozen")) :
+        return _data_less_row_factory(table)
+    class TicDatDataRow(_TicDatDataRowBase) :
+        __slots__ = ("_data", "_row_data_frozen", "_row_attributes_frozen", "_links")
+        _table, _default_values, _lazy_links, _frozen_rows = table, default_values, {}, []
+        _fieldtoindex = {x:data_field_names.index(x) for x in data_field_names}
         def __init__(self, x):
-            # since ticDat targeting numerical analysis, 0 is good default default
-            self._data = [0] * len(fieldtoindex)
-            if dictish(x) :
-                verify(set(x.keys()).issubset(fieldtoindex),
-                       "Applying inappropriate data field names to %s"%table)
-                for f,i in fieldtoindex.items():
-                    if f in default_values :
-                        self._data[i] = default_values[f]
-                for f,_d in x.items():
-                    self[f] = _d
-            elif containerish(x) :
-                verify(len(x) == len(self), "%s requires each row to have %s data values"%
-                       (table, len(self)))
-                for i in range(len(self)):
-                    self._data[i] = x[i]
-            else:
-                verify(len(self) ==1, "%s requires each row to have %s data values"%
-                       (table, len(self)))
-                self._data[0] = x
+            self._init_freezing_flags()
+            object.__setattr__(self, "_data", self._row_values(x))
+        @classmethod
+        def _trusted(cls, x):
+            # skips the verification, for data values that are known to be consistent with the data fields
+            rtn = cls.__new__(cls)
+            rtn._init_freezing_flags()
+            object.__setattr__(rtn, "_data", list(x) if isinstance(x, (list, tuple)) else [x])
+            return rtn
         def __getitem__(self, item):
             try :
-                return self._data[fieldtoindex[item]]
+                return self._data[self._fieldtoindex[item]]
             except :
                 raise TicDatError("Key error : %s not data field name for table %s"% (item, table))
         def __setitem__(self, key, value):
-            verify(key in fieldtoindex, "Key error : %s not data field name for table %s"%
-                   (key, table))
-            if getattr(self, "_dataFrozen", False) :
-                raise TicDatError("Can't edit a frozen TicDatDataRow")
-            self._data[fieldtoindex[key]] = value
-        def keys(self):
-            return tuple(indextofield[i] for i in range(len(self)))
+            if (key not in self._fieldtoindex or type(self)._frozen_rows or self._row_data_frozen or
+                    self._journal is not None):
+                self._check_setitem(key)
+            self._data[self._fieldtoindex[key]] = value
         def values(self):
             return tuple(self._data)
-        def items(self):
-            return zip(self.keys(), self.values())
-        def __contains__(self, item):
-            return item in fieldtoindex
-        def __iter__(self):
-            return iter(fieldtoindex)
-        def __len__(self):
-            return len(self._data)
-        def __repr__(self):
-            return "_td:" + {k:v for k,v in self.items()}.__repr__()
+    assert dictish(TicDatDataRow)
+    return TicDatDataRow
+
+def td_columnar_row_factory(table, key_field_names, data_field_names, default_values={}):
+    """
+    Like td_row_factory, except the rows are lightweight views into a table level column store.
+    The returned row factory takes a second argument, the list of columns (one list per data field) that
+    will store the row data. Each new row is appended to the end of these columns, unless a third argument
+    gives the position of an unused slot in the columns to store it at instead.
+    """
+    assert dictish(default_values) and set(default_values).issubset(data_field_names)
+    assert not set(key_field_names).intersection(data_field_names)
+    if not data_field_names:
+        data_less_factory = _data_less_row_factory(table)
+        return lambda x=(), columns=None, posn=None: data_less_factory(x)
+    class TicDatDataRow(_TicDatDataRowBase) :
+        __slots__ = ("_columns", "_posn", "_row_data_frozen", "_row_attributes_frozen", "_links")
+        _table, _default_values, _lazy_links, _frozen_rows = table, default_values, {}, []
+        _fieldtoindex = {x:data_field_names.index(x) for x in data_field_names}
+        def __init__(self, x, columns, posn=None):
+            assert len(columns) == len(self._fieldtoindex)
+            values = self._row_values(x)
+            self._init_freezing_flags()
+            object.__setattr__(self, "_columns", columns)
+            if posn is None:
+                object.__setattr__(self, "_posn", len(columns[0]))
+                for column, value in zip(columns, values):
+                    column.append(value)
+            else:
+                object.__setattr__(self, "_posn", posn)
+                for column, value in zip(columns, values):
+                    column[posn] = value
+        @classmethod
+        def _trusted(cls, columns, posn):
+            # a view of data that has already been appended to the columns
+            rtn = cls.__new__(cls)
+            rtn._init_freezing_flags()
+            object.__setattr__(rtn, "_columns", columns)
+            object.__setattr__(rtn, "_posn", posn)
+            return rtn
+        def __getitem__(self, item):
+            try :
+                return self._columns[self._fieldtoindex[item]][self._posn]
+            except :
+                raise TicDatError("Key error : %s not data field name for table %s"% (item, table))
+        def __setitem__(self, key, value):
+            if (key not in self._fieldtoindex or type(self)._frozen_rows or self._row_data_frozen or
+                    self._journal is not None):
+                self._check_setitem(key)
+            self._columns[self._fieldtoindex[key]][self._posn] = value
+        def values(self):
+            return tuple(column[self._posn] for column in self._columns)
+        def _detach(self):
+            # moves the data into columns of its own, so that the row's slot in the shared columns can be reused
+            object.__setattr__(self, "_columns", tuple([column[self._posn]] for column in self._columns))
+            object.__setattr__(self, "_posn", 0)
     assert dictish(TicDatDataRow)
     return TicDatDataRow
 
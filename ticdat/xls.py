@@ -105,7 +105,8 @@ class XlsTicFactory(freezable_factory(object, "_isFrozen")) :
             pandat = pdf.xls.create_pan_dat(xls_file_path)
             for t in self.tic_dat_factory.generic_tables:
                 rtn[t] = getattr(pandat, t)
-        rtn = tdf._parameter_table_post_read_adjustment(tdf.TicDat(**rtn))
+        # _create_tic_dat_dict builds each row from the full set of fields, so the rows can be trusted
+        rtn = tdf._parameter_table_post_read_adjustment(tdf.TicDat.from_rows(trusted=True, **rtn))
         if freeze_it:
             return self.tic_dat_factory.freeze_me(rtn)
         return rtn